@@ -1,15 +1,24 @@
 #!/usr/bin/env python3
 """
-Count distinct rollercoaster types from rollercoasters.csv without using any imports.
+Count distinct rollercoaster types from rollercoasters.csv.
+Only the rollercoaster_type column is decoded, using the memory-mapped
+byte_scanner, so memory stays constant and other fields cost almost nothing.
 
 Outputs the number of distinct types and a sorted list of the types.
+
+approximate_distinct(csv_path, column, error, epsilon, top_k) is the
+fixed-memory alternative for high-cardinality columns: a HyperLogLog
+distinct count and the most frequent values from the sketches module.
+Run with --approx [column] to print it instead of the exact listing.
 """
 
-CSV_PATH = 'rollercoasters.csv'
+import sys
 
-def read_lines(path):
-    with open(path, 'r', encoding='utf-8') as f:
-        return [line.rstrip('\n') for line in f]
+from byte_scanner import ByteScanner
+from instrumentation import count, instrumented, stage
+from sketches import HeavyHitters, HyperLogLog
+
+CSV_PATH = 'rollercoasters.csv'
 
 def parse_header_index(header_line, column_name):
     headers = [h.strip() for h in header_line.split(',')]
@@ -18,38 +27,65 @@ def parse_header_index(header_line, column_name):
     except ValueError:
         return None, len(headers)
 
+@instrumented('assignment3.main')
 def main():
-    lines = read_lines(CSV_PATH)
-    if not lines:
-        print('No data in', CSV_PATH)
-        return
-
-    # find index of rollercoaster_type
-    idx, header_count = parse_header_index(lines[0], 'rollercoaster_type')
-    if idx is None:
-        print("Header 'rollercoaster_type' not found in CSV header")
-        return
-
-    types_set = set()
-    # we'll limit splits to header_count-1 so fields after the target column (or any commas later)
-    # don't cause the rollercoaster_type field to be split incorrectly.
-    for line in lines[1:]:
-        if not line.strip():
-            continue
-        # limit number of splits so we get exactly header_count fields at most
-        parts = [p.strip() for p in line.split(',', header_count - 1)]
-        if len(parts) <= idx:
-            # malformed line — skip
-            continue
-        value = parts[idx].strip()
-        if value:
-            types_set.add(value)
-
-    types_list = sorted(types_set)
+    with ByteScanner(CSV_PATH) as scanner:
+        if scanner.header_line is None:
+            print('No data in', CSV_PATH)
+            return
+
+        # find index of rollercoaster_type
+        idx, header_count = parse_header_index(scanner.header_line, 'rollercoaster_type')
+        if idx is None:
+            print("Header 'rollercoaster_type' not found in CSV header")
+            return
+
+        types_set = set()
+        # the scanner only splits up to the target column, so later fields (or any commas
+        # in them) don't matter; rows too short to hold the column are skipped as malformed.
+        with stage('assignment3.scan'):
+            for (value,) in scanner.project(['rollercoaster_type']):
+                if value:
+                    types_set.add(value)
+
+    with stage('assignment3.sort'):
+        types_list = sorted(types_set)
+    count('rows_emitted', len(types_list))
     print('Number of distinct rollercoaster types:', len(types_list))
     print('Types:')
     for t in types_list:
         print('-', t)
 
+@instrumented('assignment3.approximate_distinct')
+def approximate_distinct(csv_path, column='rollercoaster_type', error=0.01,
+                         epsilon=0.001, top_k=10):
+    """
+    Estimate the distinct non-empty values of column in fixed memory.
+    error is the HyperLogLog relative standard error; epsilon bounds the
+    overcount of each top value at epsilon * rows.
+    Returns (estimated distinct count, [(value, estimated count)] for the top_k values).
+    """
+    hll = HyperLogLog(error)
+    hitters = HeavyHitters(epsilon)
+    with ByteScanner(csv_path) as scanner:
+        if scanner.header_line is None:
+            return (0, [])
+        with stage('assignment3.scan'):
+            for (value,) in scanner.project([column]):
+                if value:
+                    hll.add(value)
+                    hitters.add(value)
+    return (hll.count(), hitters.top(top_k))
+
+def approx_main(column='rollercoaster_type'):
+    distinct, top = approximate_distinct(CSV_PATH, column)
+    print(f"Approximate number of distinct {column} values:", distinct)
+    print('Most common:')
+    for value, n in top:
+        print('-', value, '(~' + str(n) + ')')
+
 if __name__ == '__main__':
-    main()
+    if len(sys.argv) > 1 and sys.argv[1] == '--approx':
+        approx_main(*sys.argv[2:3])
+    else:
+        main()
@@ -1,66 +1,148 @@
 #!/usr/bin/env python3
 """
-Provide functions to query rollercoasters.csv without importing any modules.
+Provide functions to query rollercoasters.csv.
 
 Function:
-  coasters_medium_excitement_high_intensity(csv_path)
+  coasters_medium_excitement_high_intensity(csv_path, workers=None, use_cache=False)
     - Reads csv_path (comma-separated, header on first line)
     - Returns a list of rollercoaster_type strings where
         excitement_rating == 'Medium' AND numeric intensity > 5.40
+    - workers > 1 scans line-aligned byte ranges in that many processes
+      and concatenates the partial lists in file order
+    - use_cache=True answers from the binary column cache (coaster_cache);
+      it holds only complete rows in the assignment6 column order, so the
+      file is scanned instead if it has short rows or another header
+    - if a fresh intensity index (intensity_index) exists for csv_path,
+      the answer comes from it by binary search instead of a scan; the
+      index keeps exactly the rows the scan would, so the answer is the same
 
-No modules or external libraries are used.
+  query(csv_path, rating=None, intensity_gt=None, intensity_lt=None)
+    - Returns rollercoaster_type strings, in file order, of rows whose
+      excitement_rating equals rating (any if None) and whose intensity
+      lies strictly between intensity_gt and intensity_lt (None = open)
+    - Uses the intensity index when present, otherwise scans the file
+
+Rows are streamed with the shared csv_rows reader; no external libraries are used.
 """
 
-def read_lines(path):
-    with open(path, 'r', encoding='utf-8') as f:
-        return [line.rstrip('\n') for line in f]
+from categorical import MISSING_CODE
+from coaster_cache import load_coaster_table
+from csv_io import is_compressed
+from csv_rows import RowReader, to_float
+from instrumentation import instrumented
+from intensity_index import find_intensity_index
+from parallel_scan import range_rows, scan_in_parallel
 
-def parse_header(header_line):
-    return [h.strip() for h in header_line.split(',')]
+def filter_medium_high(rows, idx_type, idx_excitement_rating, idx_intensity):
+    """Return rollercoaster_type of every row with 'Medium' excitement and intensity > 5.40."""
+    result = []
+    for parts in rows:
+        # the cheap rating test first, so most rows never reach the float conversion
+        if parts[idx_excitement_rating] != 'Medium':
+            continue
+        intensity_val = to_float(parts[idx_intensity], default=None)
+        if (intensity_val is not None) and (intensity_val > 5.40):
+            result.append(parts[idx_type])
+    return result
 
-def to_float(s, default=None):
-    try:
-        return float(s)
-    except Exception:
-        return default
+def filter_medium_high_range(csv_path, start, end, header_count, min_fields, indices):
+    """Worker for the parallel mode: filter the rows of one byte range."""
+    return filter_medium_high(range_rows(csv_path, start, end, header_count, min_fields), *indices)
 
-def coasters_medium_excitement_high_intensity(csv_path):
-    """Return list of rollercoaster_type names with excitement_rating 'Medium' and intensity > 5.40."""
-    lines = read_lines(csv_path)
-    if not lines:
+def filter_medium_high_table(table):
+    """Same filter as filter_medium_high, over a CoasterTable's columns."""
+    medium = table.code_of('excitement_rating', 'Medium')
+    if medium == MISSING_CODE:
         return []
+    excitement_codes = table.columns['excitement_rating']
+    intensity = table.columns['intensity']
+    type_codes = table.columns['rollercoaster_type']
+    type_names = table.dictionaries['rollercoaster_type']
+    result = []
+    for i in range(table.size):
+        # missing intensity is NaN, which is never > 5.40
+        if excitement_codes[i] == medium and intensity[i] > 5.40:
+            result.append(type_names[type_codes[i]])
+    return result
 
-    headers = parse_header(lines[0])
-    # get indices
-    try:
-        idx_type = headers.index('rollercoaster_type')
-    except ValueError:
-        raise ValueError("Missing header 'rollercoaster_type'")
-    try:
-        idx_excitement_rating = headers.index('excitement_rating')
-    except ValueError:
-        raise ValueError("Missing header 'excitement_rating'")
-    try:
-        idx_intensity = headers.index('intensity')
-    except ValueError:
-        raise ValueError("Missing header 'intensity'")
+@instrumented('assignment4.query', emitted=len)
+def query(csv_path, rating=None, intensity_gt=None, intensity_lt=None):
+    """Return rollercoaster_type names whose rating matches and intensity is within the bounds."""
+    index = find_intensity_index(csv_path)
+    if index is not None:
+        return index.rollercoaster_types(rating, intensity_gt, intensity_lt)
 
-    result = []
-    # limit splits to header_count-1 so fields after do not cause extra splits
-    header_count = len(headers)
-    for line in lines[1:]:
-        if not line.strip():
-            continue
-        parts = [p.strip() for p in line.split(',', header_count - 1)]
-        if len(parts) <= max(idx_type, idx_excitement_rating, idx_intensity):
-            # malformed; skip
-            continue
-        coaster_type = parts[idx_type].strip()
-        excitement_rating = parts[idx_excitement_rating].strip()
-        intensity_val = to_float(parts[idx_intensity].strip(), default=None)
-        if (excitement_rating == 'Medium') and (intensity_val is not None) and (intensity_val > 5.40):
-            result.append(coaster_type)
+    with RowReader(csv_path) as reader:
+        if reader.header_line is None:
+            return []
+        headers = reader.headers
+        try:
+            idx_type = headers.index('rollercoaster_type')
+            idx_excitement_rating = headers.index('excitement_rating')
+            idx_intensity = headers.index('intensity')
+        except ValueError as e:
+            raise ValueError('Missing required header: ' + str(e))
+
+        result = []
+        # rows too short to hold every needed column are malformed, as in the index
+        min_fields = max(idx_type, idx_excitement_rating, idx_intensity) + 1
+        for parts in reader.rows(min_fields=min_fields):
+            if rating is not None and parts[idx_excitement_rating] != rating:
+                continue
+            intensity_val = to_float(parts[idx_intensity], default=None)
+            # NaN fails every comparison, just as it is left out of the index
+            if intensity_val is None or intensity_val != intensity_val:
+                continue
+            if intensity_gt is not None and not intensity_val > intensity_gt:
+                continue
+            if intensity_lt is not None and not intensity_val < intensity_lt:
+                continue
+            result.append(parts[idx_type])
+    return result
+
+@instrumented('assignment4.coasters_medium_excitement_high_intensity', emitted=len)
+def coasters_medium_excitement_high_intensity(csv_path, workers=None, use_cache=False):
+    """Return list of rollercoaster_type names with excitement_rating 'Medium' and intensity > 5.40."""
+    index = find_intensity_index(csv_path)
+    if index is not None:
+        return index.rollercoaster_types('Medium', intensity_gt=5.40)
+    if use_cache:
+        table = load_coaster_table(csv_path)
+        if table.holds_every_row():
+            return filter_medium_high_table(table)
+    if is_compressed(csv_path):
+        # byte ranges can't be cut out of a compressed stream
+        workers = None
+    with RowReader(csv_path) as reader:
+        if reader.header_line is None:
+            return []
+
+        headers = reader.headers
+        # get indices
+        try:
+            idx_type = headers.index('rollercoaster_type')
+        except ValueError:
+            raise ValueError("Missing header 'rollercoaster_type'")
+        try:
+            idx_excitement_rating = headers.index('excitement_rating')
+        except ValueError:
+            raise ValueError("Missing header 'excitement_rating'")
+        try:
+            idx_intensity = headers.index('intensity')
+        except ValueError:
+            raise ValueError("Missing header 'intensity'")
 
+        indices = (idx_type, idx_excitement_rating, idx_intensity)
+        # rows too short to hold every needed column are malformed; the reader skips them
+        min_fields = max(indices) + 1
+        if workers is None or workers <= 1:
+            return filter_medium_high(reader.rows(min_fields), *indices)
+
+    partials = scan_in_parallel(csv_path, filter_medium_high_range,
+                                (len(headers), min_fields, indices), workers)
+    result = []
+    for partial in partials:
+        result.extend(partial)
     return result
 
 
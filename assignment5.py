@@ -1,59 +1,123 @@
 #!/usr/bin/env python3
 """
 Compute average intensity for coasters with excitement_rating 'High', grouped by theme.
-No imports allowed.
+Rows are streamed with the shared csv_rows reader, so memory stays constant.
 
 Function:
-  avg_high_excitement_intensity_by_theme(csv_path)
+  avg_high_excitement_intensity_by_theme(csv_path, workers=None, use_cache=False)
     - Returns dict { theme: average_intensity }
     - Skips rows with missing or non-numeric intensity
     - Uses exact match 'High' for excitement_rating
+    - workers > 1 scans line-aligned byte ranges in that many processes
+      and merges the per-theme sums and counts
+    - use_cache=True answers from the binary column cache (coaster_cache);
+      it holds only complete rows in the assignment6 column order and can't
+      tell a 'nan' intensity from a missing one, so the file is scanned
+      instead if it has short rows, another header or a NaN intensity
 """
 
-def read_lines(path):
-    with open(path, 'r', encoding='utf-8') as f:
-        return [line.rstrip('\n') for line in f]
+from categorical import MISSING_CODE, Categories
+from coaster_cache import load_coaster_table
+from csv_io import is_compressed
+from csv_rows import RowReader, to_float
+from instrumentation import instrumented
+from parallel_scan import range_rows, scan_in_parallel
 
-def parse_header(header_line):
-    return [h.strip() for h in header_line.split(',')]
+def sum_high_intensity_by_theme(rows, idx_theme, idx_excitement_rating, idx_intensity):
+    """Return (sums, counts) dicts of intensity by theme for 'High' excitement rows."""
+    # themes are coded in first-seen order and the totals indexed by code
+    themes = Categories()
+    theme_codes = themes.codes
+    sums = []  # code -> sum of intensities
+    counts = []  # code -> count
+    for parts in rows:
+        if parts[idx_excitement_rating] != 'High':
+            continue
+        intensity_val = to_float(parts[idx_intensity], default=None)
+        if intensity_val is None:
+            continue
+        theme = parts[idx_theme]
+        code = theme_codes.get(theme)
+        if code is None:
+            code = themes.encode(theme)
+            sums.append(0.0)
+            counts.append(0)
+        sums[code] += intensity_val
+        counts[code] += 1
+    return dict(zip(themes.values, sums)), dict(zip(themes.values, counts))
+
+def sum_high_intensity_range(csv_path, start, end, header_count, min_fields, indices):
+    """Worker for the parallel mode: partial sums and counts of one byte range."""
+    return sum_high_intensity_by_theme(range_rows(csv_path, start, end, header_count, min_fields),
+                                       *indices)
 
-def to_float(s, default=None):
-    try:
-        return float(s)
-    except Exception:
-        return default
+def sum_high_intensity_table(table):
+    """Same sums and counts as sum_high_intensity_by_theme, over a CoasterTable's columns."""
+    high = table.code_of('excitement_rating', 'High')
+    if high == MISSING_CODE:
+        return {}, {}
+    excitement_codes = table.columns['excitement_rating']
+    intensity = table.columns['intensity']
+    theme_codes = table.columns['theme']
+    theme_names = table.dictionaries['theme']
+    # totals indexed directly by theme code; order keeps themes as first matched
+    sums = [0.0] * len(theme_names)
+    counts = [0] * len(theme_names)
+    order = []
+    for i in range(table.size):
+        intensity_val = intensity[i]
+        # missing intensity is stored as NaN, which is the only value not equal to itself
+        if excitement_codes[i] == high and intensity_val == intensity_val:
+            code = theme_codes[i]
+            if not counts[code]:
+                order.append(code)
+            sums[code] += intensity_val
+            counts[code] += 1
+    return ({theme_names[code]: sums[code] for code in order},
+            {theme_names[code]: counts[code] for code in order})
 
-def avg_high_excitement_intensity_by_theme(csv_path):
+@instrumented('assignment5.avg_high_excitement_intensity_by_theme', emitted=len)
+def avg_high_excitement_intensity_by_theme(csv_path, workers=None, use_cache=False):
     """Return a dictionary mapping theme -> average intensity for 'High' excitement entries."""
-    lines = read_lines(csv_path)
-    if not lines:
-        return {}
+    if use_cache:
+        table = load_coaster_table(csv_path)
+        # a 'nan' intensity is averaged in by the scan but stored like a missing one
+        if table.holds_every_row() and table.nan_is_missing('intensity'):
+            sums, counts = sum_high_intensity_table(table)
+            return {theme: sums[theme] / counts[theme] for theme in sums}
+    if is_compressed(csv_path):
+        # byte ranges can't be cut out of a compressed stream
+        workers = None
+    with RowReader(csv_path) as reader:
+        if reader.header_line is None:
+            return {}
 
-    headers = parse_header(lines[0])
-    # required columns
-    try:
-        idx_theme = headers.index('theme')
-        idx_excitement_rating = headers.index('excitement_rating')
-        idx_intensity = headers.index('intensity')
-    except ValueError as e:
-        raise ValueError('Missing required header: ' + str(e))
+        headers = reader.headers
+        # required columns
+        try:
+            idx_theme = headers.index('theme')
+            idx_excitement_rating = headers.index('excitement_rating')
+            idx_intensity = headers.index('intensity')
+        except ValueError as e:
+            raise ValueError('Missing required header: ' + str(e))
 
-    header_count = len(headers)
-    sums = {}  # theme -> sum of intensities
-    counts = {}  # theme -> count
+        indices = (idx_theme, idx_excitement_rating, idx_intensity)
+        min_fields = max(indices) + 1
+        if workers is None or workers <= 1:
+            sums, counts = sum_high_intensity_by_theme(reader.rows(min_fields), *indices)
 
-    for line in lines[1:]:
-        if not line.strip():
-            continue
-        parts = [p.strip() for p in line.split(',', header_count - 1)]
-        if len(parts) <= max(idx_theme, idx_excitement_rating, idx_intensity):
-            continue
-        theme = parts[idx_theme]
-        excitement = parts[idx_excitement_rating]
-        intensity_val = to_float(parts[idx_intensity], default=None)
-        if (excitement == 'High') and (intensity_val is not None):
-            sums[theme] = sums.get(theme, 0.0) + intensity_val
-            counts[theme] = counts.get(theme, 0) + 1
+    if workers is not None and workers > 1:
+        # merge partials in file order so themes keep their first-seen order;
+        # sums are added per chunk, so averages may differ from the serial
+        # path in the last floating point digit
+        sums = {}
+        counts = {}
+        for part_sums, part_counts in scan_in_parallel(csv_path, sum_high_intensity_range,
+                                                      (len(headers), min_fields, indices),
+                                                      workers):
+            for theme in part_sums:
+                sums[theme] = sums.get(theme, 0.0) + part_sums[theme]
+                counts[theme] = counts.get(theme, 0) + part_counts[theme]
 
     averages = {}
     for theme in sums:
@@ -1,9 +1,33 @@
 #!/usr/bin/env python3
 """
 Create a Coaster class and build Coaster objects from rollercoasters.csv
-No imports, no dictionaries used.
+No dictionaries used. Rows are streamed with the shared csv_rows reader.
+
+LazyCoaster is a __slots__ variant that keeps the raw field list and
+converts each numeric field only when it is first read;
+build_coasters_from_csv(csv_path, lazy=True) builds those instead.
 """
 
+from categorical import Categories
+from csv_rows import RowReader, to_float, to_int
+from instrumentation import instrumented
+
+# Coaster fields in CSV column order, and how each one is converted
+FIELD_NAMES = (
+    'park_id', 'theme', 'rollercoaster_type', 'custom_design',
+    'excitement', 'excitement_rating', 'intensity', 'intensity_rating',
+    'nausea', 'nausea_rating', 'max_speed', 'avg_speed',
+    'ride_time', 'ride_length', 'max_pos_gs', 'max_neg_gs',
+    'max_lateral_gs', 'total_air_time', 'drops',
+    'highest_drop_height', 'inversions',
+)
+INT_FIELDS = ('park_id', 'custom_design', 'ride_time', 'ride_length',
+              'drops', 'highest_drop_height', 'inversions')
+FLOAT_FIELDS = ('excitement', 'intensity', 'nausea', 'max_speed', 'avg_speed',
+                'max_pos_gs', 'max_neg_gs', 'max_lateral_gs', 'total_air_time')
+TEXT_FIELDS = ('theme', 'rollercoaster_type', 'excitement_rating',
+               'intensity_rating', 'nausea_rating')
+
 class Coaster:
     def __init__(self,
                  park_id, theme, rollercoaster_type, custom_design,
@@ -41,51 +65,97 @@ class Coaster:
                     self.rollercoaster_type, self.theme, self.park_id,
                     self.excitement_rating, self.intensity)
 
-def to_float(s, default=None):
-    try:
-        return float(s)
-    except Exception:
-        return default
-
-def to_int(s, default=None):
-    try:
-        return int(float(s))
-    except Exception:
-        return default
-
-def read_lines(path):
-    with open(path, 'r', encoding='utf-8') as f:
-        return [line.rstrip('\n') for line in f]
-
-def build_coasters_from_csv(csv_path):
-    """Return a list of Coaster objects created from the CSV rows."""
-    lines = read_lines(csv_path)
-    if not lines:
-        return []
-
-    header = lines[0].strip()
-    headers = [h.strip() for h in header.split(',')]
-    header_count = len(headers)
-
-    coasters = []
-    for line in lines[1:]:
-        if not line.strip():
-            continue
-        # limit splits so later fields containing commas are preserved
-        parts = [p.strip() for p in line.split(',', header_count - 1)]
-        if len(parts) < header_count:
-            # skip malformed rows
-            continue
-        # pass fields in CSV order to Coaster constructor
-        c = Coaster(
-            parts[0], parts[1], parts[2], parts[3],
-            parts[4], parts[5], parts[6], parts[7],
-            parts[8], parts[9], parts[10], parts[11],
-            parts[12], parts[13], parts[14], parts[15],
-            parts[16], parts[17], parts[18], parts[19],
-            parts[20]
-        )
-        coasters.append(c)
+class LazyField:
+    """Descriptor for one LazyCoaster field, converted from the raw row on first access."""
+    __slots__ = ('index', 'convert', 'slot')
+
+    def __init__(self, index, convert=None, slot=None):
+        self.index = index
+        self.convert = convert
+        self.slot = slot  # member descriptor caching the converted value
+
+    def __get__(self, obj, owner=None):
+        if obj is None:
+            return self
+        if self.convert is None:
+            # text fields are already str, nothing to convert or cache
+            return obj._parts[self.index]
+        try:
+            return self.slot.__get__(obj, owner)
+        except AttributeError:
+            value = self.convert(obj._parts[self.index])
+            self.slot.__set__(obj, value)
+            return value
+
+    def __set__(self, obj, value):
+        if self.convert is None:
+            parts = obj._parts
+            obj._parts = parts[:self.index] + (value,) + parts[self.index + 1:]
+        else:
+            self.slot.__set__(obj, value)
+
+class LazyCoaster:
+    """
+    Coaster with the same attributes, built from a stripped CSV field list.
+    Only the fields are kept (as a tuple: tuples of str are left alone by the
+    garbage collector, lists are not); numeric fields are converted on first
+    access and cached.
+    """
+    __slots__ = ('_parts',) + tuple('_' + name for name in INT_FIELDS + FLOAT_FIELDS)
+
+    def __init__(self, parts):
+        self._parts = tuple(parts)
+
+    def to_coaster(self):
+        """Return an eagerly converted Coaster with the same field values."""
+        return Coaster(*[getattr(self, name) for name in FIELD_NAMES])
+
+    __repr__ = Coaster.__repr__
+
+for _index, _name in enumerate(FIELD_NAMES):
+    if _name in INT_FIELDS or _name in FLOAT_FIELDS:
+        _convert = to_int if _name in INT_FIELDS else to_float
+        setattr(LazyCoaster, _name, LazyField(_index, _convert, LazyCoaster.__dict__['_' + _name]))
+    else:
+        setattr(LazyCoaster, _name, LazyField(_index))
+del _index, _name, _convert
+
+@instrumented('assignment6.build_coasters_from_csv', emitted=len)
+def build_coasters_from_csv(csv_path, lazy=False):
+    """
+    Return a list of Coaster objects created from the CSV rows.
+    lazy=True returns LazyCoaster objects instead, which only split the row
+    up front and convert each numeric field the first time it is read.
+    """
+    with RowReader(csv_path) as reader:
+        if reader.header_line is None:
+            return []
+
+        header_count = len(reader.headers)
+
+        # the reader limits splits so later fields containing commas are preserved,
+        # and skips malformed rows with fewer than header_count fields
+        if lazy:
+            return [LazyCoaster(parts) for parts in reader.rows(min_fields=header_count)]
+
+        # text fields take the shared string of their category, so coasters
+        # don't each hold their own copy of 'Medium' or the theme name; the
+        # Categories belong to this call, so nothing outlives the returned list
+        interns = [(FIELD_NAMES.index(name), Categories().intern) for name in TEXT_FIELDS]
+        coasters = []
+        for parts in reader.rows(min_fields=header_count):
+            for idx, intern in interns:
+                parts[idx] = intern(parts[idx])
+            # pass fields in CSV order to Coaster constructor
+            c = Coaster(
+                parts[0], parts[1], parts[2], parts[3],
+                parts[4], parts[5], parts[6], parts[7],
+                parts[8], parts[9], parts[10], parts[11],
+                parts[12], parts[13], parts[14], parts[15],
+                parts[16], parts[17], parts[18], parts[19],
+                parts[20]
+            )
+            coasters.append(c)
 
     return coasters
 
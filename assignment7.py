@@ -1,57 +1,189 @@
 #!/usr/bin/env python3
 """
 Sort rollercoasters by park_id and write to a new CSV file.
-No imports or dictionaries used.
+No dictionaries used. Rows are streamed with the shared csv_rows reader.
+
+Larger-than-memory inputs can be sorted out of core: pass max_rows_in_memory
+and sorted runs are spilled to temporary files, then k-way merged with a heap.
+Rows can also be sorted on several columns (e.g. park_id then excitement).
+Output is written in large batches through csv_io, compressed when
+output_csv ends in .gz, .bz2 or .xz.
+With write_index, a park_index sidecar (<output_csv>.parkindex) records
+where each park_id's block starts, so later per-park lookups can seek
+straight to it (park_index.read_park).
 """
 
-def read_lines(path):
-    with open(path, 'r', encoding='utf-8') as f:
-        return [line.rstrip('\n') for line in f]
+import heapq
+import os
+import tempfile
+
+from csv_io import RowWriter, open_text
+from csv_rows import RowReader, to_float, to_int
+from instrumentation import count_file_bytes, instrumented, stage
+from park_index import ParkIndexBuilder, check_indexable, default_index_path
+
+class Descending:
+    """Wrap a key value so that it sorts in reverse order."""
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __lt__(self, other):
+        return other.value < self.value
+
+    def __eq__(self, other):
+        return self.value == other.value
+
+def park_id_key(value):
+    return to_int(value, default=0)
+
+def column_key(value):
+    """Sort numbers numerically, before any non-numeric text."""
+    number = to_float(value)
+    if number is None:
+        return (1, value)
+    return (0, number)
+
+def make_sort_key(headers, sort_keys):
+    """
+    Return a function mapping a row's parts to its sort key.
+    sort_keys is a list of column names; prefix a name with '-' to sort it descending.
+    park_id keeps its historical integer conversion (non-numeric ids sort as 0).
+    """
+    columns = []
+    for name in sort_keys:
+        descending = name.startswith('-')
+        column = name[1:] if descending else name
+        if column not in headers:
+            raise ValueError("Missing sort column '" + column + "'")
+        convert = park_id_key if column == 'park_id' else column_key
+        columns.append((headers.index(column), convert, descending))
+
+    def sort_key(parts):
+        key = []
+        for idx, convert, descending in columns:
+            value = convert(parts[idx])
+            key.append(Descending(value) if descending else value)
+        return tuple(key)
+
+    return sort_key
 
-def to_int(s, default=None):
-    try:
-        return int(float(s))
-    except Exception:
-        return default
+def write_run(rows, run_dir, run_number):
+    """Write already-sorted rows to a run file and return its path."""
+    path = os.path.join(run_dir, 'run{:05d}.csv'.format(run_number))
+    with RowWriter(path) as out:
+        out.write_lines(line for _, line in rows)
+    return path
 
-def sort_by_park_id_and_write(input_csv, output_csv):
+def read_run(path):
+    with open_text(path) as f:
+        for line in f:
+            yield line.rstrip('\n')
+
+@instrumented('assignment7.sort_by_park_id_and_write', emitted=int)
+def sort_by_park_id_and_write(input_csv, output_csv, sort_keys=None, max_rows_in_memory=None,
+                              write_index=False, index_path=None):
     """
     Read input_csv, sort data rows by numeric park_id (ascending),
     and write header + sorted rows to output_csv.
+    sort_keys optionally sorts on several columns instead, e.g. ['park_id', '-excitement'].
+    With max_rows_in_memory, at most that many rows are held at once: sorted runs
+    are written to temporary files and merged, giving the same stable order.
+    write_index also saves a park_id offset index to index_path (default
+    <output_csv>.parkindex); it needs an uncompressed output_csv and sort_keys,
+    if given, starting with 'park_id'.
     Returns the number of data rows written.
     """
-    lines = read_lines(input_csv)
-    if not lines:
-        # nothing to write
-        with open(output_csv, 'w', encoding='utf-8') as out:
-            out.write('')
-        return 0
-
-    header = lines[0].rstrip('\n')
-    headers = [h.strip() for h in header.split(',')]
-    header_count = len(headers)
-
-    rows = []  # list of tuples (park_id_int, parts_list)
-    for line in lines[1:]:
-        if not line.strip():
-            continue
-        # limit splits so later fields containing commas are preserved
-        parts = [p.strip() for p in line.split(',', header_count - 1)]
-        if len(parts) < header_count:
-            # skip malformed rows
-            continue
-        park_id = to_int(parts[0], default=0)
-        rows.append((park_id, parts))
-
-    # sort by park_id (stable)
-    rows.sort(key=lambda x: x[0])
-
-    with open(output_csv, 'w', encoding='utf-8') as out:
-        out.write(header + '\n')
-        for _, parts in rows:
-            out.write(','.join(parts) + '\n')
-
-    return len(rows)
+    if write_index:
+        check_indexable(output_csv)
+        if sort_keys is not None and (not sort_keys or sort_keys[0] != 'park_id'):
+            raise ValueError("An index needs sort_keys starting with 'park_id'")
+        if index_path is None:
+            index_path = default_index_path(output_csv)
+
+    with RowReader(input_csv) as reader:
+        if reader.header_line is None:
+            # nothing to write
+            with open_text(output_csv, 'w') as out:
+                out.write('')
+            if write_index:
+                ParkIndexBuilder(None, 0).save(index_path, output_csv)
+            return 0
+
+        header = reader.header_line
+        header_count = len(reader.headers)
+        if sort_keys is None:
+            # sort by the first column (park_id), as the original script did
+            sort_key = lambda parts: park_id_key(parts[0])
+        else:
+            sort_key = make_sort_key(reader.headers, sort_keys)
+
+        builder = None
+        if write_index:
+            # the default sort uses the first column, whatever its name
+            park_column = 0 if sort_keys is None else reader.headers.index('park_id')
+            builder = ParkIndexBuilder(header, header_count, park_column)
+
+        if max_rows_in_memory is None:
+            rows = []  # list of tuples (key, parts_list)
+            # the reader limits splits so later fields containing commas are preserved,
+            # and skips malformed rows with fewer than header_count fields
+            with stage('assignment7.scan'):
+                for parts in reader.rows(min_fields=header_count):
+                    rows.append((sort_key(parts), parts))
+
+            # sort by key (stable)
+            with stage('assignment7.sort'):
+                rows.sort(key=lambda x: x[0])
+
+            with stage('assignment7.write'):
+                with RowWriter(output_csv, header) as out:
+                    lines = (','.join(parts) for _, parts in rows)
+                    out.write_lines(lines if builder is None else builder.track(lines))
+                if builder is not None:
+                    builder.save(index_path, output_csv)
+            count_file_bytes(output_csv)
+
+            return len(rows)
+
+        if max_rows_in_memory < 1:
+            raise ValueError('max_rows_in_memory must be at least 1')
+
+        with tempfile.TemporaryDirectory(prefix='sort_runs_') as run_dir:
+            run_paths = []
+            buffer = []  # list of tuples (key, joined_line)
+            written = 0
+            # scanning includes sorting and spilling each full run
+            with stage('assignment7.scan'):
+                for parts in reader.rows(min_fields=header_count):
+                    buffer.append((sort_key(parts), ','.join(parts)))
+                    if len(buffer) >= max_rows_in_memory:
+                        buffer.sort(key=lambda x: x[0])
+                        run_paths.append(write_run(buffer, run_dir, len(run_paths)))
+                        written += len(buffer)
+                        buffer = []
+                buffer.sort(key=lambda x: x[0])
+                written += len(buffer)
+
+            # runs hold the stripped fields joined by ',', so splitting again with the
+            # same limit gives back the same parts and therefore the same key
+            def line_key(line):
+                return sort_key(line.split(',', header_count - 1))
+
+            # heapq.merge breaks ties by run order, and runs follow input order,
+            # so equal keys keep their original relative order (stable)
+            sources = [read_run(path) for path in run_paths]
+            sources.append(line for _, line in buffer)
+            with stage('assignment7.merge'):
+                with RowWriter(output_csv, header) as out:
+                    lines = heapq.merge(*sources, key=line_key)
+                    out.write_lines(lines if builder is None else builder.track(lines))
+                if builder is not None:
+                    builder.save(index_path, output_csv)
+            count_file_bytes(output_csv)
+
+    return written
 
 if __name__ == '__main__':
     INPUT = 'rollercoasters.csv'
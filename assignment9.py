@@ -2,18 +2,16 @@
 """
 Calculate max, median, mean, and mode for max_pos_gs and max_neg_gs.
 Write results as tuples to a new CSV file.
-No imports or dictionaries used.
+Only the two gs columns are converted, straight from bytes, using the
+memory-mapped byte_scanner. The median uses
+quickselect and the mode a hash count, so the statistics scale linearly.
 """
 
-def read_lines(path):
-    with open(path, 'r', encoding='utf-8') as f:
-        return [line.rstrip('\n') for line in f]
-
-def to_float(s, default=None):
-    try:
-        return float(s)
-    except Exception:
-        return default
+from coaster_cache import load_coaster_table
+from byte_scanner import ByteScanner, as_float
+from csv_io import open_text
+from csv_rows import to_float
+from instrumentation import count_file_bytes, instrumented, stage
 
 def find_max(values):
     """Return max value from a list of floats."""
@@ -34,100 +32,165 @@ def find_mean(values):
         total += v
     return total / len(values)
 
+def select_kth(values, k):
+    """Return the k-th smallest value (0-based) of a list using quickselect (average O(n))."""
+    candidates = values
+    while True:
+        # median-of-three pivot keeps already-sorted input from going quadratic
+        a = candidates[0]
+        b = candidates[len(candidates) // 2]
+        c = candidates[-1]
+        pivot = sorted((a, b, c))[1]
+        lows = [v for v in candidates if v < pivot]
+        if k < len(lows):
+            candidates = lows
+            continue
+        pivot_count = len(candidates) - len(lows)
+        highs = [v for v in candidates if v > pivot]
+        pivot_count -= len(highs)
+        if k < len(lows) + pivot_count:
+            return pivot
+        k -= len(lows) + pivot_count
+        candidates = highs
+
 def find_median(values):
     """Return median of a list of floats."""
     if not values:
         return None
-    # sort values using bubble sort
-    sorted_vals = list(values)
-    for i in range(len(sorted_vals)):
-        for j in range(len(sorted_vals) - 1 - i):
-            if sorted_vals[j] > sorted_vals[j + 1]:
-                sorted_vals[j], sorted_vals[j + 1] = sorted_vals[j + 1], sorted_vals[j]
-    n = len(sorted_vals)
+    n = len(values)
     if n % 2 == 1:
-        return sorted_vals[n // 2]
+        return select_kth(values, n // 2)
     else:
-        return (sorted_vals[n // 2 - 1] + sorted_vals[n // 2]) / 2.0
+        return (select_kth(values, n // 2 - 1) + select_kth(values, n // 2)) / 2.0
 
-def find_mode(values):
-    """Return mode (most frequent value) of a list of floats."""
-    if not values:
-        return None
-    max_count = 0
-    mode_val = values[0]
+def count_values(values):
+    """Return a dict value -> count, in order of first appearance."""
+    counts = {}
     for v in values:
-        count = 0
-        for v2 in values:
-            if v == v2:
-                count += 1
+        counts[v] = counts.get(v, 0) + 1
+    return counts
+
+def mode_from_counts(counts):
+    """Return the first value (in first-appearance order) with the highest count."""
+    max_count = 0
+    mode_val = None
+    for v, count in counts.items():
         if count > max_count:
             max_count = count
             mode_val = v
     return mode_val
 
-def calculate_gs_stats_and_write(input_csv, output_csv):
+def median_from_counts(counts):
+    """Return the median of the values described by a dict value -> count."""
+    n = 0
+    for count in counts.values():
+        n += count
+    if n == 0:
+        return None
+    # 0-based positions of the middle value(s)
+    lo_k = (n - 1) // 2
+    hi_k = n // 2
+    lo_val = None
+    seen = 0
+    for v in sorted(counts):
+        seen += counts[v]
+        if lo_val is None and seen > lo_k:
+            lo_val = v
+        if seen > hi_k:
+            if lo_k == hi_k:
+                return v
+            return (lo_val + v) / 2.0
+
+def find_mode(values):
+    """Return mode (most frequent value) of a list of floats."""
+    if not values:
+        return None
+    return mode_from_counts(count_values(values))
+
+def find_stats(values):
+    """
+    Return (max, median, mean, mode) of a list of floats.
+    max, total and value counts come from a single pass; the median uses quickselect.
+    Returns (None, None, None, None) for an empty list.
+    """
+    if not values:
+        return (None, None, None, None)
+    max_val = values[0]
+    total = 0.0
+    counts = {}
+    for v in values:
+        if v > max_val:
+            max_val = v
+        total += v
+        counts[v] = counts.get(v, 0) + 1
+    return (max_val, find_median(values), total / len(values), mode_from_counts(counts))
+
+def write_gs_stats(output_csv, pos_tuple, neg_tuple):
+    """Write (max, median, mean, mode) tuples for max_pos_gs and max_neg_gs to output_csv."""
+    pos_max, pos_median, pos_mean, pos_mode = pos_tuple
+    neg_max, neg_median, neg_mean, neg_mode = neg_tuple
+    with open_text(output_csv, 'w') as out:
+        out.write('metric,max_pos_gs,max_neg_gs\n')
+        out.write('max,{:.2f},{:.2f}\n'.format(pos_max, neg_max))
+        out.write('median,{:.2f},{:.2f}\n'.format(pos_median, neg_median))
+        out.write('mean,{:.2f},{:.2f}\n'.format(pos_mean, neg_mean))
+        out.write('mode,{:.2f},{:.2f}\n'.format(pos_mode, neg_mode))
+
+@instrumented('assignment9.calculate_gs_stats_and_write')
+def calculate_gs_stats_and_write(input_csv, output_csv, use_cache=False):
     """
     Read input_csv, extract max_pos_gs and max_neg_gs columns.
     Calculate max, median, mean, and mode for each.
     Write results as tuples to output_csv.
+    use_cache=True reads the two columns from the binary column cache (coaster_cache),
+    unless the CSV header is not in the assignment6 column order the cache assumes
+    or a gs cell is a literal NaN, which the cache stores like a missing value.
     Returns a tuple ((max_pos_max, max_pos_median, max_pos_mean, max_pos_mode),
                      (max_neg_max, max_neg_median, max_neg_mean, max_neg_mode))
     """
-    lines = read_lines(input_csv)
-    if not lines:
-        with open(output_csv, 'w', encoding='utf-8') as out:
-            out.write('')
-        return (None, None)
-
-    header = lines[0].strip()
-    headers = [h.strip() for h in header.split(',')]
-    header_count = len(headers)
-
-    # find required indices
-    try:
-        idx_max_pos_gs = headers.index('max_pos_gs')
-        idx_max_neg_gs = headers.index('max_neg_gs')
-    except ValueError:
-        raise ValueError('Required header(s) missing')
-
-    max_pos_values = []
-    max_neg_values = []
-
-    for line in lines[1:]:
-        if not line.strip():
-            continue
-        parts = [p.strip() for p in line.split(',', header_count - 1)]
-        if len(parts) < header_count:
-            continue
-        pos_val = to_float(parts[idx_max_pos_gs], default=None)
-        neg_val = to_float(parts[idx_max_neg_gs], default=None)
-        if pos_val is not None:
-            max_pos_values.append(pos_val)
-        if neg_val is not None:
-            max_neg_values.append(neg_val)
+    table = load_coaster_table(input_csv) if use_cache else None
+    # the cache skips short rows just like this report, so only the header matters
+    if (table is not None and len(table) and table.has_standard_header()
+            and table.nan_is_missing('max_pos_gs', 'max_neg_gs')):
+        # missing values are cached as NaN, the only floats not equal to themselves
+        max_pos_values = [v for v in table.columns['max_pos_gs'] if v == v]
+        max_neg_values = [v for v in table.columns['max_neg_gs'] if v == v]
+    else:
+        with ByteScanner(input_csv) as scanner:
+            if scanner.header_line is None:
+                with open_text(output_csv, 'w') as out:
+                    out.write('')
+                return (None, None)
+
+            headers = scanner.headers
+            header_count = len(headers)
+
+            # check required columns
+            if 'max_pos_gs' not in headers or 'max_neg_gs' not in headers:
+                raise ValueError('Required header(s) missing')
+
+            max_pos_values = []
+            max_neg_values = []
+
+            rows = scanner.project(['max_pos_gs', 'max_neg_gs'], min_fields=header_count,
+                                   converters=[as_float, as_float])
+            with stage('assignment9.scan'):
+                for pos_val, neg_val in rows:
+                    if pos_val is not None:
+                        max_pos_values.append(pos_val)
+                    if neg_val is not None:
+                        max_neg_values.append(neg_val)
 
     # calculate stats
-    pos_max = find_max(max_pos_values)
-    pos_median = find_median(max_pos_values)
-    pos_mean = find_mean(max_pos_values)
-    pos_mode = find_mode(max_pos_values)
-
-    neg_max = find_max(max_neg_values)
-    neg_median = find_median(max_neg_values)
-    neg_mean = find_mean(max_neg_values)
-    neg_mode = find_mode(max_neg_values)
-
-    # write to CSV
-    with open(output_csv, 'w', encoding='utf-8') as out:
-        out.write('metric,max_pos_gs,max_neg_gs\n')
-        out.write('max,{:.2f},{:.2f}\n'.format(pos_max, neg_max))
-        out.write('median,{:.2f},{:.2f}\n'.format(pos_median, neg_median))
-        out.write('mean,{:.2f},{:.2f}\n'.format(pos_mean, neg_mean))
-        out.write('mode,{:.2f},{:.2f}\n'.format(pos_mode, neg_mode))
+    with stage('assignment9.stats'):
+        pos_max, pos_median, pos_mean, pos_mode = find_stats(max_pos_values)
+        neg_max, neg_median, neg_mean, neg_mode = find_stats(max_neg_values)
 
     pos_tuple = (pos_max, pos_median, pos_mean, pos_mode)
     neg_tuple = (neg_max, neg_median, neg_mean, neg_mode)
+    with stage('assignment9.write'):
+        write_gs_stats(output_csv, pos_tuple, neg_tuple)
+    count_file_bytes(output_csv)
     return (pos_tuple, neg_tuple)
 
 
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Run the reports over many rollercoasters-format CSV files at once.
+
+Every input file is handled by one task: a single pass (pipeline.run_reports)
+fills an incremental.ReportState and writes the file's rows sorted by
+park_id to a temporary run file.
+
+By default the work runs in two stages:
+  - a thread pool does the I/O: it decompresses each compressed input
+    into a plain local file (zlib, bz2 and lzma release the GIL while
+    decompressing), at most STAGED_PER_WORKER per parse worker at a time
+  - a process pool does the CPU-bound parsing and aggregation, one task
+    per file, started as soon as the file is staged; plain inputs go to
+    it directly
+Parse workers are handed file paths, never file contents, so no data is
+pickled between the stages. use_threads=True runs whole tasks in a single
+thread pool instead, which suits many small files on slow network volumes.
+
+The per-file states are merged in input order, so the merged outputs do
+not depend on which task finished first:
+  - distinct types, theme averages and gs statistics from the merged state
+  - one sorted CSV, k-way merged from the run files (stable across files)
+A file that cannot be read, is missing a required column, or whose header
+differs from the first good file is reported in 'failures' and left out;
+the rest of the batch still runs.
+
+Functions:
+  expand_inputs(inputs)
+    - A directory (its *.csv, *.csv.gz, *.csv.bz2, *.csv.xz files), a glob
+      pattern, or a list of either; returns a sorted list of paths
+  run_batch(inputs, sorted_csv=None, gs_csv=None, workers=None, use_threads=False,
+            io_workers=IO_WORKERS)
+    - Returns a dict with 'files', 'failures' [(path, message)],
+      'distinct_types', 'theme_averages', 'gs_stats' and 'sorted_rows'
+"""
+
+import glob
+import heapq
+import os
+import shutil
+import sys
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from functools import partial
+
+from assignment7 import park_id_key
+from assignment9 import write_gs_stats
+from csv_io import BUFFER_BYTES, RowWriter, is_compressed, open_binary, open_text
+from incremental import ReportState
+from pipeline import SortByParkReport, run_reports
+
+INPUT_PATTERNS = ('*.csv', '*.csv.gz', '*.csv.bz2', '*.csv.xz')
+# rows folded into a file's ReportState at a time
+BATCH_ROWS = 4096
+# threads staging (decompressing) inputs
+IO_WORKERS = 4
+# staged files that may wait for or be in parsing, per parse worker
+STAGED_PER_WORKER = 2
+
+
+class StateReport:
+    """
+    Pipeline consumer folding a file's rows into a ReportState; returns
+    (header_line, state), or (None, None) for an empty file.
+    """
+
+    def start(self, headers, header_line):
+        self.headers = headers
+        self.header_line = header_line
+        self.state = ReportState()
+        self.pending = []
+
+    def feed(self, parts):
+        # fold in bounded batches, so memory does not grow with the file
+        self.pending.append(parts)
+        if len(self.pending) >= BATCH_ROWS:
+            self.state.update(self.pending, self.headers)
+            self.pending = []
+
+    def finish(self):
+        if self.header_line is None:
+            return (None, None)
+        self.state.update(self.pending, self.headers)
+        self.pending = []
+        return (self.header_line, self.state)
+
+
+def expand_inputs(inputs):
+    if isinstance(inputs, str):
+        inputs = [inputs]
+    paths = set()
+    for spec in inputs:
+        if os.path.isdir(spec):
+            for pattern in INPUT_PATTERNS:
+                paths.update(glob.glob(os.path.join(spec, pattern)))
+        elif glob.has_magic(spec):
+            paths.update(glob.glob(spec))
+        else:
+            paths.add(spec)
+    return sorted(paths)
+
+def process_file(path, run_path):
+    """
+    Return (path, header_line, state, sorted row count, error message or None).
+    Runs in a worker; any error is returned rather than raised.
+    """
+    try:
+        reports = [StateReport()]
+        if run_path is not None:
+            reports.append(SortByParkReport(run_path))
+        results = run_reports(path, reports)
+        header_line, state = results[0]
+        if state is None:
+            # empty file: nothing to merge
+            return (path, None, None, 0, None)
+        rows = results[1] if run_path is not None else 0
+        return (path, header_line, state, rows, None)
+    except Exception as e:
+        return (path, None, None, 0, '{}: {}'.format(type(e).__name__, e))
+
+def stage_file(path, staged_path, slots):
+    """I/O stage: decompress path into the plain file staged_path once a slot is free."""
+    slots.acquire()
+    try:
+        with open_binary(path) as src, open(staged_path, 'wb') as out:
+            shutil.copyfileobj(src, out, BUFFER_BYTES)
+    except BaseException:
+        release_staged(staged_path, slots)
+        raise
+    return staged_path
+
+def release_staged(staged_path, slots, future=None):
+    """Delete a staged file and free its slot (also a parse future's done callback)."""
+    if os.path.exists(staged_path):
+        os.remove(staged_path)
+    slots.release()
+
+def task_outcome(path, future):
+    """process_file's result for path, with path restored if a staged copy was parsed."""
+    try:
+        return (path,) + future.result()[1:]
+    except Exception as e:
+        # e.g. a worker process died
+        return (path, None, None, 0, '{}: {}'.format(type(e).__name__, e))
+
+def run_staged(paths, run_paths, stage_dir, workers, io_workers):
+    """Run process_file for every path: I/O threads stage, a process pool parses."""
+    slots = threading.BoundedSemaphore(STAGED_PER_WORKER * workers)
+    outcomes = [None] * len(paths)
+    parsing = {}
+    with ThreadPoolExecutor(max_workers=io_workers) as io_pool, \
+            ProcessPoolExecutor(max_workers=workers) as pool:
+        staging = {}
+        for i, path in enumerate(paths):
+            if is_compressed(path):
+                staged_path = os.path.join(stage_dir, 'input{:06d}.csv'.format(i))
+                staging[io_pool.submit(stage_file, path, staged_path, slots)] = i
+            else:
+                parsing[i] = pool.submit(process_file, path, run_paths[i])
+        for future in as_completed(staging):
+            i = staging[future]
+            try:
+                staged_path = future.result()
+            except Exception as e:
+                outcomes[i] = (paths[i], None, None, 0, '{}: {}'.format(type(e).__name__, e))
+                continue
+            parse = pool.submit(process_file, staged_path, run_paths[i])
+            parse.add_done_callback(partial(release_staged, staged_path, slots))
+            parsing[i] = parse
+        for i, future in parsing.items():
+            outcomes[i] = task_outcome(paths[i], future)
+    return outcomes
+
+def read_sorted_run(path):
+    with open_text(path) as f:
+        f.readline()  # header
+        for line in f:
+            yield line.rstrip('\n')
+
+def run_batch(inputs, sorted_csv=None, gs_csv=None, workers=None, use_threads=False,
+              io_workers=IO_WORKERS):
+    """Process every input file concurrently and merge the results."""
+    paths = expand_inputs(inputs)
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    with tempfile.TemporaryDirectory(prefix='batch_runs_') as run_dir:
+        run_paths = [None] * len(paths)
+        if sorted_csv is not None:
+            run_paths = [os.path.join(run_dir, 'run{:06d}.csv'.format(i))
+                         for i in range(len(paths))]
+        outcomes = []
+        if paths and use_threads:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                futures = [pool.submit(process_file, path, run_path)
+                           for path, run_path in zip(paths, run_paths)]
+                outcomes = [task_outcome(path, future) for path, future in zip(paths, futures)]
+        elif paths:
+            outcomes = run_staged(paths, run_paths, run_dir, workers, io_workers)
+
+        merged = ReportState()
+        failures = []
+        header_line = None
+        header_path = None
+        good_runs = []
+        files = 0
+        for (path, file_header, state, rows, error), run_path in zip(outcomes, run_paths):
+            if error is not None:
+                failures.append((path, error))
+                continue
+            if state is None:
+                continue
+            if header_line is None:
+                header_line = file_header
+                header_path = path
+            elif file_header != header_line:
+                failures.append((path, 'header differs from ' + header_path))
+                continue
+            merged.merge(state)
+            files += 1
+            if run_path is not None:
+                good_runs.append(run_path)
+
+        sorted_rows = 0
+        if sorted_csv is not None:
+            if header_line is None:
+                with open_text(sorted_csv, 'w') as out:
+                    out.write('')
+            else:
+                # heapq.merge takes equal park_ids from earlier files first
+                sources = [read_sorted_run(run_path) for run_path in good_runs]
+                with RowWriter(sorted_csv, header_line) as out:
+                    out.write_lines(heapq.merge(
+                        *sources, key=lambda line: park_id_key(line.split(',', 1)[0])))
+                    sorted_rows = out.rows_written
+
+    results = merged.results()
+    pos_stats, neg_stats = results['gs_stats']
+    if gs_csv is not None and pos_stats[0] is not None and neg_stats[0] is not None:
+        write_gs_stats(gs_csv, pos_stats, neg_stats)
+    results['files'] = files
+    results['failures'] = failures
+    results['sorted_rows'] = sorted_rows
+    return results
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2:
+        print('Usage: python batch.py DIRECTORY_OR_GLOB [sorted.csv] [gs_statistics.csv]')
+        sys.exit(1)
+    SORTED = sys.argv[2] if len(sys.argv) > 2 else 'batch_sorted_by_park_id.csv'
+    GS = sys.argv[3] if len(sys.argv) > 3 else 'batch_gs_statistics.csv'
+    summary = run_batch(sys.argv[1], SORTED, GS)
+    print(f"Processed {summary['files']} files, {summary['sorted_rows']} rows -> {SORTED}, {GS}")
+    print('Distinct rollercoaster types:', len(summary['distinct_types']))
+    print('Themes with High excitement averages:', len(summary['theme_averages']))
+    for path, message in summary['failures']:
+        print('FAILED', path + ':', message)
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Per-row cost of narrow column queries: csv_rows.RowReader versus the
+memory-mapped byte_scanner.ByteScanner.
+
+The assignment3 query (rollercoaster_type as text) and the assignment9
+query (max_pos_gs and max_neg_gs as floats) are run both ways over a
+scaled-up copy of rollercoasters.csv and checked for identical results.
+
+Usage:
+  python bench_byte_scanner.py [rows]
+"""
+
+import os
+import sys
+import tempfile
+
+from bench_parallel import build_input
+from benchmark_suite import time_call
+from byte_scanner import ByteScanner, as_float
+from csv_rows import RowReader, to_float
+
+def types_with_row_reader(path):
+    with RowReader(path) as reader:
+        idx = reader.headers.index('rollercoaster_type')
+        return [parts[idx] for parts in reader.rows(min_fields=idx + 1)]
+
+def types_with_byte_scanner(path):
+    with ByteScanner(path) as scanner:
+        return [value for (value,) in scanner.project(['rollercoaster_type'])]
+
+def gs_with_row_reader(path):
+    with RowReader(path) as reader:
+        idx_pos = reader.headers.index('max_pos_gs')
+        idx_neg = reader.headers.index('max_neg_gs')
+        return [(to_float(parts[idx_pos]), to_float(parts[idx_neg]))
+                for parts in reader.rows(min_fields=len(reader.headers))]
+
+def gs_with_byte_scanner(path):
+    with ByteScanner(path) as scanner:
+        return list(scanner.project(['max_pos_gs', 'max_neg_gs'],
+                                    min_fields=len(scanner.headers),
+                                    converters=[as_float, as_float]))
+
+def main(rows=500000):
+    fd, path = tempfile.mkstemp(suffix='.csv')
+    os.close(fd)
+    try:
+        build_input(path, rows)
+        print(f"{rows} rows")
+        print(f"{'query':<22} {'RowReader ns/row':>17} {'ByteScanner ns/row':>19} {'speedup':>8}")
+        for label, slow, fast in (('rollercoaster_type', types_with_row_reader, types_with_byte_scanner),
+                                  ('max_pos/neg_gs', gs_with_row_reader, gs_with_byte_scanner)):
+            slow_s, slow_result = time_call(slow, path)
+            fast_s, fast_result = time_call(fast, path)
+            if slow_result != fast_result:
+                raise AssertionError(label + ': results differ')
+            print(f"{label:<22} {slow_s / rows * 1e9:>17.0f} {fast_s / rows * 1e9:>19.0f} "
+                  f"{slow_s / fast_s:>7.1f}x")
+    finally:
+        os.remove(path)
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500000)
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Benchmark the assignment9 statistics engine and show how it scales.
+
+For each size n, random gs-like values (two decimals, so the mode is
+meaningful) are generated and find_stats is timed. The old bubble-sort
+median and nested-loop mode are timed too while n is small enough for
+them to finish, and their results are checked against the new engine.
+
+Usage:
+  python bench_gs_stats.py [max_n]
+"""
+
+import random
+import sys
+
+from assignment9 import find_stats
+from benchmark_suite import time_call
+
+SIZES = [1000, 2000, 4000, 10000, 100000, 1000000, 10000000]
+LEGACY_LIMIT = 4000
+
+def legacy_median(values):
+    sorted_vals = list(values)
+    for i in range(len(sorted_vals)):
+        for j in range(len(sorted_vals) - 1 - i):
+            if sorted_vals[j] > sorted_vals[j + 1]:
+                sorted_vals[j], sorted_vals[j + 1] = sorted_vals[j + 1], sorted_vals[j]
+    n = len(sorted_vals)
+    if n % 2 == 1:
+        return sorted_vals[n // 2]
+    return (sorted_vals[n // 2 - 1] + sorted_vals[n // 2]) / 2.0
+
+def legacy_mode(values):
+    max_count = 0
+    mode_val = values[0]
+    for v in values:
+        count = 0
+        for v2 in values:
+            if v == v2:
+                count += 1
+        if count > max_count:
+            max_count = count
+            mode_val = v
+    return mode_val
+
+def make_values(n, rng):
+    return [round(rng.gauss(3.2, 0.9), 2) for _ in range(n)]
+
+def main(max_n=1000000):
+    rng = random.Random(210)
+    print(f"{'n':>9} {'find_stats s':>13} {'ns/value':>9} {'legacy s':>10}")
+    for n in SIZES:
+        if n > max_n:
+            break
+        values = make_values(n, rng)
+        elapsed, stats = time_call(find_stats, values)
+        legacy = '-'
+        if n <= LEGACY_LIMIT:
+            legacy_s, (median, mode) = time_call(
+                lambda: (legacy_median(values), legacy_mode(values)))
+            legacy = '{:.3f}'.format(legacy_s)
+            if (median, mode) != (stats[1], stats[3]):
+                raise AssertionError('find_stats disagrees with the legacy median/mode')
+        print(f"{n:>9} {elapsed:>13.4f} {elapsed / n * 1e9:>9.0f} {legacy:>10}")
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000)
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Compare serial and multi-process throughput of the assignment4 filter and
+the assignment5 theme averages.
+
+A larger input is built by repeating the data rows of rollercoasters.csv,
+then each function is timed with workers=None (serial) and with a growing
+number of worker processes.
+
+Usage:
+  python bench_parallel.py [rows] [max_workers]
+"""
+
+import os
+import sys
+import tempfile
+
+from assignment4 import coasters_medium_excitement_high_intensity
+from assignment5 import avg_high_excitement_intensity_by_theme
+from benchmark_suite import time_call
+
+SOURCE_CSV = 'rollercoasters.csv'
+
+def build_input(path, rows):
+    """Write a CSV of about rows data lines by repeating the sample rows."""
+    with open(SOURCE_CSV, 'r', encoding='utf-8') as f:
+        header = f.readline()
+        sample = [line if line.endswith('\n') else line + '\n' for line in f if line.strip()]
+    written = 0
+    with open(path, 'w', encoding='utf-8') as out:
+        out.write(header)
+        while written < rows:
+            chunk = sample[:rows - written]
+            out.writelines(chunk)
+            written += len(chunk)
+
+def main(rows=2000000, max_workers=None):
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    worker_counts = [None]
+    w = 2
+    while w <= max_workers:
+        worker_counts.append(w)
+        w *= 2
+    fd, path = tempfile.mkstemp(suffix='.csv')
+    os.close(fd)
+    try:
+        build_input(path, rows)
+        print(f"{rows} rows, {os.path.getsize(path) / 1e6:.1f} MB")
+        print(f"{'function':<42} {'workers':>7} {'seconds':>8} {'rows/s':>11} {'speedup':>7}")
+        for func in (coasters_medium_excitement_high_intensity,
+                     avg_high_excitement_intensity_by_theme):
+            serial = None
+            for workers in worker_counts:
+                elapsed, _ = time_call(func, path, workers=workers)
+                if serial is None:
+                    serial = elapsed
+                label = 'serial' if workers is None else str(workers)
+                print(f"{func.__name__:<42} {label:>7} {elapsed:>8.2f} "
+                      f"{rows / elapsed:>11.0f} {serial / elapsed:>6.1f}x")
+    finally:
+        os.remove(path)
+
+if __name__ == '__main__':
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 2000000
+    n_workers = int(sys.argv[2]) if len(sys.argv) > 2 else None
+    main(n_rows, n_workers)
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Reproducible benchmark of every public report function (assignments 3-9).
+
+For each size, a synthetic input is generated with synthetic_data (fixed
+seed, so every revision sees the same data) and each function is run
+twice: once for wall time, once under tracemalloc for peak Python heap
+use. Results are written as JSON so two revisions can be compared.
+time_call is the timing helper shared with the bench_*.py scripts.
+
+Usage:
+  python benchmark_suite.py [--sizes 1e3 1e4 1e5] [--output results.json]
+                            [--data-dir DIR] [--baseline old.json] [--no-memory]
+  python benchmark_suite.py --compare old.json new.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+import tracemalloc
+
+import assignment3
+from assignment4 import coasters_medium_excitement_high_intensity
+from assignment5 import avg_high_excitement_intensity_by_theme
+from assignment6 import build_coasters_from_csv
+from assignment7 import sort_by_park_id_and_write
+from assignment8 import categorize_avg_speed_and_write
+from assignment9 import calculate_gs_stats_and_write
+from synthetic_data import write_synthetic_csv
+
+DEFAULT_SIZES = [1000, 10000, 100000]
+SEED = 210
+
+def run_assignment3(csv_path, out_dir):
+    # assignment3 reads its module-level CSV_PATH and prints the result
+    saved = assignment3.CSV_PATH
+    assignment3.CSV_PATH = csv_path
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            assignment3.main()
+    finally:
+        assignment3.CSV_PATH = saved
+
+# (name, callable(csv_path, out_dir)) for every benchmarked function
+BENCHMARKS = [
+    ('assignment3.main', run_assignment3),
+    ('assignment4.coasters_medium_excitement_high_intensity',
+     lambda csv_path, out_dir: coasters_medium_excitement_high_intensity(csv_path)),
+    ('assignment5.avg_high_excitement_intensity_by_theme',
+     lambda csv_path, out_dir: avg_high_excitement_intensity_by_theme(csv_path)),
+    ('assignment6.build_coasters_from_csv',
+     lambda csv_path, out_dir: build_coasters_from_csv(csv_path)),
+    ('assignment7.sort_by_park_id_and_write',
+     lambda csv_path, out_dir: sort_by_park_id_and_write(
+         csv_path, os.path.join(out_dir, 'sorted.csv'))),
+    ('assignment8.categorize_avg_speed_and_write',
+     lambda csv_path, out_dir: categorize_avg_speed_and_write(
+         csv_path, os.path.join(out_dir, 'by_avg_speed.csv'))),
+    ('assignment9.calculate_gs_stats_and_write',
+     lambda csv_path, out_dir: calculate_gs_stats_and_write(
+         csv_path, os.path.join(out_dir, 'gs_statistics.csv'))),
+]
+
+def git_revision():
+    try:
+        out = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                             text=True, check=True,
+                             cwd=os.path.dirname(os.path.abspath(__file__)))
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def dataset_path(data_dir, rows):
+    """Return the path of the synthetic input for rows, generating it if needed."""
+    path = os.path.join(data_dir, 'synthetic_{}_{}.csv'.format(rows, SEED))
+    if not os.path.exists(path):
+        write_synthetic_csv(path, rows, SEED)
+    return path
+
+def time_call(func, *args, **kwargs):
+    """Return (seconds, result) of one call of func(*args, **kwargs)."""
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+def measure(func, csv_path, out_dir, memory=True):
+    """Return (seconds, peak traced bytes or None) for one call of func."""
+    seconds, _ = time_call(func, csv_path, out_dir)
+    peak = None
+    if memory:
+        tracemalloc.start()
+        try:
+            func(csv_path, out_dir)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return seconds, peak
+
+def run_suite(sizes, data_dir, memory=True):
+    results = []
+    with tempfile.TemporaryDirectory(prefix='bench_out_') as out_dir:
+        for rows in sizes:
+            csv_path = dataset_path(data_dir, rows)
+            for name, func in BENCHMARKS:
+                seconds, peak = measure(func, csv_path, out_dir, memory)
+                results.append({
+                    'function': name,
+                    'rows': rows,
+                    'seconds': seconds,
+                    'rows_per_second': rows / seconds if seconds > 0 else None,
+                    'peak_bytes': peak,
+                })
+                peak_text = '-' if peak is None else '{:.1f} MB'.format(peak / 1e6)
+                print(f"{name:<55} {rows:>9} {seconds:>9.3f}s {peak_text:>10}")
+    return {
+        'revision': git_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'seed': SEED,
+        'results': results,
+    }
+
+def compare(baseline, current):
+    """Print the time and memory ratio current/baseline for every shared measurement."""
+    base = {(r['function'], r['rows']): r for r in baseline['results']}
+    print(f"baseline {baseline.get('revision')} -> current {current.get('revision')}")
+    print(f"{'function':<55} {'rows':>9} {'time x':>7} {'memory x':>9}")
+    for r in current['results']:
+        old = base.get((r['function'], r['rows']))
+        if old is None:
+            continue
+        time_ratio = r['seconds'] / old['seconds'] if old['seconds'] else float('nan')
+        if r['peak_bytes'] and old['peak_bytes']:
+            mem_text = '{:.2f}'.format(r['peak_bytes'] / old['peak_bytes'])
+        else:
+            mem_text = '-'
+        print(f"{r['function']:<55} {r['rows']:>9} {time_ratio:>7.2f} {mem_text:>9}")
+
+def load_results(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', nargs='+', type=lambda s: int(float(s)), default=DEFAULT_SIZES,
+                        help='row counts to benchmark, e.g. 1e3 1e5 1e7')
+    parser.add_argument('--output', default='benchmark_results.json')
+    parser.add_argument('--data-dir', help='keep and reuse generated inputs in this directory')
+    parser.add_argument('--baseline', help='results file to compare the new run against')
+    parser.add_argument('--no-memory', action='store_true', help='skip the tracemalloc run')
+    parser.add_argument('--compare', nargs=2, metavar=('OLD', 'NEW'),
+                        help='only compare two existing results files')
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        compare(load_results(args.compare[0]), load_results(args.compare[1]))
+        return
+
+    if args.data_dir:
+        os.makedirs(args.data_dir, exist_ok=True)
+        report = run_suite(args.sizes, args.data_dir, not args.no_memory)
+    else:
+        with tempfile.TemporaryDirectory(prefix='bench_data_') as data_dir:
+            report = run_suite(args.sizes, data_dir, not args.no_memory)
+    with open(args.output, 'w', encoding='utf-8') as out:
+        json.dump(report, out, indent=2)
+    print('Wrote', args.output)
+    if args.baseline:
+        compare(load_results(args.baseline), report)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Bin the rows of rollercoasters.csv by any numeric column into N buckets.
+
+edges is a sorted list of bucket boundaries; len(edges) + 1 buckets are
+made. Bucket i holds edges[i-1] <= value < edges[i] (the first
+bucket is open below, the last open above). With include_last_edge=True a
+value equal to edges[-1] stays in the bucket below it, which is how
+assignment8's Medium bucket keeps low <= avg_speed <= high.
+A NaN value falls in no interval: its row is skipped, unless nan_bucket
+names the bucket to put it in (assignment8 uses its Medium bucket, where
+the original if/elif/else chain left NaN).
+
+Rows are read in batches and each batch is bucketed with bisect. Duplicate
+rows (same key columns and formatted value) are dropped per bucket using a
+set of 64-bit row hashes rather than the row strings. Each bucket streams
+to its own spill file, and the spill files are joined in bucket order at
+the end, so the kept rows are never all in memory at once. The output is
+compressed when output_csv ends in .gz, .bz2 or .xz (see csv_io).
+
+Functions:
+  bucket_indices(values, edges, include_last_edge=False, nan_bucket=None)
+    - Returns the bucket number of every value (nan_bucket for NaN)
+  bin_column_and_write(input_csv, output_csv, column, edges, labels=None, ...)
+    - Writes category,<key columns>,<column> rows grouped by bucket and
+      returns the histogram: [(label, lower, upper, rows, duplicates)]
+  write_histogram(path, histogram)
+"""
+
+import math
+import os
+import shutil
+import tempfile
+from bisect import bisect_right
+
+from csv_io import BUFFER_BYTES, RowWriter, open_text
+from csv_rows import RowReader, to_float
+from instrumentation import count_file_bytes, stage
+from sketches import hash64
+
+DEFAULT_KEY_COLUMNS = ('park_id', 'theme', 'rollercoaster_type')
+# rows bucketed per bisect batch
+BATCH_ROWS = 4096
+
+def check_edges(edges):
+    edges = [float(e) for e in edges]
+    for lo, hi in zip(edges, edges[1:]):
+        if lo > hi:
+            raise ValueError('edges must be sorted')
+    return edges
+
+def bucket_indices(values, edges, include_last_edge=False, nan_bucket=None):
+    """Return the bucket number (0..len(edges)) of each value; NaN gets nan_bucket."""
+    indices = [bisect_right(edges, v) for v in values]
+    # bisect would put NaN, which fails every comparison, in the last bucket
+    if True in map(math.isnan, values):
+        for i, v in enumerate(values):
+            if v != v:
+                indices[i] = nan_bucket
+    if include_last_edge and edges:
+        last = edges[-1]
+        top = len(edges)
+        for i, v in enumerate(values):
+            if v == last and indices[i] == top:
+                indices[i] = top - 1
+    return indices
+
+def default_labels(edges):
+    labels = ['< {:g}'.format(edges[0])] if edges else ['all']
+    for lo, hi in zip(edges, edges[1:]):
+        labels.append('{:g}-{:g}'.format(lo, hi))
+    if edges:
+        labels.append('>= {:g}'.format(edges[-1]))
+    return labels
+
+def bin_column_and_write(input_csv, output_csv, column, edges, labels=None,
+                         key_columns=DEFAULT_KEY_COLUMNS, include_last_edge=False,
+                         summary_csv=None, nan_bucket=None):
+    """
+    Read input_csv and write every row with a numeric column value to output_csv as
+      category,<key columns...>,<column>  (value formatted with 2 decimals)
+    grouped by bucket in edge order, keeping the first of any duplicate rows.
+    Rows with fewer fields than the header, or a missing/non-numeric value, are skipped;
+    so are NaN values, unless nan_bucket gives the bucket number for them.
+    Returns the histogram [(label, lower, upper, rows, duplicates)], lower/upper
+    None for the open ends; it is also written to summary_csv if given.
+    """
+    edges = check_edges(edges)
+    if nan_bucket is not None and not 0 <= nan_bucket <= len(edges):
+        raise ValueError('nan_bucket must be a bucket number')
+    if labels is None:
+        labels = default_labels(edges)
+    if len(labels) != len(edges) + 1:
+        raise ValueError('Need one label per bucket (len(edges) + 1)')
+    n_buckets = len(labels)
+    counts = [0] * n_buckets
+    duplicates = [0] * n_buckets
+
+    with RowReader(input_csv) as reader:
+        if reader.header_line is None:
+            with open_text(output_csv, 'w') as out:
+                out.write('')
+            histogram = make_histogram(labels, edges, counts, duplicates)
+            if summary_csv is not None:
+                write_histogram(summary_csv, histogram)
+            return histogram
+
+        headers = reader.headers
+        header_count = len(headers)
+        try:
+            key_idxs = [headers.index(name) for name in key_columns]
+            idx_value = headers.index(column)
+        except ValueError:
+            raise ValueError('Required header(s) missing')
+
+        with tempfile.TemporaryDirectory(prefix='bins_') as spill_dir:
+            spill_paths = [os.path.join(spill_dir, 'bucket{}.csv'.format(i))
+                           for i in range(n_buckets)]
+            # spills stay uncompressed; batches bound the memory per bucket
+            spills = [RowWriter(path) for path in spill_paths]
+            try:
+                seen = [set() for _ in range(n_buckets)]
+
+                def flush(batch_values, batch_keys):
+                    buckets = bucket_indices(batch_values, edges, include_last_edge, nan_bucket)
+                    for bucket, key in zip(buckets, batch_keys):
+                        # unit separator, so fields holding commas can't collide
+                        h = hash64('\x1f'.join(key))
+                        if h in seen[bucket]:
+                            duplicates[bucket] += 1
+                            continue
+                        seen[bucket].add(h)
+                        counts[bucket] += 1
+                        key.insert(0, labels[bucket])
+                        spills[bucket].write_row(key)
+
+                with stage('binning.scan'):
+                    batch_values = []
+                    batch_keys = []
+                    for parts in reader.rows(min_fields=header_count):
+                        value = to_float(parts[idx_value], default=None)
+                        if value is None or (value != value and nan_bucket is None):
+                            continue
+                        key = [parts[i] for i in key_idxs]
+                        key.append("{:.2f}".format(value))
+                        batch_values.append(value)
+                        batch_keys.append(key)
+                        if len(batch_values) >= BATCH_ROWS:
+                            flush(batch_values, batch_keys)
+                            batch_values = []
+                            batch_keys = []
+                    flush(batch_values, batch_keys)
+            finally:
+                for spill in spills:
+                    spill.close()
+
+            with stage('binning.write'):
+                with open_text(output_csv, 'w') as out:
+                    out.write(','.join(['category'] + list(key_columns) + [column]) + '\n')
+                    for path in spill_paths:
+                        with open_text(path) as spill:
+                            shutil.copyfileobj(spill, out, BUFFER_BYTES)
+            count_file_bytes(output_csv)
+
+    histogram = make_histogram(labels, edges, counts, duplicates)
+    if summary_csv is not None:
+        write_histogram(summary_csv, histogram)
+    return histogram
+
+def make_histogram(labels, edges, counts, duplicates):
+    lowers = [None] + edges
+    uppers = edges + [None]
+    return list(zip(labels, lowers, uppers, counts, duplicates))
+
+def write_histogram(path, histogram):
+    with open_text(path, 'w') as out:
+        out.write('bucket,lower,upper,rows,duplicates\n')
+        for label, lower, upper, rows, dups in histogram:
+            out.write(','.join([label, '' if lower is None else '{:g}'.format(lower),
+                                '' if upper is None else '{:g}'.format(upper),
+                                str(rows), str(dups)]) + '\n')
+
+
+if __name__ == '__main__':
+    IN = 'rollercoasters.csv'
+    OUT = 'rollercoasters_by_max_speed.csv'
+    hist = bin_column_and_write(IN, OUT, 'max_speed', [40, 50, 60, 70])
+    for label, lower, upper, rows, dups in hist:
+        print(f"{label:>8}: {rows:>4} rows" + (f" ({dups} duplicates)" if dups else ''))
+    print(f"Wrote {sum(h[3] for h in hist)} rows to {OUT}")
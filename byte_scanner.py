@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Memory-mapped byte scanner with column projection.
+
+RowReader decodes every line to str and strips every field, even when a
+caller only needs one or two columns. ByteScanner maps the file and works
+on bytes instead: lines come from mmap.readline, only the commas up to the
+last requested column are split, and only the requested fields are decoded
+or converted. Numeric fields go straight from bytes to float.
+
+Compressed files (.gz/.bz2/.xz) cannot be mapped; they are read through a
+decompressing stream with the same readline interface instead.
+
+Row rules match csv_rows: blank lines are skipped, a row has at most
+header_count fields (the last one keeps any extra commas), and rows with
+fewer than min_fields fields are skipped as malformed.
+
+Class:
+  ByteScanner(path)
+    - Context manager; header_line / headers as in csv_rows.RowReader
+    - project(columns, min_fields=0, converters=None) yields a tuple per
+      row holding only the requested columns; converters (one per column,
+      applied to the raw bytes) default to as_text; rows too short to
+      hold every requested column are always skipped
+"""
+
+import mmap
+import os
+
+import instrumentation
+from csv_io import is_compressed, open_binary
+from csv_rows import parse_header
+
+def as_text(raw):
+    """Decode and strip a raw field."""
+    return raw.decode('utf-8').strip()
+
+def as_float(raw, default=None):
+    """Convert a raw field to float (float() skips surrounding whitespace itself)."""
+    try:
+        return float(raw)
+    except Exception:
+        return default
+
+
+class ByteScanner:
+    def __init__(self, path):
+        self.path = path
+        self.f = open_binary(path)
+        self.mm = None
+        self.header_line = None
+        self.headers = []
+        if is_compressed(path):
+            # mm is only used through readline/seek, which the stream also has
+            stream = self.f
+        elif os.fstat(self.f.fileno()).st_size == 0:
+            return
+        else:
+            stream = mmap.mmap(self.f.fileno(), 0, access=mmap.ACCESS_READ)
+        header = stream.readline()
+        if not header:
+            self.f.close()
+            return
+        self.mm = stream
+        self.header_line = header.decode('utf-8').rstrip('\n')
+        self.headers = parse_header(self.header_line)
+        self.data_start = self.mm.tell()
+
+    def project(self, columns, min_fields=0, converters=None):
+        """Return a generator of a tuple of the requested columns for every well-formed data row."""
+        if self.mm is None:
+            return iter(())
+        idxs = []
+        for name in columns:
+            if name not in self.headers:
+                raise ValueError("Missing header '" + name + "'")
+            idxs.append(self.headers.index(name))
+        if converters is None:
+            converters = [as_text] * len(idxs)
+        header_count = len(self.headers)
+        # every requested column must exist in a row, whatever min_fields says
+        min_fields = max(min_fields, max(idxs) + 1)
+        # split just past the last needed column; a row has at most header_count fields
+        max_split = min(max(idxs) + 1, header_count - 1)
+        # with the header_count - 1 split limit a row has min(commas + 1, header_count)
+        # fields, so it is long enough exactly when it has min_fields - 1 commas
+        min_commas = min(min_fields, header_count) - 1
+        pairs = list(zip(idxs, converters))
+
+        self.mm.seek(self.data_start)
+        if instrumentation.enabled:
+            return self._project_counted(pairs, max_split, min_commas)
+        return self._project(pairs, max_split, min_commas)
+
+    def _project(self, pairs, max_split, min_commas):
+        readline = self.mm.readline
+        single = len(pairs) == 1
+        while True:
+            line = readline()
+            if not line:
+                break
+            if not line.strip():
+                continue
+            if min_commas > 0 and line.count(b',') < min_commas:
+                continue
+            parts = line.split(b',', max_split)
+            if single:
+                idx, convert = pairs[0]
+                yield (convert(parts[idx]),)
+            else:
+                yield tuple([convert(parts[idx]) for idx, convert in pairs])
+
+    def _project_counted(self, pairs, max_split, min_commas):
+        """_project that also feeds the rows_read/parsed/skipped counters."""
+        readline = self.mm.readline
+        read = 0
+        skipped = 0
+        try:
+            while True:
+                line = readline()
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                read += 1
+                if min_commas > 0 and line.count(b',') < min_commas:
+                    skipped += 1
+                    continue
+                parts = line.split(b',', max_split)
+                yield tuple([convert(parts[idx]) for idx, convert in pairs])
+        finally:
+            instrumentation.count('rows_read', read)
+            instrumentation.count('rows_parsed', read - skipped)
+            instrumentation.count('rows_skipped', skipped)
+
+    def close(self):
+        if self.mm is not None and self.mm is not self.f:
+            self.mm.close()
+        self.f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Dictionary encoding for the low-cardinality text columns of rollercoasters.csv.
+
+theme, rollercoaster_type and the three *_rating columns only take a
+handful of distinct values. A Categories object maps each distinct string
+to a small integer code (in first-seen order) and back, so that:
+  - filters compare codes: look the constant up once with lookup(), then
+    test code == medium per row instead of comparing strings
+  - group-bys index straight into lists or arrays by code instead of
+    hashing the group string into a dict for every row
+  - rows share one string object per distinct value (intern) instead of
+    holding a fresh copy each
+
+CoasterTable (and so the binary column cache) stores its text columns as
+these codes. A Categories object is not synchronized and grows with every
+new value, so each table or build gets its own rather than sharing a
+process-wide one.
+
+Class:
+  Categories(values=())
+    - encode(value) -> code, adding value if new
+    - lookup(value) -> code, or MISSING_CODE (-1, never a real code)
+    - decode(code), intern(value), values (list by code), codes (dict)
+"""
+
+# assignment6.TEXT_FIELDS; spelled out because assignment6 imports this module
+CATEGORICAL_FIELDS = ('theme', 'rollercoaster_type', 'excitement_rating',
+                      'intensity_rating', 'nausea_rating')
+MISSING_CODE = -1
+
+
+class Categories:
+    def __init__(self, values=()):
+        self.values = []  # code -> string
+        self.codes = {}  # string -> code
+        for value in values:
+            self.encode(value)
+
+    def encode(self, value):
+        code = self.codes.get(value)
+        if code is None:
+            code = len(self.values)
+            self.codes[value] = code
+            self.values.append(value)
+        return code
+
+    def lookup(self, value):
+        """Return the code of value without adding it; MISSING_CODE if unseen."""
+        return self.codes.get(value, MISSING_CODE)
+
+    def decode(self, code):
+        return self.values[code]
+
+    def intern(self, value):
+        """Return the shared string object equal to value."""
+        return self.values[self.encode(value)]
+
+    def __len__(self):
+        return len(self.values)
+
+    def __contains__(self, value):
+        return value in self.codes
+
+    def __repr__(self):
+        return 'Categories({!r})'.format(self.values)
+
+
+if __name__ == '__main__':
+    from csv_rows import RowReader
+
+    categories = {name: Categories() for name in CATEGORICAL_FIELDS}
+    with RowReader('rollercoasters.csv') as reader:
+        idxs = [reader.headers.index(name) for name in CATEGORICAL_FIELDS]
+        for parts in reader.rows(min_fields=len(reader.headers)):
+            for name, idx in zip(CATEGORICAL_FIELDS, idxs):
+                categories[name].encode(parts[idx])
+    for name in CATEGORICAL_FIELDS:
+        print(f"{name}: {len(categories[name])} distinct values")
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+On-disk binary cache of the parsed rollercoasters.csv columns.
+
+The first load parses the CSV into a CoasterTable and writes a sidecar
+file next to it (<csv_path>.coastercache). Later loads memory-map the
+sidecar and read the typed columns straight from it, as long as the
+source file still has the size and modification time recorded in the
+sidecar; otherwise the CSV is parsed again and the sidecar rebuilt.
+
+Sidecar layout:
+  8 bytes   magic b'COASTER3'
+  4 bytes   little-endian length of the JSON header
+  n bytes   JSON header (source size/mtime, row count, CSV header,
+            short-row and NaN cell counts, column offsets, text dictionaries,
+            byte order)
+  padding   to an 8-byte boundary, then every column array back to back
+
+write_arrays_file / map_arrays_file implement this layout for any set of
+named arrays, so other sidecars (e.g. intensity_index) can share it.
+
+The table keeps only complete rows, by assignment6 column position, while
+the report scans resolve columns from the header and some keep short rows
+that still hold the fields they need. So the reports only read the cache
+when asked (use_cache=True in assignment4, assignment5 and assignment9),
+and even then fall back to scanning the CSV whenever the table could
+answer differently (CoasterTable.holds_every_row / has_standard_header /
+nan_is_missing).
+
+Function:
+  load_coaster_table(csv_path, cache_path=None, use_cache=True)
+    - Returns a CoasterTable for csv_path, using or refreshing the sidecar
+"""
+
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+
+from coaster_table import CoasterTable, build_coaster_table_from_csv
+
+# version 2 added the CSV header and short-row count, version 3 the NaN cell counts
+MAGIC = b'COASTER3'
+CACHE_SUFFIX = '.coastercache'
+
+def default_cache_path(csv_path):
+    return csv_path + CACHE_SUFFIX
+
+def source_signature(csv_path):
+    """Return (size, mtime_ns) identifying the current contents of csv_path."""
+    st = os.stat(csv_path)
+    return st.st_size, st.st_mtime_ns
+
+def write_arrays_file(path, magic, meta, arrays):
+    """
+    Atomically write named arrays to path: magic, a JSON header made of meta plus
+    the array layout, then every array 8-byte aligned. arrays is a list of
+    (name, array) pairs; arrays may also be memoryviews of a mapped file.
+    """
+    layout = []
+    offset = 0
+    for name, values in arrays:
+        nbytes = values.itemsize * len(values)
+        # arrays know their typecode; memoryviews of a loaded file call it format
+        typecode = getattr(values, 'typecode', None) or values.format
+        layout.append({'name': name, 'typecode': typecode, 'offset': offset, 'nbytes': nbytes})
+        # keep every array 8-byte aligned
+        offset += (nbytes + 7) // 8 * 8
+    header = dict(meta)
+    header['byteorder'] = sys.byteorder
+    header['arrays'] = layout
+    header = json.dumps(header).encode('utf-8')
+    prefix_len = len(magic) + 4 + len(header)
+    padding = (8 - prefix_len % 8) % 8
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix='.sidecar_', dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as out:
+            out.write(magic)
+            out.write(struct.pack('<I', len(header)))
+            out.write(header)
+            out.write(b'\0' * padding)
+            for _, values in arrays:
+                data = values.tobytes()
+                out.write(data)
+                out.write(b'\0' * ((8 - len(data) % 8) % 8))
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def map_arrays_file(path, magic):
+    """
+    Memory-map a file written by write_arrays_file.
+    Returns (meta, arrays, mapping) where arrays maps each name to a memoryview
+    cast to its typecode, or None if the file is missing, foreign or corrupt.
+    """
+    try:
+        f = open(path, 'rb')
+    except OSError:
+        return None
+    with f:
+        prefix = f.read(len(magic) + 4)
+        if len(prefix) < len(magic) + 4 or prefix[:len(magic)] != magic:
+            return None
+        header_len = struct.unpack('<I', prefix[len(magic):])[0]
+        try:
+            meta = json.loads(f.read(header_len).decode('utf-8'))
+        except ValueError:
+            return None
+        if meta.get('byteorder') != sys.byteorder:
+            return None
+        prefix_len = len(magic) + 4 + header_len
+        data_start = prefix_len + (8 - prefix_len % 8) % 8
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    view = memoryview(mm)
+    arrays = {}
+    for spec in meta['arrays']:
+        start = data_start + spec['offset']
+        end = start + spec['nbytes']
+        if end > len(mm):
+            return None
+        arrays[spec['name']] = view[start:end].cast(spec['typecode'])
+    return meta, arrays, mm
+
+def is_fresh(meta, signature):
+    """True if meta was written for a source file with this (size, mtime_ns) signature."""
+    return (meta.get('source_size'), meta.get('source_mtime_ns')) == tuple(signature)
+
+def write_cache(table, cache_path, signature):
+    """Write table to cache_path atomically, tagged with the source signature."""
+    meta = {
+        'source_size': signature[0],
+        'source_mtime_ns': signature[1],
+        'rows': table.size,
+        'headers': list(table.headers),
+        'short_rows': table.short_rows,
+        'nan_cells': table.nan_cells,
+        'dictionaries': table.dictionaries,
+    }
+    write_arrays_file(cache_path, MAGIC, meta, list(table.columns.items()))
+
+def read_cache(cache_path, signature):
+    """
+    Return a CoasterTable whose columns are views into the memory-mapped sidecar,
+    or None if the sidecar is missing, unreadable or stale.
+    """
+    mapped = map_arrays_file(cache_path, MAGIC)
+    if mapped is None:
+        return None
+    meta, columns, mm = mapped
+    if not is_fresh(meta, signature):
+        return None
+    table = CoasterTable.from_columns(meta['rows'], columns, meta['dictionaries'],
+                                      meta['headers'], meta['short_rows'], meta['nan_cells'])
+    # the views keep the mapping alive; keep a handle for callers that want to inspect it
+    table.buffer = mm
+    return table
+
+def load_coaster_table(csv_path, cache_path=None, use_cache=True):
+    """
+    Return a CoasterTable for csv_path.
+    With use_cache, a fresh sidecar is memory-mapped instead of parsing the CSV,
+    and a missing or stale sidecar is rebuilt after parsing. A sidecar that
+    cannot be written (e.g. read-only directory) is silently skipped.
+    """
+    if not use_cache:
+        return build_coaster_table_from_csv(csv_path)
+    if cache_path is None:
+        cache_path = default_cache_path(csv_path)
+    signature = source_signature(csv_path)
+    table = read_cache(cache_path, signature)
+    if table is not None:
+        return table
+    table = build_coaster_table_from_csv(csv_path)
+    try:
+        write_cache(table, cache_path, signature)
+    except OSError:
+        pass
+    return table
+
+
+if __name__ == '__main__':
+    import time
+
+    CSV_PATH = 'rollercoasters.csv'
+    start = time.perf_counter()
+    table = load_coaster_table(CSV_PATH)
+    first = time.perf_counter() - start
+    start = time.perf_counter()
+    table = load_coaster_table(CSV_PATH)
+    second = time.perf_counter() - start
+    print(f"Loaded {len(table)} rows: first call {first * 1000:.2f} ms, "
+          f"cached call {second * 1000:.2f} ms ({default_cache_path(CSV_PATH)})")
@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+Columnar, array-backed storage for rollercoasters.csv rows.
+
+Instead of one Coaster object per row, CoasterTable keeps one typed
+array per column:
+  - numeric fields are stored as doubles in array('d'), converted exactly
+    like assignment6's to_int / to_float; a missing or non-numeric value
+    is stored as NaN and reads back as None
+  - text fields are dictionary-encoded with categorical.Categories:
+    array('I') of codes plus the list of distinct strings, so each row
+    costs 8 bytes per numeric field and 4 bytes per text field
+
+Row views (CoasterRow) are created on demand and expose the same
+attributes as assignment6.Coaster.
+
+Like assignment6, the table only holds complete rows and reads fields by
+their position in FIELD_NAMES, so it only holds rows at all when the CSV
+header is exactly FIELD_NAMES; for any other header it is empty. It
+records the CSV header, how many short rows it skipped and how many
+numeric cells were a literal NaN (which the column can't tell apart from
+a missing value), so callers can tell whether it answers a query exactly
+as a scan of the file would (holds_every_row, nan_is_missing).
+
+Function:
+  build_coaster_table_from_csv(csv_path)
+    - Returns a CoasterTable built with the same row rules as
+      assignment6.build_coasters_from_csv (empty unless the header is FIELD_NAMES)
+"""
+
+from array import array
+
+from assignment6 import FIELD_NAMES, INT_FIELDS, TEXT_FIELDS, to_float, to_int
+from categorical import Categories
+from csv_rows import RowReader
+
+MISSING = float('nan')
+
+# how each column is converted while loading
+TEXT = 0
+INT = 1
+FLOAT = 2
+
+
+class CoasterRow:
+    """Read-only view of one table row with the attributes of assignment6.Coaster."""
+    __slots__ = ('table', 'index')
+
+    def __init__(self, table, index):
+        self.table = table
+        self.index = index
+
+    def __getattr__(self, name):
+        if name in self.table.columns:
+            return self.table.value(name, self.index)
+        raise AttributeError(name)
+
+    def __repr__(self):
+        return ("Coaster(rollercoaster_type={!r}, theme={!r}, park_id={!r}, "
+                "excitement_rating={!r}, intensity={!r})").format(
+                    self.rollercoaster_type, self.theme, self.park_id,
+                    self.excitement_rating, self.intensity)
+
+
+class CoasterTable:
+    def __init__(self):
+        self.size = 0
+        self.read_only = False
+        self.headers = ()  # the CSV header, empty for an empty file
+        self.short_rows = 0  # data rows skipped for having fewer fields than the header
+        self.nan_cells = {}  # float field -> cells read as NaN (e.g. 'nan'), stored like missing ones
+        self.columns = {}  # field -> array('d') of values, or array('I') of text codes
+        self.categories = {}  # text field -> Categories
+        self.dictionaries = {}  # text field -> list of distinct strings, indexed by code
+        self.codes_by_value = {}  # text field -> {string: code}
+        for name in FIELD_NAMES:
+            if name in TEXT_FIELDS:
+                self.columns[name] = array('I')
+                self.set_categories(name, Categories())
+            else:
+                self.columns[name] = array('d')
+        # (csv index, kind, column, code lookup, dictionary, name) for every field, in CSV order
+        self.plan = []
+        for i, name in enumerate(FIELD_NAMES):
+            if name in TEXT_FIELDS:
+                kind = TEXT
+            elif name in INT_FIELDS:
+                kind = INT
+            else:
+                kind = FLOAT
+            self.plan.append((i, kind, self.columns[name],
+                              self.codes_by_value.get(name), self.dictionaries.get(name), name))
+
+    @classmethod
+    def from_columns(cls, size, columns, dictionaries, headers=(), short_rows=0, nan_cells=None):
+        """
+        Return a read-only table over existing column sequences (e.g. memoryviews
+        of a cache file) and text dictionaries; append() is not supported on it.
+        """
+        table = cls()
+        table.size = size
+        table.headers = tuple(headers)
+        table.short_rows = short_rows
+        table.nan_cells = dict(nan_cells or {})
+        table.columns = dict(columns)
+        table.categories = {}
+        table.dictionaries = {}
+        table.codes_by_value = {}
+        for name, values in dictionaries.items():
+            table.set_categories(name, Categories(values))
+        table.plan = []
+        table.read_only = True
+        return table
+
+    def set_categories(self, name, categories):
+        self.categories[name] = categories
+        # the append loop and older callers use the underlying list and dict directly
+        self.dictionaries[name] = categories.values
+        self.codes_by_value[name] = categories.codes
+
+    def has_standard_header(self):
+        """True if the columns were read from a header in FIELD_NAMES order (or the file was empty)."""
+        return self.headers in ((), FIELD_NAMES)
+
+    def holds_every_row(self):
+        """
+        True if no data row was left out and the header is the standard one, so any
+        query gives the same answer on the table as on a scan with a looser row rule.
+        """
+        return self.short_rows == 0 and self.has_standard_header()
+
+    def nan_is_missing(self, *names):
+        """True if every NaN in these numeric columns stands for a missing value, not a NaN cell."""
+        return not any(self.nan_cells.get(name) for name in names)
+
+    def code_of(self, name, value):
+        """Return the code of value in a text column, or MISSING_CODE if it never occurs."""
+        return self.categories[name].lookup(value)
+
+    def __len__(self):
+        return self.size
+
+    def append(self, parts):
+        """Add one row from its stripped CSV fields (in assignment6 FIELD_NAMES order)."""
+        if self.read_only:
+            raise TypeError('table is read-only')
+        for i, kind, column, codes_by_value, values, name in self.plan:
+            value = parts[i]
+            if kind == TEXT:
+                code = codes_by_value.get(value)
+                if code is None:
+                    code = len(values)
+                    codes_by_value[value] = code
+                    values.append(value)
+                column.append(code)
+            elif kind == INT:
+                number = to_int(value)
+                column.append(MISSING if number is None else number)
+            else:
+                number = to_float(value)
+                if number is None:
+                    number = MISSING
+                elif number != number:
+                    self.nan_cells[name] = self.nan_cells.get(name, 0) + 1
+                column.append(number)
+        self.size += 1
+
+    def value(self, name, index):
+        """Return one field of one row, as assignment6.Coaster would hold it."""
+        column = self.columns[name]
+        if name in self.dictionaries:
+            return self.dictionaries[name][column[index]]
+        number = column[index]
+        if number != number:
+            return None
+        if name in INT_FIELDS:
+            return int(number)
+        return number
+
+    def column(self, name):
+        """Return the raw array of a column (doubles with NaN for missing, or text codes)."""
+        return self.columns[name]
+
+    def text_column(self, name):
+        """Return the decoded strings of a text column as a list."""
+        values = self.dictionaries[name]
+        return [values[code] for code in self.columns[name]]
+
+    def row(self, index):
+        if index < 0:
+            index += self.size
+        if not 0 <= index < self.size:
+            raise IndexError('row index out of range')
+        return CoasterRow(self, index)
+
+    def __getitem__(self, index):
+        return self.row(index)
+
+    def __iter__(self):
+        for index in range(self.size):
+            yield CoasterRow(self, index)
+
+    def nbytes(self):
+        """Approximate bytes held by the column arrays and text dictionaries."""
+        total = 0
+        for column in self.columns.values():
+            total += column.itemsize * len(column)
+        for values in self.dictionaries.values():
+            for value in values:
+                total += len(value.encode('utf-8'))
+        return total
+
+
+def build_coaster_table_from_csv(csv_path):
+    """
+    Return a CoasterTable holding every well-formed row of csv_path.
+    The table has no rows if the header is not FIELD_NAMES (see has_standard_header).
+    """
+    table = CoasterTable()
+    with RowReader(csv_path) as reader:
+        if reader.header_line is None:
+            return table
+        table.headers = tuple(reader.headers)
+        if table.headers != FIELD_NAMES:
+            # fields are read by position, which only fits the standard header
+            return table
+        header_count = len(reader.headers)
+        # same rule as build_coasters_from_csv: skip rows with fewer than header_count fields
+        for parts in reader.rows():
+            if len(parts) < header_count:
+                table.short_rows += 1
+                continue
+            table.append(parts)
+    return table
+
+
+if __name__ == '__main__':
+    import tracemalloc
+
+    from assignment6 import build_coasters_from_csv
+
+    CSV_PATH = 'rollercoasters.csv'
+    tracemalloc.start()
+    coasters = build_coasters_from_csv(CSV_PATH)
+    objects_bytes = tracemalloc.get_traced_memory()[0]
+    del coasters
+    tracemalloc.stop()
+
+    tracemalloc.start()
+    table = build_coaster_table_from_csv(CSV_PATH)
+    table_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    print(f"Built table with {len(table)} rows.")
+    print(f"Coaster objects: {objects_bytes} bytes, CoasterTable: {table_bytes} bytes")
+    for i in range(min(8, len(table))):
+        print(table[i])
@@ -0,0 +1,399 @@
+#!/usr/bin/env python3
+"""
+Single-pass statistics for every numeric column of rollercoasters.csv.
+
+assignment9 profiles two columns and keeps every value. Here each column
+gets a ColumnProfile made of bounded-memory, mergeable parts:
+  Welford      count, min, max, mean and variance (sample, n - 1) in one
+               pass, merged with Chan et al.'s pairwise formula
+  KLLSketch    quantiles (p50, p90, p99) within about 1.7/k rank error
+               using O(k log(n/k)) values; exact until the first compaction.
+               p50 is a nearest-rank value; median is assignment9's (the
+               average of the two middle values for an even count) while
+               the sketch is still exact, and p50 after that
+  counts       exact value counts in first-seen order while a column has at
+               most MODE_CAPACITY distinct values, so the mode is
+               assignment9's (ties go to the value seen first); past that
+               they become a SpaceSaving summary (from sketches) and the
+               mode is approximate, ties going to the smaller value
+
+Rows are read in batches of raw fields, transposed into columns and
+converted and folded in per batch, so most of the per-value work runs
+inside C built-ins. Profiles built over separate chunks (or files) merge
+into the profile of the whole input.
+
+Like assignment9, only complete rows (header_count fields) are used, and
+a missing, non-numeric or NaN value is skipped for its column only.
+
+Functions:
+  profile_columns(csv_path, columns=None, workers=None)
+    - Returns {column: ColumnProfile}, columns default to NUMERIC_COLUMNS;
+      workers > 1 profiles line-aligned byte ranges in parallel and merges
+  write_column_stats(output_csv, profiles)
+    - Writes metric,<column>,... rows in the gs_statistics.csv style
+  calculate_column_stats_and_write(input_csv, output_csv, columns=None, workers=None)
+"""
+
+import math
+import random
+import sys
+from collections import Counter
+from itertools import islice
+
+from assignment6 import FIELD_NAMES, TEXT_FIELDS
+from assignment9 import mode_from_counts
+from byte_scanner import ByteScanner
+from csv_io import is_compressed, open_text
+from csv_rows import to_float
+from instrumentation import count_file_bytes, instrumented, stage
+from parallel_scan import range_rows, scan_in_parallel
+from sketches import SpaceSaving
+
+NUMERIC_COLUMNS = tuple(name for name in FIELD_NAMES if name not in TEXT_FIELDS)
+METRICS = ('count', 'min', 'max', 'mean', 'median', 'mode', 'variance', 'stddev',
+           'p50', 'p90', 'p99')
+# values (or rows) buffered before they are folded into the accumulators
+BATCH_VALUES = 4096
+# distinct values tracked exactly for the mode
+MODE_CAPACITY = 16384
+KLL_K = 200
+
+
+class Welford:
+    """Running count, mean, sum of squared deviations, min and max."""
+
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = None
+        self.max = None
+
+    def add_batch(self, values):
+        """Fold a list of values in (as one block, merged with Chan's formula)."""
+        n = len(values)
+        if not n:
+            return
+        mean = math.fsum(values) / n
+        m2 = math.fsum([(v - mean) * (v - mean) for v in values])
+        self._combine(n, mean, m2, min(values), max(values))
+
+    def add(self, value):
+        self.add_batch([value])
+
+    def merge(self, other):
+        if other.n:
+            self._combine(other.n, other.mean, other.m2, other.min, other.max)
+        return self
+
+    def _combine(self, n_b, mean_b, m2_b, lo, hi):
+        n_a = self.n
+        n = n_a + n_b
+        delta = mean_b - self.mean
+        self.mean += delta * n_b / n
+        self.m2 += m2_b + delta * delta * n_a * n_b / n
+        self.n = n
+        if self.min is None or lo < self.min:
+            self.min = lo
+        if self.max is None or hi > self.max:
+            self.max = hi
+
+    def variance(self):
+        """Sample variance, None for fewer than two values."""
+        if self.n < 2:
+            return None
+        return self.m2 / (self.n - 1)
+
+
+class KLLSketch:
+    """Mergeable quantile sketch (Karnin, Lang and Liberty's compactor hierarchy)."""
+
+    def __init__(self, k=KLL_K, seed=210):
+        self.k = k
+        self.n = 0
+        self.levels = [[]]  # items of level h each stand for 2**h values
+        self.rng = random.Random(seed)
+        self.size = 0
+        self.max_size = self._capacity(0)
+        self.compacted = False  # until then every value is kept, so results are exact
+
+    def _capacity(self, h):
+        depth = len(self.levels) - h - 1
+        return int(math.ceil(self.k * (2.0 / 3.0) ** depth)) + 1
+
+    def _grow(self):
+        self.levels.append([])
+        self.max_size = sum(self._capacity(h) for h in range(len(self.levels)))
+
+    def add_batch(self, values):
+        self.levels[0].extend(values)
+        self.n += len(values)
+        self.size += len(values)
+        while self.size >= self.max_size:
+            self._compress()
+
+    def add(self, value):
+        self.add_batch([value])
+
+    def _compress(self):
+        self.compacted = True
+        for h in range(len(self.levels)):
+            level = self.levels[h]
+            if len(level) >= self._capacity(h):
+                if h + 1 == len(self.levels):
+                    self._grow()
+                level.sort()
+                # keep one item back if the count is odd; promote every other item
+                leftover = [level.pop()] if len(level) % 2 else []
+                offset = self.rng.randrange(2)
+                self.levels[h + 1].extend(level[offset::2])
+                self.levels[h] = leftover
+                self.size = sum(len(items) for items in self.levels)
+                if self.size < self.max_size:
+                    break
+
+    def merge(self, other):
+        while len(self.levels) < len(other.levels):
+            self._grow()
+        for h, items in enumerate(other.levels):
+            self.levels[h].extend(items)
+        self.n += other.n
+        self.compacted = self.compacted or other.compacted
+        self.size = sum(len(items) for items in self.levels)
+        while self.size >= self.max_size:
+            self._compress()
+        return self
+
+    def quantiles(self, qs):
+        """Return the value at each rank fraction q (0..1), None if empty."""
+        if self.n == 0:
+            return [None for _ in qs]
+        weighted = sorted((v, 1 << h) for h, items in enumerate(self.levels) for v in items)
+        total = sum(w for _, w in weighted)
+        results = []
+        for q in qs:
+            # nearest rank: the smallest value with cumulative weight >= q * total
+            target = max(1, math.ceil(q * total))
+            seen = 0
+            for v, w in weighted:
+                seen += w
+                if seen >= target:
+                    results.append(v)
+                    break
+        return results
+
+    def quantile(self, q):
+        return self.quantiles([q])[0]
+
+    def median(self):
+        """The exact (interpolated) median while no value was dropped, else the p50 estimate."""
+        if self.n == 0:
+            return None
+        if self.compacted:
+            return self.quantile(0.5)
+        values = sorted(self.levels[0])
+        n = len(values)
+        if n % 2:
+            return values[n // 2]
+        return (values[n // 2 - 1] + values[n // 2]) / 2.0
+
+
+class ColumnProfile:
+    def __init__(self, k=KLL_K, mode_capacity=MODE_CAPACITY):
+        self.moments = Welford()
+        self.sketch = KLLSketch(k)
+        self.mode_capacity = mode_capacity
+        self.counts = Counter()  # exact, first-seen order; a SpaceSaving once too large
+        self.pending = []
+
+    def add(self, value):
+        self.pending.append(value)
+        if len(self.pending) >= BATCH_VALUES:
+            self.flush()
+
+    def add_batch(self, values):
+        """Fold a list of (non-missing, non-NaN) values in at once."""
+        self.flush()
+        self.pending = values
+        self.flush()
+
+    def flush(self):
+        values = self.pending
+        if values:
+            self.pending = []
+            self.moments.add_batch(values)
+            self.sketch.add_batch(values)
+            if isinstance(self.counts, Counter):
+                # Counter.update counts in C and keeps first-seen order
+                self.counts.update(values)
+                self._check_counts()
+            else:
+                # count the batch in C first, so the counters see each distinct value once
+                add_count = self.counts.add
+                for v, n in Counter(values).items():
+                    add_count(v, n)
+
+    def _check_counts(self):
+        if len(self.counts) > self.mode_capacity:
+            self.counts = self._summary()
+
+    def _summary(self):
+        """The counts as a SpaceSaving, converting exact ones."""
+        if isinstance(self.counts, Counter):
+            summary = SpaceSaving(self.mode_capacity)
+            for v, n in self.counts.items():
+                summary.add(v, n)
+            return summary
+        return self.counts
+
+    def merge(self, other):
+        """Add the profile of a later chunk (first-seen order follows the merge order)."""
+        self.flush()
+        other.flush()
+        self.moments.merge(other.moments)
+        self.sketch.merge(other.sketch)
+        if isinstance(self.counts, Counter) and isinstance(other.counts, Counter):
+            self.counts.update(other.counts)
+            self._check_counts()
+        else:
+            self.counts = self._summary().merge(other._summary())
+        return self
+
+    def stats(self):
+        """Return {metric: value} for every name in METRICS (None when undefined)."""
+        self.flush()
+        m = self.moments
+        variance = m.variance()
+        p50, p90, p99 = self.sketch.quantiles([0.5, 0.9, 0.99])
+        if isinstance(self.counts, Counter):
+            mode = mode_from_counts(self.counts)
+        else:
+            top = self.counts.top(1)
+            mode = top[0][0] if top else None
+        return {
+            'count': m.n,
+            'min': m.min,
+            'max': m.max,
+            'mean': m.mean if m.n else None,
+            'median': self.sketch.median(),
+            'mode': mode,
+            'variance': variance,
+            'stddev': None if variance is None else math.sqrt(variance),
+            'p50': p50,
+            'p90': p90,
+            'p99': p99,
+        }
+
+    def __getstate__(self):
+        # fold the buffer in before a profile is sent back from a worker
+        self.flush()
+        return self.__dict__
+
+
+def column_floats(raw_values):
+    """Convert raw str or bytes fields to floats, dropping missing, non-numeric and NaN ones."""
+    try:
+        # float() accepts str and bytes and ignores surrounding whitespace
+        values = list(map(float, raw_values))
+    except (TypeError, ValueError):
+        values = [v for v in map(to_float, raw_values) if v is not None]
+    # NaN is the only value not equal to itself
+    return [v for v in values if v == v]
+
+def add_raw_rows(profiles, raw_rows):
+    """Fold rows of raw fields (one per profile) into profiles, a batch at a time."""
+    rows = iter(raw_rows)
+    while True:
+        batch = list(islice(rows, BATCH_VALUES))
+        if not batch:
+            break
+        # transpose the batch into columns and convert each column in one go
+        for profile, column in zip(profiles, zip(*batch)):
+            profile.add_batch(column_floats(column))
+
+def profile_rows(rows, idxs):
+    """Build one ColumnProfile per index from an iterable of stripped field lists."""
+    profiles = [ColumnProfile() for _ in idxs]
+    add_raw_rows(profiles, ([parts[i] for i in idxs] for parts in rows))
+    return profiles
+
+def profile_range(csv_path, start, end, header_count, idxs):
+    """Worker for the parallel mode: profiles of one byte range."""
+    return profile_rows(range_rows(csv_path, start, end, header_count, header_count), idxs)
+
+@instrumented('column_stats.profile_columns')
+def profile_columns(csv_path, columns=None, workers=None):
+    """Return {column: ColumnProfile} over the complete rows of csv_path."""
+    if columns is None:
+        columns = NUMERIC_COLUMNS
+    columns = list(columns)
+    if is_compressed(csv_path):
+        # byte ranges can't be cut out of a compressed stream
+        workers = None
+    with ByteScanner(csv_path) as scanner:
+        if scanner.header_line is None:
+            return {name: ColumnProfile() for name in columns}
+        headers = scanner.headers
+        header_count = len(headers)
+        missing = [name for name in columns if name not in headers]
+        if missing:
+            raise ValueError('Required header(s) missing: ' + ', '.join(missing))
+        idxs = [headers.index(name) for name in columns]
+
+        if workers is None or workers <= 1:
+            profiles = [ColumnProfile() for _ in columns]
+            with stage('column_stats.scan'):
+                # keep the raw bytes; add_raw_rows converts them a column at a time
+                rows = scanner.project(columns, min_fields=header_count,
+                                       converters=[bytes] * len(columns))
+                add_raw_rows(profiles, rows)
+            return dict(zip(columns, profiles))
+
+    profiles = None
+    # partials come back in file order, so merging is deterministic
+    for partial in scan_in_parallel(csv_path, profile_range, (header_count, idxs), workers):
+        if profiles is None:
+            profiles = partial
+        else:
+            for profile, other in zip(profiles, partial):
+                profile.merge(other)
+    if profiles is None:
+        profiles = [ColumnProfile() for _ in columns]
+    return dict(zip(columns, profiles))
+
+def format_metric(metric, value):
+    if value is None:
+        return ''
+    if metric == 'count':
+        return str(value)
+    return '{:.2f}'.format(value)
+
+def write_column_stats(output_csv, profiles):
+    """Write one row per metric and one column per profiled CSV column."""
+    columns = list(profiles)
+    stats = [profiles[name].stats() for name in columns]
+    with open_text(output_csv, 'w') as out:
+        out.write(','.join(['metric'] + columns) + '\n')
+        for metric in METRICS:
+            out.write(','.join([metric] + [format_metric(metric, s[metric]) for s in stats])
+                      + '\n')
+
+@instrumented('column_stats.calculate_column_stats_and_write')
+def calculate_column_stats_and_write(input_csv, output_csv, columns=None, workers=None):
+    """Profile the numeric columns of input_csv, write the wide CSV and return the profiles."""
+    profiles = profile_columns(input_csv, columns, workers)
+    with stage('column_stats.write'):
+        write_column_stats(output_csv, profiles)
+    count_file_bytes(output_csv)
+    return profiles
+
+
+if __name__ == '__main__':
+    IN = sys.argv[1] if len(sys.argv) > 1 else 'rollercoasters.csv'
+    OUT = sys.argv[2] if len(sys.argv) > 2 else 'column_statistics.csv'
+    result = calculate_column_stats_and_write(IN, OUT)
+    for name in ('max_pos_gs', 'max_neg_gs'):
+        s = result[name].stats()
+        print(f"{name}: max {s['max']} median {s['median']} mean {s['mean']:.4f} "
+              f"mode {s['mode']} p99 {s['p99']}")
+    print(f"Wrote statistics for {len(result)} columns to {OUT}")
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Buffered, optionally compressed text files for the CSV-producing scripts.
+
+The compression is chosen by file extension: .gz (gzip), .bz2 (bz2) or
+.xz (lzma); any other path is a plain file opened with a large buffer.
+Reading and writing both go through open_text, so a sorted or bucketed
+CSV can be written compressed and read back by csv_rows.RowReader or
+byte_scanner.ByteScanner without a separate decompression pass.
+
+RowWriter collects rows and writes them in large preassembled chunks (one
+'\\n'.join per batch) instead of one write call and one temporary string
+per row.
+
+Functions:
+  compression_for(path)  - the compression module for path, or None
+  is_compressed(path)
+  open_text(path, mode='r')
+  open_binary(path)      - a readable binary stream (decompressed if needed)
+
+Class:
+  RowWriter(path, header=None, batch_rows=BATCH_ROWS)
+    - Context manager; write_row(parts), write_rows(rows), write_lines(lines)
+      where lines are already joined and carry no trailing newline
+"""
+
+import bz2
+import gzip
+import lzma
+import os
+from itertools import islice
+
+COMPRESSORS = {'.gz': gzip, '.bz2': bz2, '.xz': lzma}
+# buffer size for plain files; outputs often go to slow network volumes
+BUFFER_BYTES = 1 << 20
+# rows joined into one chunk per write
+BATCH_ROWS = 8192
+
+def compression_for(path):
+    return COMPRESSORS.get(os.path.splitext(str(path))[1].lower())
+
+def is_compressed(path):
+    return compression_for(path) is not None
+
+def open_text(path, mode='r'):
+    """Open path as UTF-8 text ('r', 'w' or 'a'), compressed according to its extension."""
+    module = compression_for(path)
+    if module is None:
+        return open(path, mode, encoding='utf-8', buffering=BUFFER_BYTES)
+    if module is gzip and mode != 'r':
+        # level 6 (the gzip tool's default) is much faster than 9 for little size
+        return gzip.open(path, mode + 't', encoding='utf-8', compresslevel=6)
+    return module.open(path, mode + 't', encoding='utf-8')
+
+def open_binary(path):
+    module = compression_for(path)
+    if module is None:
+        return open(path, 'rb')
+    return module.open(path, 'rb')
+
+
+class RowWriter:
+    def __init__(self, path, header=None, batch_rows=BATCH_ROWS):
+        self.out = open_text(path, 'w')
+        self.batch_rows = batch_rows
+        self.lines = []
+        self.rows_written = 0
+        if header is not None:
+            self.out.write(header + '\n')
+
+    def write_row(self, parts):
+        self.lines.append(','.join(parts))
+        if len(self.lines) >= self.batch_rows:
+            self.flush()
+
+    def write_rows(self, rows):
+        """Write an iterable of field lists."""
+        self.write_lines(map(','.join, rows))
+
+    def write_lines(self, lines):
+        """Write an iterable of already-joined lines (without newlines)."""
+        self.flush()
+        lines = iter(lines)
+        while True:
+            chunk = list(islice(lines, self.batch_rows))
+            if not chunk:
+                break
+            self.out.write('\n'.join(chunk) + '\n')
+            self.rows_written += len(chunk)
+
+    def flush(self):
+        if self.lines:
+            self.out.write('\n'.join(self.lines) + '\n')
+            self.rows_written += len(self.lines)
+            self.lines = []
+
+    def close(self):
+        try:
+            self.flush()
+        finally:
+            self.out.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
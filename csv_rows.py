@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Streaming row reader shared by the rollercoasters.csv scripts.
+
+Rows are produced one at a time from the open file, so memory use stays
+constant no matter how large the CSV is. .gz/.bz2/.xz files are
+decompressed on the fly (see csv_io).
+
+Class:
+  RowReader(path)
+    - Context manager; reads the header line on open
+    - header_line is None when the file is empty
+    - headers is the list of stripped header names
+    - rows(min_fields=0) yields the stripped field list of every
+      non-blank data line, split at most header_count - 1 times so a
+      trailing field containing commas stays in one piece; rows with
+      fewer than min_fields fields are skipped as malformed
+
+Functions:
+  to_float(s, default=None), to_int(s, default=None)
+    - The lenient conversions every script uses for numeric fields:
+      default for anything float() rejects; to_int truncates float text
+"""
+
+import instrumentation
+from csv_io import open_text
+
+def to_float(s, default=None):
+    try:
+        return float(s)
+    except Exception:
+        return default
+
+def to_int(s, default=None):
+    try:
+        return int(float(s))
+    except Exception:
+        return default
+
+def parse_header(header_line):
+    return [h.strip() for h in header_line.split(',')]
+
+def iter_rows(lines, header_count, min_fields=0):
+    """Return a generator of the stripped field list of every non-blank line in lines."""
+    if instrumentation.enabled:
+        return _iter_rows_counted(lines, header_count, min_fields)
+    return _iter_rows(lines, header_count, min_fields)
+
+def _iter_rows(lines, header_count, min_fields):
+    for line in lines:
+        line = line.rstrip('\n')
+        if not line.strip():
+            continue
+        parts = [p.strip() for p in line.split(',', header_count - 1)]
+        if len(parts) < min_fields:
+            # malformed line - skip
+            continue
+        yield parts
+
+def _iter_rows_counted(lines, header_count, min_fields):
+    """_iter_rows that also feeds the rows_read/parsed/skipped counters."""
+    read = 0
+    skipped = 0
+    try:
+        for line in lines:
+            line = line.rstrip('\n')
+            if not line.strip():
+                continue
+            read += 1
+            parts = [p.strip() for p in line.split(',', header_count - 1)]
+            if len(parts) < min_fields:
+                skipped += 1
+                continue
+            yield parts
+    finally:
+        instrumentation.count('rows_read', read)
+        instrumentation.count('rows_parsed', read - skipped)
+        instrumentation.count('rows_skipped', skipped)
+
+
+class RowReader:
+    def __init__(self, path):
+        self.path = path
+        self.f = open_text(path)
+        header_line = self.f.readline()
+        if header_line:
+            self.header_line = header_line.rstrip('\n')
+            self.headers = parse_header(self.header_line)
+        else:
+            self.header_line = None
+            self.headers = []
+
+    def rows(self, min_fields=0):
+        """Yield the remaining data rows as stripped field lists."""
+        if self.header_line is None:
+            return iter(())
+        return iter_rows(self.f, len(self.headers), min_fields)
+
+    def close(self):
+        self.f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Generic single-pass group-by aggregation over rollercoasters.csv.
+
+An AggregateSpec describes one aggregation:
+  key        column name, tuple of column names, or None for one global group
+  aggregate  'count', 'sum', 'mean', 'min' or 'max'
+  column     numeric column to aggregate (optional for 'count')
+  where      optional {column: value} equality filters, all must match
+  name       label for the result (defaults to e.g. 'mean_intensity_by_theme')
+
+Any number of specs are computed together in one read of the file. Each
+group keeps a small [count, sum, min, max] accumulator; rows whose
+aggregated column is missing or non-numeric are skipped for that spec,
+as are rows too short to hold the columns the spec needs.
+
+GroupByReport is a pipeline consumer, so group-bys can also share the
+single pass of pipeline.run_reports with the other reports.
+
+Function:
+  group_by(csv_path, specs)
+    - Returns {spec name: {group key: value}}, groups in first-seen order
+"""
+
+from csv_rows import to_float
+from pipeline import run_reports
+
+AGGREGATES = ('count', 'sum', 'mean', 'min', 'max')
+
+
+class AggregateSpec:
+    def __init__(self, key, aggregate, column=None, where=None, name=None):
+        if aggregate not in AGGREGATES:
+            raise ValueError('Unknown aggregate: ' + str(aggregate))
+        if column is None and aggregate != 'count':
+            raise ValueError("Aggregate '" + aggregate + "' needs a column")
+        self.key = key
+        self.aggregate = aggregate
+        self.column = column
+        self.where = dict(where) if where else {}
+        if name is None:
+            name = aggregate + ('_' + column if column else '')
+            if key is not None:
+                keys = (key,) if isinstance(key, str) else tuple(key)
+                name += '_by_' + '_'.join(keys)
+        self.name = name
+
+    def __repr__(self):
+        return ('AggregateSpec(key={!r}, aggregate={!r}, column={!r}, where={!r}, name={!r})'
+                .format(self.key, self.aggregate, self.column, self.where, self.name))
+
+
+# assignment5's query as a preset: mean intensity by theme for 'High' excitement
+HIGH_EXCITEMENT_INTENSITY_BY_THEME = AggregateSpec(
+    'theme', 'mean', 'intensity', where={'excitement_rating': 'High'},
+    name='avg_high_excitement_intensity_by_theme')
+
+
+def column_index(headers, name):
+    if name not in headers:
+        raise ValueError('Missing required header: ' + repr(name))
+    return headers.index(name)
+
+
+class GroupByReport:
+    """Pipeline consumer computing every spec in one pass."""
+
+    def __init__(self, specs):
+        self.specs = list(specs)
+        names = [spec.name for spec in self.specs]
+        if len(set(names)) != len(names):
+            raise ValueError('AggregateSpec names must be unique')
+
+    def start(self, headers, header_line):
+        # per spec: (key indices or None, single key?, column index, filters, min fields, groups)
+        self.plans = []
+        if header_line is None:
+            # empty file: every spec gets no groups
+            self.plans = [(None, True, None, [], 0, {}) for _ in self.specs]
+            return
+        for spec in self.specs:
+            if spec.key is None:
+                key_idxs = None
+                single = True
+            elif isinstance(spec.key, str):
+                key_idxs = (column_index(headers, spec.key),)
+                single = True
+            else:
+                key_idxs = tuple(column_index(headers, k) for k in spec.key)
+                single = False
+            col_idx = None if spec.column is None else column_index(headers, spec.column)
+            filters = [(column_index(headers, c), v) for c, v in spec.where.items()]
+            needed = list(key_idxs or ()) + [i for i, _ in filters]
+            if col_idx is not None:
+                needed.append(col_idx)
+            min_fields = max(needed) + 1 if needed else 0
+            self.plans.append((key_idxs, single, col_idx, filters, min_fields, {}))
+
+    def feed(self, parts):
+        n = len(parts)
+        for key_idxs, single, col_idx, filters, min_fields, groups in self.plans:
+            if n < min_fields:
+                continue
+            matched = True
+            for idx, value in filters:
+                if parts[idx] != value:
+                    matched = False
+                    break
+            if not matched:
+                continue
+            if col_idx is None:
+                number = 0.0
+            else:
+                number = to_float(parts[col_idx], default=None)
+                if number is None:
+                    continue
+            if key_idxs is None:
+                key = None
+            elif single:
+                key = parts[key_idxs[0]]
+            else:
+                key = tuple(parts[i] for i in key_idxs)
+            acc = groups.get(key)
+            if acc is None:
+                # [count, sum, min, max]
+                groups[key] = [1, number, number, number]
+            else:
+                acc[0] += 1
+                acc[1] += number
+                if number < acc[2]:
+                    acc[2] = number
+                if number > acc[3]:
+                    acc[3] = number
+
+    def finish(self):
+        results = {}
+        for spec, plan in zip(self.specs, self.plans):
+            groups = plan[5]
+            values = {}
+            for key, (count, total, lo, hi) in groups.items():
+                if spec.aggregate == 'count':
+                    values[key] = count
+                elif spec.aggregate == 'sum':
+                    values[key] = total
+                elif spec.aggregate == 'mean':
+                    values[key] = total / count
+                elif spec.aggregate == 'min':
+                    values[key] = lo
+                else:
+                    values[key] = hi
+            results[spec.name] = values
+        return results
+
+
+def group_by(csv_path, specs):
+    """Compute every AggregateSpec in one pass over csv_path."""
+    return run_reports(csv_path, [GroupByReport(specs)])[0]
+
+
+if __name__ == '__main__':
+    CSV_PATH = 'rollercoasters.csv'
+    results = group_by(CSV_PATH, [
+        HIGH_EXCITEMENT_INTENSITY_BY_THEME,
+        AggregateSpec('park_id', 'count'),
+        AggregateSpec('rollercoaster_type', 'max', 'max_speed'),
+        AggregateSpec(None, 'mean', 'avg_speed'),
+    ])
+    for name, values in results.items():
+        print(f"{name}: {len(values)} groups")
+    print('Overall mean avg_speed:', results['mean_avg_speed'][None])
@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+Incremental, append-only processing of rollercoasters.csv.
+
+rollercoasters.csv only ever grows by appending rows, so instead of
+re-reading it from byte zero, this module keeps a small JSON state file
+(<csv_path>.state.json) with:
+  - the byte offset just past the last fully processed line
+  - the header line and a checksum of the bytes just before the offset,
+    used to notice when the file was rewritten rather than appended to
+  - mergeable accumulators: the distinct rollercoaster_type set
+    (assignment3), per-theme intensity sums and counts for 'High'
+    excitement (assignment5), and for max_pos_gs / max_neg_gs the value
+    counts, running total and max (assignment9; median and mode come
+    from the value counts)
+
+Each run parses only the appended tail. A trailing line without a
+newline is left for the next run, in case it is still being written.
+
+Function:
+  update_reports(csv_path, state_path=None, gs_csv='gs_statistics.csv')
+    - Brings the state up to date and returns a dict with
+      'distinct_types', 'theme_averages' and 'gs_stats'; gs_csv is
+      rewritten like assignment9 does
+"""
+
+import json
+import os
+import zlib
+
+from assignment9 import median_from_counts, mode_from_counts, write_gs_stats
+from csv_rows import iter_rows, parse_header, to_float
+
+STATE_SUFFIX = '.state.json'
+STATE_VERSION = 1
+# bytes before the saved offset that must be unchanged for an append-only update
+CHECK_BYTES = 256
+
+def default_state_path(csv_path):
+    return csv_path + STATE_SUFFIX
+
+
+class ColumnState:
+    """Value counts, running total and max of one numeric column."""
+
+    def __init__(self):
+        self.counts = {}  # value -> count, in first-seen order
+        self.total = 0.0
+        self.max = None
+
+    def add(self, value):
+        self.counts[value] = self.counts.get(value, 0) + 1
+        self.total += value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def merge(self, other):
+        for value, count in other.counts.items():
+            self.counts[value] = self.counts.get(value, 0) + count
+        self.total += other.total
+        if other.max is not None and (self.max is None or other.max > self.max):
+            self.max = other.max
+
+    def stats(self):
+        """Return (max, median, mean, mode), or (None, None, None, None) if empty."""
+        n = 0
+        for count in self.counts.values():
+            n += count
+        if n == 0:
+            return (None, None, None, None)
+        return (self.max, median_from_counts(self.counts), self.total / n,
+                mode_from_counts(self.counts))
+
+    def to_json(self):
+        return {'counts': [[value, count] for value, count in self.counts.items()],
+                'total': self.total, 'max': self.max}
+
+    @classmethod
+    def from_json(cls, data):
+        state = cls()
+        for value, count in data['counts']:
+            state.counts[value] = count
+        state.total = data['total']
+        state.max = data['max']
+        return state
+
+
+class ReportState:
+    """Mergeable accumulators for the assignment3, assignment5 and assignment9 reports."""
+
+    def __init__(self):
+        self.types = set()
+        self.theme_sums = {}
+        self.theme_counts = {}
+        self.max_pos_gs = ColumnState()
+        self.max_neg_gs = ColumnState()
+
+    def update(self, rows, headers):
+        """Fold rows (stripped field lists) into the state, with each report's skip rules."""
+        try:
+            idx_type = headers.index('rollercoaster_type')
+            idx_theme = headers.index('theme')
+            idx_excitement_rating = headers.index('excitement_rating')
+            idx_intensity = headers.index('intensity')
+            idx_max_pos_gs = headers.index('max_pos_gs')
+            idx_max_neg_gs = headers.index('max_neg_gs')
+        except ValueError as e:
+            raise ValueError('Missing required header: ' + str(e))
+        header_count = len(headers)
+        theme_min_fields = max(idx_theme, idx_excitement_rating, idx_intensity) + 1
+        types = self.types
+        sums = self.theme_sums
+        counts = self.theme_counts
+        for parts in rows:
+            n = len(parts)
+            # assignment3: the type column must exist and be non-empty
+            if n > idx_type and parts[idx_type]:
+                types.add(parts[idx_type])
+            # assignment5
+            if n >= theme_min_fields and parts[idx_excitement_rating] == 'High':
+                intensity_val = to_float(parts[idx_intensity], default=None)
+                if intensity_val is not None:
+                    theme = parts[idx_theme]
+                    sums[theme] = sums.get(theme, 0.0) + intensity_val
+                    counts[theme] = counts.get(theme, 0) + 1
+            # assignment9: only complete rows
+            if n >= header_count:
+                pos_val = to_float(parts[idx_max_pos_gs], default=None)
+                neg_val = to_float(parts[idx_max_neg_gs], default=None)
+                if pos_val is not None:
+                    self.max_pos_gs.add(pos_val)
+                if neg_val is not None:
+                    self.max_neg_gs.add(neg_val)
+
+    def merge(self, other):
+        """Add another state's accumulators (e.g. from a later chunk or another file)."""
+        self.types.update(other.types)
+        for theme in other.theme_sums:
+            self.theme_sums[theme] = self.theme_sums.get(theme, 0.0) + other.theme_sums[theme]
+            self.theme_counts[theme] = self.theme_counts.get(theme, 0) + other.theme_counts[theme]
+        self.max_pos_gs.merge(other.max_pos_gs)
+        self.max_neg_gs.merge(other.max_neg_gs)
+
+    def results(self):
+        averages = {}
+        for theme in self.theme_sums:
+            averages[theme] = self.theme_sums[theme] / self.theme_counts[theme]
+        return {
+            'distinct_types': sorted(self.types),
+            'theme_averages': averages,
+            'gs_stats': (self.max_pos_gs.stats(), self.max_neg_gs.stats()),
+        }
+
+    def to_json(self):
+        return {
+            'types': sorted(self.types),
+            'theme_sums': self.theme_sums,
+            'theme_counts': self.theme_counts,
+            'max_pos_gs': self.max_pos_gs.to_json(),
+            'max_neg_gs': self.max_neg_gs.to_json(),
+        }
+
+    @classmethod
+    def from_json(cls, data):
+        state = cls()
+        state.types = set(data['types'])
+        state.theme_sums = dict(data['theme_sums'])
+        state.theme_counts = dict(data['theme_counts'])
+        state.max_pos_gs = ColumnState.from_json(data['max_pos_gs'])
+        state.max_neg_gs = ColumnState.from_json(data['max_neg_gs'])
+        return state
+
+
+def tail_checksum(f, offset):
+    """CRC32 of the CHECK_BYTES bytes before offset in the binary file f."""
+    start = max(0, offset - CHECK_BYTES)
+    f.seek(start)
+    return zlib.crc32(f.read(offset - start))
+
+def load_state(state_path):
+    try:
+        with open(state_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if data.get('version') != STATE_VERSION:
+        return None
+    return data
+
+def save_state(state_path, data):
+    tmp_path = state_path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+    os.replace(tmp_path, state_path)
+
+def complete_lines(f):
+    """Yield (decoded line, length in bytes) for every newline-terminated line left in f."""
+    for line in f:
+        if not line.endswith(b'\n'):
+            # possibly still being written; pick it up next run
+            return
+        yield line.decode('utf-8'), len(line)
+
+def update_reports(csv_path, state_path=None, gs_csv='gs_statistics.csv'):
+    """Process only the rows appended since the last run and refresh the outputs."""
+    if state_path is None:
+        state_path = default_state_path(csv_path)
+    data = load_state(state_path)
+
+    with open(csv_path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        state = None
+        if data is not None and data['offset'] <= size:
+            f.seek(0)
+            header_line = f.readline().decode('utf-8').rstrip('\n')
+            if (header_line == data['header_line']
+                    and tail_checksum(f, data['offset']) == data['checksum']):
+                state = ReportState.from_json(data['state'])
+                offset = data['offset']
+        if state is None:
+            # first run, or the file was replaced rather than appended to
+            f.seek(0)
+            header = f.readline()
+            if not header.endswith(b'\n'):
+                # no complete header yet
+                return ReportState().results()
+            header_line = header.decode('utf-8').rstrip('\n')
+            state = ReportState()
+            offset = len(header)
+
+        headers = parse_header(header_line)
+        f.seek(offset)
+        consumed = [0]
+
+        def tail_lines():
+            for line, nbytes in complete_lines(f):
+                consumed[0] += nbytes
+                yield line
+
+        state.update(iter_rows(tail_lines(), len(headers)), headers)
+        offset += consumed[0]
+        checksum = tail_checksum(f, offset)
+
+    save_state(state_path, {
+        'version': STATE_VERSION,
+        'offset': offset,
+        'header_line': header_line,
+        'checksum': checksum,
+        'state': state.to_json(),
+    })
+
+    results = state.results()
+    pos_stats, neg_stats = results['gs_stats']
+    if pos_stats[0] is not None and neg_stats[0] is not None:
+        write_gs_stats(gs_csv, pos_stats, neg_stats)
+    return results
+
+
+if __name__ == '__main__':
+    CSV_PATH = 'rollercoasters.csv'
+    results = update_reports(CSV_PATH)
+    print('Number of distinct rollercoaster types:', len(results['distinct_types']))
+    print('Themes with High excitement averages:', len(results['theme_averages']))
+    pos_stats, neg_stats = results['gs_stats']
+    print(f"max_pos_gs stats: {pos_stats}")
+    print(f"max_neg_gs stats: {neg_stats}")
+    print('State saved to', default_state_path(CSV_PATH))
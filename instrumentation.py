@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Opt-in timing and counter instrumentation for the report functions.
+
+Disabled by default. While disabled, instrumented code only pays for a
+flag check per call (never per row): stage() hands back a shared no-op
+context manager and the row readers use their plain loops.
+
+Once enabled, the following are collected:
+  timers    seconds and call count per stage, e.g. 'assignment7.sort',
+            plus one entry per instrumented public function
+  counters  rows_read (non-blank data lines), rows_parsed (rows handed to
+            the report), rows_skipped (malformed, too few fields),
+            rows_emitted (result rows produced) and bytes_written
+
+Functions:
+  enable() / disable() / reset()
+  stage(name)            context manager timing one stage
+  count(name, n=1)       add to a counter
+  snapshot()             {'timers': {...}, 'counters': {...}}
+  export_json(path=None) snapshot as JSON text, also written to path if given
+  add_callback(func)     func(function_name, snapshot) is called after
+                         every instrumented public function returns
+  instrumented(name, emitted=None)
+                         decorator for the public report functions
+"""
+
+import functools
+import json
+import os
+import time
+
+enabled = False
+_timers = {}  # name -> [seconds, calls]
+_counters = {}  # name -> int
+_callbacks = []
+
+
+class _NoOpStage:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+class _Stage:
+    __slots__ = ('name', 'start')
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        add_time(self.name, time.perf_counter() - self.start)
+        return False
+
+
+_NO_OP_STAGE = _NoOpStage()
+
+def enable():
+    global enabled
+    enabled = True
+
+def disable():
+    global enabled
+    enabled = False
+
+def reset():
+    _timers.clear()
+    _counters.clear()
+
+def add_time(name, seconds):
+    entry = _timers.get(name)
+    if entry is None:
+        _timers[name] = [seconds, 1]
+    else:
+        entry[0] += seconds
+        entry[1] += 1
+
+def stage(name):
+    """Return a context manager that times the enclosed block under name."""
+    if not enabled:
+        return _NO_OP_STAGE
+    return _Stage(name)
+
+def count(name, n=1):
+    if enabled:
+        _counters[name] = _counters.get(name, 0) + n
+
+def count_file_bytes(path):
+    """Add the size of a file just written to bytes_written."""
+    if enabled:
+        count('bytes_written', os.path.getsize(path))
+
+def snapshot():
+    return {
+        'timers': {name: {'seconds': seconds, 'calls': calls}
+                   for name, (seconds, calls) in _timers.items()},
+        'counters': dict(_counters),
+    }
+
+def export_json(path=None):
+    text = json.dumps(snapshot(), indent=2, sort_keys=True)
+    if path is not None:
+        with open(path, 'w', encoding='utf-8') as out:
+            out.write(text + '\n')
+    return text
+
+def add_callback(func):
+    _callbacks.append(func)
+
+def remove_callback(func):
+    _callbacks.remove(func)
+
+def instrumented(name, emitted=None):
+    """Decorator: time the whole call under name and notify callbacks when enabled.
+
+    emitted, if given, maps the return value to the number of result rows
+    it holds, which is added to rows_emitted.
+    """
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                result = func(*args, **kwargs)
+                if emitted is not None:
+                    count('rows_emitted', emitted(result))
+                return result
+            finally:
+                add_time(name, time.perf_counter() - start)
+                if _callbacks:
+                    current = snapshot()
+                    for callback in list(_callbacks):
+                        callback(name, current)
+        return wrapper
+    return decorate
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Sorted secondary index on excitement_rating and intensity.
+
+For every excitement_rating value the index keeps the intensities of
+that partition sorted ascending, together with each row's file position
+(row id) and rollercoaster_type code. Threshold and range queries on
+intensity are answered with two binary searches instead of a full scan.
+
+The index is built from the CSV with the same rules as the
+assignment4 scans: columns are found by header name, a row is kept if it
+holds the three needed columns (max(indices) + 1 fields), and rows with
+a missing, non-numeric or NaN intensity are left out, since they can
+never match a bound. So a query gives the same answer with or without
+the index.
+
+The index is persisted next to the CSV as <csv_path>.intensityindex,
+in the same sidecar layout as coaster_cache, and is only used while the
+CSV still has the size and modification time it was built from.
+
+Functions:
+  build_intensity_index(csv_path, index_path=None)
+    - Builds the index from one scan of the CSV, saves and returns it
+  find_intensity_index(csv_path, index_path=None)
+    - Returns the saved index if it is present and fresh, else None
+"""
+
+from array import array
+from bisect import bisect_left, bisect_right
+
+from categorical import Categories
+from coaster_cache import is_fresh, map_arrays_file, source_signature, write_arrays_file
+from csv_rows import RowReader, to_float
+
+# version 2 resolves columns from the header, keeps short rows and stores types
+MAGIC = b'CINTIDX2'
+INDEX_SUFFIX = '.intensityindex'
+
+def default_index_path(csv_path):
+    return csv_path + INDEX_SUFFIX
+
+
+class IntensityIndexBuilder:
+    """Collects index entries row by row (e.g. as a pipeline consumer's helper)."""
+
+    def __init__(self, headers):
+        try:
+            self.idx_type = headers.index('rollercoaster_type')
+            self.idx_excitement_rating = headers.index('excitement_rating')
+            self.idx_intensity = headers.index('intensity')
+        except ValueError as e:
+            raise ValueError('Missing required header: ' + str(e))
+        # the assignment4 rule: the row must hold every needed column
+        self.min_fields = max(self.idx_type, self.idx_excitement_rating, self.idx_intensity) + 1
+        self.types = Categories()
+        self.entries = {}  # rating -> [(intensity, row id, type code)]
+        self.row_id = 0
+
+    def add(self, parts):
+        """Add one row (stripped fields); rows go in file order."""
+        row_id = self.row_id
+        self.row_id += 1
+        if len(parts) < self.min_fields:
+            return
+        value = to_float(parts[self.idx_intensity], default=None)
+        # NaN can never match a comparison, so like None it is left out
+        if value is None or value != value:
+            return
+        entry = (value, row_id, self.types.encode(parts[self.idx_type]))
+        rating = parts[self.idx_excitement_rating]
+        entries = self.entries.get(rating)
+        if entries is None:
+            self.entries[rating] = [entry]
+        else:
+            entries.append(entry)
+
+    def index(self):
+        partitions = {}
+        for rating, entries in self.entries.items():
+            entries.sort()
+            partitions[rating] = (array('d', [value for value, _, _ in entries]),
+                                  array('I', [row_id for _, row_id, _ in entries]),
+                                  array('I', [code for _, _, code in entries]))
+        return IntensityIndex(partitions, self.types.values)
+
+
+class IntensityIndex:
+    def __init__(self, partitions, types):
+        # rating -> (sorted intensities, row ids and type codes in the same order)
+        self.partitions = partitions
+        self.types = types  # type code -> rollercoaster_type
+
+    @classmethod
+    def from_rows(cls, rows, headers):
+        """Build the index from stripped field lists in file order."""
+        builder = IntensityIndexBuilder(headers)
+        for parts in rows:
+            builder.add(parts)
+        return builder.index()
+
+    def matches(self, rating=None, intensity_gt=None, intensity_lt=None):
+        """
+        Return (row id, type code) of every row, in file order, whose
+        excitement_rating equals rating (any rating if None) and whose
+        intensity is > intensity_gt and < intensity_lt (either bound may be None).
+        """
+        if rating is None:
+            selected = list(self.partitions.values())
+        elif rating in self.partitions:
+            selected = [self.partitions[rating]]
+        else:
+            return []
+        matches = []
+        for values, ids, codes in selected:
+            lo = 0 if intensity_gt is None else bisect_right(values, intensity_gt)
+            hi = len(values) if intensity_lt is None else bisect_left(values, intensity_lt)
+            if lo < hi:
+                matches.extend(zip(ids[lo:hi], codes[lo:hi]))
+        matches.sort()
+        return matches
+
+    def row_ids(self, rating=None, intensity_gt=None, intensity_lt=None):
+        """Row ids (positions among the file's data rows) of the matches, ascending."""
+        return [row_id for row_id, _ in self.matches(rating, intensity_gt, intensity_lt)]
+
+    def rollercoaster_types(self, rating=None, intensity_gt=None, intensity_lt=None):
+        """rollercoaster_type of the matches, in file order (as assignment4.query returns)."""
+        types = self.types
+        return [types[code] for _, code in self.matches(rating, intensity_gt, intensity_lt)]
+
+    def save(self, index_path, signature):
+        arrays = []
+        ratings = []
+        for n, (rating, (values, ids, codes)) in enumerate(self.partitions.items()):
+            ratings.append(rating)
+            arrays.append(('values{}'.format(n), values))
+            arrays.append(('ids{}'.format(n), ids))
+            arrays.append(('types{}'.format(n), codes))
+        meta = {'source_size': signature[0], 'source_mtime_ns': signature[1],
+                'ratings': ratings, 'types': list(self.types)}
+        write_arrays_file(index_path, MAGIC, meta, arrays)
+
+    @classmethod
+    def load(cls, index_path, signature):
+        """Return the index saved at index_path, or None if missing or stale."""
+        mapped = map_arrays_file(index_path, MAGIC)
+        if mapped is None:
+            return None
+        meta, arrays, mm = mapped
+        if not is_fresh(meta, signature):
+            return None
+        partitions = {}
+        for n, rating in enumerate(meta['ratings']):
+            partitions[rating] = (arrays['values{}'.format(n)], arrays['ids{}'.format(n)],
+                                  arrays['types{}'.format(n)])
+        index = cls(partitions, meta['types'])
+        index.buffer = mm
+        return index
+
+
+def build_intensity_index(csv_path, index_path=None):
+    """Build the index for csv_path, write it next to the CSV and return it."""
+    if index_path is None:
+        index_path = default_index_path(csv_path)
+    signature = source_signature(csv_path)
+    with RowReader(csv_path) as reader:
+        if reader.header_line is None:
+            index = IntensityIndex({}, [])
+        else:
+            index = IntensityIndex.from_rows(reader.rows(), reader.headers)
+    index.save(index_path, signature)
+    return index
+
+def find_intensity_index(csv_path, index_path=None):
+    """Return the saved index for csv_path if present and up to date, else None."""
+    if index_path is None:
+        index_path = default_index_path(csv_path)
+    return IntensityIndex.load(index_path, source_signature(csv_path))
+
+
+if __name__ == '__main__':
+    CSV_PATH = 'rollercoasters.csv'
+    index = build_intensity_index(CSV_PATH)
+    for rating in sorted(index.partitions):
+        print(f"- {rating}: {len(index.partitions[rating][0])} rows")
+    print('Saved', default_index_path(CSV_PATH))
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Scan rollercoasters.csv in parallel, one byte range per task.
+
+The data part of the file (everything after the header line) is split
+into byte ranges that start and end on line boundaries. Each range is
+parsed in a worker process with the same row rules as csv_rows, and the
+partial results come back in file order so callers can merge them.
+
+Functions:
+  line_aligned_ranges(path, chunk_count)
+    - Returns a list of (start, end) byte offsets covering every data line
+  range_rows(path, start, end, header_count, min_fields=0)
+    - Yields the stripped field lists of the rows inside one range
+  scan_in_parallel(path, worker, args=(), workers=None)
+    - Runs worker(path, start, end, *args) for each range in a process pool
+      and returns the list of results, in file order
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from csv_rows import iter_rows
+
+# more chunks than workers so a slow chunk does not leave other cores idle
+CHUNKS_PER_WORKER = 4
+
+def line_aligned_ranges(path, chunk_count):
+    """Split the data lines of path into at most chunk_count (start, end) byte ranges."""
+    size = os.path.getsize(path)
+    with open(path, 'rb') as f:
+        f.readline()  # header
+        data_start = f.tell()
+        bounds = [data_start]
+        step = max(1, (size - data_start) // max(1, chunk_count))
+        for i in range(1, chunk_count):
+            target = data_start + i * step
+            if target <= bounds[-1]:
+                continue
+            # finish the line holding byte target-1, so a range never starts mid-line
+            f.seek(target - 1)
+            f.readline()
+            pos = f.tell()
+            if pos >= size:
+                break
+            if pos > bounds[-1]:
+                bounds.append(pos)
+        bounds.append(size)
+    return [(bounds[i], bounds[i + 1]) for i in range(len(bounds) - 1) if bounds[i] < bounds[i + 1]]
+
+def range_lines(path, start, end):
+    """Yield the decoded lines that start inside [start, end)."""
+    with open(path, 'rb') as f:
+        f.seek(start)
+        pos = start
+        for line in f:
+            if pos >= end:
+                break
+            pos += len(line)
+            yield line.decode('utf-8')
+
+def range_rows(path, start, end, header_count, min_fields=0):
+    """Yield the rows of one byte range as stripped field lists."""
+    return iter_rows(range_lines(path, start, end), header_count, min_fields)
+
+def scan_in_parallel(path, worker, args=(), workers=None):
+    """
+    Call worker(path, start, end, *args) for every line-aligned byte range of path
+    in a pool of worker processes. worker must be a module-level function.
+    Returns the list of worker results in file order.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    ranges = line_aligned_ranges(path, workers * CHUNKS_PER_WORKER)
+    if not ranges:
+        return []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(worker, path, start, end, *args) for start, end in ranges]
+        return [future.result() for future in futures]
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Offset index over a CSV sorted by park_id (assignment7's output).
+
+Rows of one park sit in one contiguous block of the sorted file, so the
+index only keeps, per distinct park_id (ascending): the byte offset of
+its block and its row count, plus the end offset of the last block.
+Looking a park up is a binary search over the ids, one seek and one read
+of exactly that block, instead of a scan of the whole file.
+
+park_id is compared the way assignment7 sorts it (int(float(value)),
+non-numeric ids count as 0), so park 17 also finds rows written as 17.0.
+
+The index is persisted next to the sorted CSV as <csv_path>.parkindex,
+in coaster_cache's sidecar layout, and is only used while the sorted CSV
+still has the size and modification time it was indexed at.
+sort_by_park_id_and_write(..., write_index=True) builds it while
+writing; load_park_index builds it from an existing sorted file.
+
+Functions:
+  find_park_index(sorted_csv, index_path=None)
+    - Returns the saved index if it is present and fresh, else None
+  build_park_index(sorted_csv, index_path=None)
+    - Indexes an existing sorted file (ValueError if it is not sorted), saves and returns it
+  load_park_index(sorted_csv, index_path=None)
+    - find_park_index, falling back to build_park_index
+  read_park(sorted_csv, park_id, index=None)
+    - Returns the park's rows as stripped field lists, in file order
+"""
+
+import sys
+from array import array
+from bisect import bisect_left
+
+from coaster_cache import is_fresh, map_arrays_file, source_signature, write_arrays_file
+from csv_io import is_compressed
+from csv_rows import to_int
+
+MAGIC = b'CPARKIX1'
+INDEX_SUFFIX = '.parkindex'
+
+def default_index_path(csv_path):
+    return csv_path + INDEX_SUFFIX
+
+def park_id_key(value):
+    """The key assignment7 sorts park_id by."""
+    return to_int(value, default=0)
+
+def check_indexable(csv_path):
+    if is_compressed(csv_path):
+        raise ValueError("Can't index a compressed file: " + str(csv_path))
+
+
+class ParkIndex:
+    def __init__(self, park_ids, offsets, counts, header_count, park_column):
+        self.park_ids = park_ids  # distinct keys, ascending
+        self.offsets = offsets  # block start per key, then the end of the last block
+        self.counts = counts  # rows per key
+        self.header_count = header_count
+        self.park_column = park_column
+
+    def __len__(self):
+        return len(self.park_ids)
+
+    def find(self, park_id):
+        """Return (start offset, end offset, row count) of park_id's block, or None."""
+        key = park_id_key(park_id)
+        i = bisect_left(self.park_ids, key)
+        if i == len(self.park_ids) or self.park_ids[i] != key:
+            return None
+        return self.offsets[i], self.offsets[i + 1], self.counts[i]
+
+    def save(self, index_path, signature):
+        meta = {'source_size': signature[0], 'source_mtime_ns': signature[1],
+                'header_count': self.header_count, 'park_column': self.park_column}
+        write_arrays_file(index_path, MAGIC, meta, [('park_ids', self.park_ids),
+                                                    ('offsets', self.offsets),
+                                                    ('counts', self.counts)])
+
+    @classmethod
+    def load(cls, index_path, signature):
+        """Return the index saved at index_path, or None if missing or stale."""
+        mapped = map_arrays_file(index_path, MAGIC)
+        if mapped is None:
+            return None
+        meta, arrays, mm = mapped
+        if not is_fresh(meta, signature):
+            return None
+        index = cls(arrays['park_ids'], arrays['offsets'], arrays['counts'],
+                    meta['header_count'], meta['park_column'])
+        index.buffer = mm
+        return index
+
+
+class ParkIndexBuilder:
+    """
+    Records the blocks of a sorted file as its lines are written.
+    header_line is None for an empty file; lines carry no newline.
+    """
+
+    def __init__(self, header_line, header_count, park_column=0):
+        self.header_count = header_count
+        self.park_column = park_column
+        self.park_ids = array('q')
+        self.offsets = array('Q')
+        self.counts = array('Q')
+        self.offset = 0 if header_line is None else len(header_line.encode('utf-8')) + 1
+
+    def add(self, key, nbytes):
+        if self.park_ids and self.park_ids[-1] == key:
+            self.counts[-1] += 1
+        elif self.park_ids and key < self.park_ids[-1]:
+            raise ValueError('Rows are not sorted by park_id')
+        else:
+            self.park_ids.append(key)
+            self.offsets.append(self.offset)
+            self.counts.append(1)
+        self.offset += nbytes
+
+    def track(self, lines):
+        """Yield lines unchanged, recording each one's park_id and byte length."""
+        column = self.park_column
+        add = self.add
+        for line in lines:
+            # ASCII lines are as long in bytes as in characters
+            nbytes = len(line) if line.isascii() else len(line.encode('utf-8'))
+            add(park_id_key(line.split(',', column + 1)[column]), nbytes + 1)
+            yield line
+
+    def index(self):
+        offsets = array('Q', self.offsets)
+        offsets.append(self.offset)
+        return ParkIndex(self.park_ids, offsets, self.counts, self.header_count,
+                         self.park_column)
+
+    def save(self, index_path, csv_path):
+        """Save the index for the finished (closed) csv_path and return it."""
+        index = self.index()
+        index.save(index_path, source_signature(csv_path))
+        return index
+
+
+def find_park_index(sorted_csv, index_path=None):
+    """Return the saved index for sorted_csv if present and up to date, else None."""
+    if index_path is None:
+        index_path = default_index_path(sorted_csv)
+    return ParkIndex.load(index_path, source_signature(sorted_csv))
+
+def build_park_index(sorted_csv, index_path=None, park_column='park_id'):
+    """Index sorted_csv, whose rows must be sorted by park_column, then save and return the index."""
+    check_indexable(sorted_csv)
+    if index_path is None:
+        index_path = default_index_path(sorted_csv)
+    with open(sorted_csv, 'rb') as f:
+        header = f.readline()
+        if not header.strip():
+            builder = ParkIndexBuilder(None, 0)
+            builder.offset = len(header)
+        else:
+            headers = [h.strip() for h in header.decode('utf-8').split(',')]
+            if park_column not in headers:
+                raise ValueError('Missing required header: ' + repr(park_column))
+            idx = headers.index(park_column)
+            builder = ParkIndexBuilder(None, len(headers), idx)
+            builder.offset = len(header)
+            for line in f:
+                if not line.strip():
+                    # blank lines stay inside the current block; read_park drops them
+                    builder.offset += len(line)
+                    continue
+                fields = line.split(b',', idx + 1)
+                if len(fields) <= idx:
+                    raise ValueError('Row without a park_id at offset {}'.format(builder.offset))
+                builder.add(park_id_key(fields[idx]), len(line))
+    return builder.save(index_path, sorted_csv)
+
+def load_park_index(sorted_csv, index_path=None):
+    """Return a fresh index for sorted_csv, rebuilding the sidecar if needed."""
+    index = find_park_index(sorted_csv, index_path)
+    if index is None:
+        index = build_park_index(sorted_csv, index_path)
+    return index
+
+def read_park(sorted_csv, park_id, index=None):
+    """Return the rows of park_id in sorted_csv as stripped field lists ([] if none)."""
+    if index is None:
+        index = load_park_index(sorted_csv)
+    block = index.find(park_id)
+    if block is None:
+        return []
+    start, end, _ = block
+    with open(sorted_csv, 'rb') as f:
+        f.seek(start)
+        data = f.read(end - start).decode('utf-8')
+    limit = index.header_count - 1
+    return [[p.strip() for p in line.split(',', limit)]
+            for line in data.splitlines() if line.strip()]
+
+
+if __name__ == '__main__':
+    from assignment7 import sort_by_park_id_and_write
+
+    SORTED = 'rollercoasters_sorted_by_park_id.csv'
+    sort_by_park_id_and_write('rollercoasters.csv', SORTED, write_index=True)
+    index = load_park_index(SORTED)
+    park_id = sys.argv[1] if len(sys.argv) > 1 else index.park_ids[len(index) // 2]
+    rows = read_park(SORTED, park_id, index)
+    print(f"{len(index)} parks indexed in {default_index_path(SORTED)}")
+    print(f"park {park_id}: {len(rows)} rows", [parts[2] for parts in rows])
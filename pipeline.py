@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+Run every rollercoasters.csv report from a single pass over the file.
+
+The file is read once and each data row is handed to a list of report
+"consumers". A consumer is any object with three methods:
+
+  start(headers, header_line)  - called once with the parsed header
+                                 (headers [] and header_line None for an
+                                 empty file)
+  feed(parts)                  - called for every non-blank data row
+  finish()                     - called at the end, returns the result
+
+Each built-in consumer reproduces one of the assignment scripts exactly
+(same row skipping rules, same output files, same return values), down
+to the empty outputs written for an empty file.
+
+Function:
+  run_reports(csv_path, reports)
+    - Streams csv_path once and returns the list of finish() results
+  run_all_reports(csv_path, ...)
+    - Runs the six assignment reports and returns a dict of results
+"""
+
+from csv_io import RowWriter, open_text
+from csv_rows import RowReader, to_float, to_int
+from instrumentation import instrumented
+from assignment8 import SPEED_LABELS, avg_speed_buckets
+from assignment9 import find_stats, write_gs_stats
+
+# avg_speed rows bucketed at a time
+BATCH_ROWS = 4096
+
+
+class DistinctTypesReport:
+    """Distinct rollercoaster_type values, sorted (assignment3)."""
+
+    def __init__(self, column='rollercoaster_type'):
+        self.column = column
+
+    def start(self, headers, header_line):
+        self.types_set = set()
+        if header_line is None:
+            return
+        if self.column not in headers:
+            raise ValueError("Header '" + self.column + "' not found in CSV header")
+        self.idx = headers.index(self.column)
+
+    def feed(self, parts):
+        if len(parts) <= self.idx:
+            return
+        value = parts[self.idx]
+        if value:
+            self.types_set.add(value)
+
+    def finish(self):
+        return sorted(self.types_set)
+
+
+class MediumExcitementFilterReport:
+    """rollercoaster_type of 'Medium' excitement rows with intensity > 5.40 (assignment4)."""
+
+    def start(self, headers, header_line):
+        self.result = []
+        if header_line is None:
+            return
+        for name in ('rollercoaster_type', 'excitement_rating', 'intensity'):
+            if name not in headers:
+                raise ValueError("Missing header '" + name + "'")
+        self.idx_type = headers.index('rollercoaster_type')
+        self.idx_excitement_rating = headers.index('excitement_rating')
+        self.idx_intensity = headers.index('intensity')
+        self.max_idx = max(self.idx_type, self.idx_excitement_rating, self.idx_intensity)
+
+    def feed(self, parts):
+        if len(parts) <= self.max_idx:
+            return
+        if parts[self.idx_excitement_rating] != 'Medium':
+            return
+        intensity_val = to_float(parts[self.idx_intensity], default=None)
+        if (intensity_val is not None) and (intensity_val > 5.40):
+            self.result.append(parts[self.idx_type])
+
+    def finish(self):
+        return self.result
+
+
+class ThemeAverageReport:
+    """Average intensity by theme for 'High' excitement rows (assignment5)."""
+
+    def start(self, headers, header_line):
+        self.sums = {}
+        self.counts = {}
+        if header_line is None:
+            return
+        try:
+            self.idx_theme = headers.index('theme')
+            self.idx_excitement_rating = headers.index('excitement_rating')
+            self.idx_intensity = headers.index('intensity')
+        except ValueError as e:
+            raise ValueError('Missing required header: ' + str(e))
+        self.max_idx = max(self.idx_theme, self.idx_excitement_rating, self.idx_intensity)
+
+    def feed(self, parts):
+        if len(parts) <= self.max_idx:
+            return
+        if parts[self.idx_excitement_rating] != 'High':
+            return
+        intensity_val = to_float(parts[self.idx_intensity], default=None)
+        if intensity_val is not None:
+            theme = parts[self.idx_theme]
+            self.sums[theme] = self.sums.get(theme, 0.0) + intensity_val
+            self.counts[theme] = self.counts.get(theme, 0) + 1
+
+    def finish(self):
+        averages = {}
+        for theme in self.sums:
+            averages[theme] = self.sums[theme] / self.counts[theme]
+        return averages
+
+
+class SortByParkReport:
+    """Rows sorted by numeric park_id, written to output_csv (assignment7)."""
+
+    def __init__(self, output_csv):
+        self.output_csv = output_csv
+
+    def start(self, headers, header_line):
+        # an empty file gives an empty output file, as in assignment7
+        self.header = header_line
+        self.header_count = len(headers)
+        self.rows = []
+
+    def feed(self, parts):
+        if len(parts) < self.header_count:
+            return
+        self.rows.append((to_int(parts[0], default=0), parts))
+
+    def finish(self):
+        self.rows.sort(key=lambda x: x[0])
+        with RowWriter(self.output_csv, self.header) as out:
+            out.write_rows(parts for _, parts in self.rows)
+        return len(self.rows)
+
+
+class AvgSpeedBucketReport:
+    """Low/Medium/High avg_speed buckets written to output_csv (assignment8)."""
+
+    def __init__(self, output_csv, low_threshold=10.0, high_threshold=15.0):
+        self.output_csv = output_csv
+        self.low_threshold = low_threshold
+        self.high_threshold = high_threshold
+
+    def start(self, headers, header_line):
+        # one (seen set, rows list) pair per category, in output order
+        self.buckets = [(set(), []), (set(), []), (set(), [])]
+        self.pending_speeds = []
+        self.pending_keys = []
+        self.empty = header_line is None
+        if self.empty:
+            return
+        try:
+            self.idx_park = headers.index('park_id')
+            self.idx_theme = headers.index('theme')
+            self.idx_type = headers.index('rollercoaster_type')
+            self.idx_avg_speed = headers.index('avg_speed')
+        except ValueError:
+            raise ValueError('Required header(s) missing')
+        self.header_count = len(headers)
+
+    def feed(self, parts):
+        if len(parts) < self.header_count:
+            return
+        avg = to_float(parts[self.idx_avg_speed], default=None)
+        if avg is None:
+            return
+        self.pending_speeds.append(avg)
+        self.pending_keys.append((parts[self.idx_park], parts[self.idx_theme],
+                                  parts[self.idx_type], "{:.2f}".format(avg)))
+        if len(self.pending_speeds) >= BATCH_ROWS:
+            self.flush()
+
+    def flush(self):
+        # assignment8's bucketing, so the boundary and NaN rules live in one place
+        buckets = avg_speed_buckets(self.pending_speeds, self.low_threshold, self.high_threshold)
+        for bucket, key in zip(buckets, self.pending_keys):
+            seen, rows = self.buckets[bucket]
+            if key not in seen:
+                seen.add(key)
+                rows.append(key)
+        self.pending_speeds = []
+        self.pending_keys = []
+
+    def finish(self):
+        self.flush()
+        # an empty file gives an empty output file, as in assignment8
+        header = None if self.empty else 'category,park_id,theme,rollercoaster_type,avg_speed'
+        with RowWriter(self.output_csv, header) as out:
+            for category, (_, rows) in zip(SPEED_LABELS, self.buckets):
+                out.write_rows((category,) + key for key in rows)
+        return tuple(len(rows) for _, rows in self.buckets)
+
+
+class GsStatsReport:
+    """max/median/mean/mode of max_pos_gs and max_neg_gs written to output_csv (assignment9)."""
+
+    def __init__(self, output_csv):
+        self.output_csv = output_csv
+
+    def start(self, headers, header_line):
+        self.max_pos_values = []
+        self.max_neg_values = []
+        self.empty = header_line is None
+        if self.empty:
+            return
+        try:
+            self.idx_max_pos_gs = headers.index('max_pos_gs')
+            self.idx_max_neg_gs = headers.index('max_neg_gs')
+        except ValueError:
+            raise ValueError('Required header(s) missing')
+        self.header_count = len(headers)
+
+    def feed(self, parts):
+        if len(parts) < self.header_count:
+            return
+        pos_val = to_float(parts[self.idx_max_pos_gs], default=None)
+        neg_val = to_float(parts[self.idx_max_neg_gs], default=None)
+        if pos_val is not None:
+            self.max_pos_values.append(pos_val)
+        if neg_val is not None:
+            self.max_neg_values.append(neg_val)
+
+    def finish(self):
+        if self.empty:
+            # as assignment9: an empty output file and no statistics
+            with open_text(self.output_csv, 'w') as out:
+                out.write('')
+            return (None, None)
+        pos_tuple = find_stats(self.max_pos_values)
+        neg_tuple = find_stats(self.max_neg_values)
+        write_gs_stats(self.output_csv, pos_tuple, neg_tuple)
+        return (pos_tuple, neg_tuple)
+
+
+@instrumented('pipeline.run_reports')
+def run_reports(csv_path, reports):
+    """
+    Read csv_path once, feeding every data row to each report.
+    Returns a list with each report's finish() result, in order.
+    Reports are started and finished on an empty file too, with headers []
+    and header_line None, so they can write their empty outputs.
+    """
+    with RowReader(csv_path) as reader:
+        for report in reports:
+            report.start(reader.headers, reader.header_line)
+
+        feeds = [report.feed for report in reports]
+        # each report applies its own malformed-row rule, so no min_fields here
+        for parts in reader.rows():
+            for feed in feeds:
+                feed(parts)
+
+    return [report.finish() for report in reports]
+
+def run_all_reports(csv_path,
+                    sorted_csv='rollercoasters_sorted_by_park_id.csv',
+                    speed_csv='rollercoasters_by_avg_speed.csv',
+                    gs_csv='gs_statistics.csv',
+                    low_threshold=10.0, high_threshold=15.0):
+    """
+    Produce every assignment report from one read of csv_path.
+    Returns a dict with keys 'distinct_types', 'medium_excitement_high_intensity',
+    'theme_averages', 'sorted_rows', 'speed_buckets' and 'gs_stats'.
+    """
+    names = ['distinct_types', 'medium_excitement_high_intensity', 'theme_averages',
+             'sorted_rows', 'speed_buckets', 'gs_stats']
+    reports = [
+        DistinctTypesReport(),
+        MediumExcitementFilterReport(),
+        ThemeAverageReport(),
+        SortByParkReport(sorted_csv),
+        AvgSpeedBucketReport(speed_csv, low_threshold, high_threshold),
+        GsStatsReport(gs_csv),
+    ]
+    return dict(zip(names, run_reports(csv_path, reports)))
+
+
+if __name__ == '__main__':
+    CSV_PATH = 'rollercoasters.csv'
+    results = run_all_reports(CSV_PATH)
+    print('Number of distinct rollercoaster types:', len(results['distinct_types']))
+    print('Medium excitement / high intensity matches:',
+          len(results['medium_excitement_high_intensity']))
+    print('Themes with High excitement averages:', len(results['theme_averages']))
+    print('Sorted rows written:', results['sorted_rows'])
+    low_c, med_c, high_c = results['speed_buckets']
+    print(f"Speed buckets -> Low:{low_c} Medium:{med_c} High:{high_c}")
+    pos_stats, neg_stats = results['gs_stats']
+    print(f"max_pos_gs stats: {pos_stats}")
+    print(f"max_neg_gs stats: {neg_stats}")
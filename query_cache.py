@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+In-process memoization of the report queries.
+
+A cached call is keyed on the function, the input file's absolute path,
+size and modification time, and every argument (defaults filled in), so
+editing or replacing the CSV automatically makes old results unreachable.
+Entries live in a bounded LRU and can also expire after ttl seconds.
+Hits return a shallow copy of the stored list/dict/set, so callers may
+modify what they get back without changing the cache.
+
+Functions that write files (categorize_avg_speed_and_write) list those
+arguments as outputs: a hit only counts if each output file still has the
+size and mtime it had right after the original call; otherwise the call
+runs again and rewrites it.
+
+Class:
+  QueryCache(max_entries=128, ttl=None)
+    - get(key, default=None, valid=None) / put(key, value), clear(),
+      stats() -> hits, misses, hit_rate, evictions, expirations,
+      invalidations, entries
+
+Functions:
+  memoize(func, cache=None, path_arg='csv_path', output_args=())
+    - Returns a caching wrapper of func
+  medium_excitement_high_intensity(...), theme_averages(...),
+  categorize_avg_speed(...)
+    - Cached versions of the assignment4, assignment5 and assignment8 queries,
+      sharing QUERY_CACHE
+"""
+
+import copy
+import functools
+import inspect
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from assignment4 import coasters_medium_excitement_high_intensity
+from assignment5 import avg_high_excitement_intensity_by_theme
+from assignment8 import categorize_avg_speed_and_write
+from coaster_cache import source_signature
+
+_MISSING = object()
+
+
+class QueryCache:
+    def __init__(self, max_entries=128, ttl=None, clock=time.monotonic):
+        if max_entries < 1:
+            raise ValueError('max_entries must be at least 1')
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.clock = clock
+        self.entries = OrderedDict()  # key -> (value, stored at), least recently used first
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, key, default=None, valid=None):
+        """
+        Return the value stored under key, or default. valid(value), if given,
+        can reject a stored value, which then counts as an invalidation and a miss.
+        """
+        with self.lock:
+            entry = self.entries.get(key, _MISSING)
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+            value, stored_at = entry
+            if self.ttl is not None and self.clock() - stored_at > self.ttl:
+                del self.entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return default
+            if valid is not None and not valid(value):
+                del self.entries[key]
+                self.invalidations += 1
+                self.misses += 1
+                return default
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        with self.lock:
+            self.entries[key] = (value, self.clock())
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.hits = self.misses = self.evictions = self.expirations = 0
+            self.invalidations = 0
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else None,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'invalidations': self.invalidations,
+                'entries': len(self.entries),
+            }
+
+
+QUERY_CACHE = QueryCache()
+
+def freeze(value):
+    """Turn lists, dicts and sets into hashable equivalents for use in a key."""
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, freeze(v)) for k, v in value.items()))
+    if isinstance(value, (set, frozenset)):
+        return frozenset(value)
+    return value
+
+def output_signature(path):
+    try:
+        return source_signature(path)
+    except OSError:
+        return None
+
+def outputs_unchanged(entry):
+    return all(output_signature(path) == sig for path, sig in entry[1])
+
+def memoize(func, cache=None, path_arg='csv_path', output_args=()):
+    """Return func wrapped so repeated calls on an unchanged file come from cache."""
+    store = QUERY_CACHE if cache is None else cache
+    signature = inspect.signature(func)
+    name = func.__module__ + '.' + func.__qualname__
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        path = bound.arguments[path_arg]
+        key = (name, os.path.abspath(path), source_signature(path),
+               freeze(tuple(bound.arguments.items())))
+        # an output file changed or removed since the call means running it again
+        entry = store.get(key, _MISSING, valid=outputs_unchanged)
+        if entry is not _MISSING:
+            return copy.copy(entry[0])
+        value = func(*args, **kwargs)
+        outputs = tuple((bound.arguments[arg], output_signature(bound.arguments[arg]))
+                        for arg in output_args)
+        store.put(key, (value, outputs))
+        return copy.copy(value)
+    wrapper.cache = store
+    return wrapper
+
+
+medium_excitement_high_intensity = memoize(coasters_medium_excitement_high_intensity)
+theme_averages = memoize(avg_high_excitement_intensity_by_theme)
+categorize_avg_speed = memoize(categorize_avg_speed_and_write, path_arg='input_csv',
+                               output_args=('output_csv',))
+
+
+if __name__ == '__main__':
+    CSV_PATH = 'rollercoasters.csv'
+    for _ in range(3):
+        start = time.perf_counter()
+        matches = medium_excitement_high_intensity(CSV_PATH)
+        averages = theme_averages(CSV_PATH)
+        counts = categorize_avg_speed(CSV_PATH, 'rollercoasters_by_avg_speed.csv',
+                                      low_threshold=10.0, high_threshold=15.0)
+        print(f"{(time.perf_counter() - start) * 1e6:9.1f} us: {len(matches)} matches, "
+              f"{len(averages)} themes, buckets {counts}")
+    print(QUERY_CACHE.stats())
@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""
+Long-running query server that keeps rollercoasters.csv resident.
+
+Every report script starts Python, parses the CSV and exits; for small
+interactive queries that startup and parse is most of the latency. This
+server reads the file once into a Snapshot and answers the report queries
+from memory over HTTP on localhost, one thread per request
+(http.server.ThreadingHTTPServer).
+
+A Snapshot is built from one pass (pipeline.run_reports) and never
+changed afterwards, so requests share it without locking:
+  - a ReportState (incremental) for distinct types, theme averages and
+    gs stats, with the same row rules as assignment3, 5 and 9
+  - an IntensityIndex for the excitement_rating / intensity filters
+    (with assignment4.query's row rules) and the count of complete rows
+  - the avg_speed and 64-bit row key hash of every complete row, so speed
+    buckets for any thresholds are counted (and de-duplicated) like
+    assignment8 without reading the file again
+
+A watcher thread checks the file's size and mtime every poll_interval
+seconds. When they change, a new Snapshot is loaded in the background and
+swapped in; requests keep using the old one until then. If loading fails
+(e.g. the file is being replaced), the old Snapshot stays and the error
+is reported by /status. Encoded responses are memoized per snapshot in a
+query_cache.QueryCache.
+
+Endpoints (GET, JSON responses; errors are {"error": message}):
+  /distinct_types
+  /filter?rating=Medium&intensity_gt=5.4&intensity_lt=
+      rollercoaster_type of matching rows in file order; every parameter
+      is optional, and /filter?rating=Medium&intensity_gt=5.4 is the
+      assignment4 query
+  /theme_averages
+  /speed_buckets?low=10&high=15        -> {"Low": n, "Medium": n, "High": n}
+  /gs_stats                            -> {column: {max, median, mean, mode}}
+  /status                              -> rows, reloads, signature, cache stats
+
+Functions:
+  load_snapshot(csv_path)
+  make_server(csv_path, host='127.0.0.1', port=8210, poll_interval=1.0)
+    - Returns a started-watcher server; call serve_forever(), and
+      shutdown() / server_close() to stop it
+  serve(csv_path, host='127.0.0.1', port=8210, poll_interval=1.0)
+"""
+
+import json
+import sys
+import threading
+import time
+from array import array
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from assignment8 import SPEED_LABELS, avg_speed_buckets
+from coaster_cache import source_signature
+from csv_rows import to_float
+from incremental import ReportState
+from intensity_index import IntensityIndex, IntensityIndexBuilder
+from pipeline import run_reports
+from query_cache import QueryCache
+from sketches import hash64
+
+DEFAULT_PORT = 8210
+SPEED_KEY_COLUMNS = ('park_id', 'theme', 'rollercoaster_type')
+# rows folded into the ReportState at a time while loading
+BATCH_ROWS = 4096
+
+
+class SnapshotReport:
+    """Pipeline consumer collecting everything a Snapshot holds; returns None for an empty file."""
+
+    def start(self, headers, header_line):
+        self.header_line = header_line
+        if header_line is None:
+            return
+        try:
+            self.idx_speed = headers.index('avg_speed')
+            self.key_idxs = [headers.index(name) for name in SPEED_KEY_COLUMNS]
+        except ValueError:
+            raise ValueError('Required header(s) missing')
+        self.headers = headers
+        self.header_count = len(headers)
+        self.state = ReportState()
+        self.pending = []
+        self.rows = 0  # complete rows
+        self.index = IntensityIndexBuilder(headers)
+        self.speeds = array('d')
+        self.speed_hashes = array('Q')
+
+    def feed(self, parts):
+        self.pending.append(parts)
+        if len(self.pending) >= BATCH_ROWS:
+            self.state.update(self.pending, self.headers)
+            self.pending = []
+        self.index.add(parts)
+        if len(parts) < self.header_count:
+            return
+        self.rows += 1
+        speed = to_float(parts[self.idx_speed], default=None)
+        if speed is not None:
+            # the same row key binning (assignment8) de-duplicates on
+            key = [parts[i] for i in self.key_idxs]
+            key.append('{:.2f}'.format(speed))
+            self.speeds.append(speed)
+            self.speed_hashes.append(hash64('\x1f'.join(key)))
+
+    def finish(self):
+        if self.header_line is None:
+            return None
+        self.state.update(self.pending, self.headers)
+        self.pending = []
+        return self
+
+
+class Snapshot:
+    """Resident, read-only data for one version (signature) of the CSV."""
+
+    def __init__(self, csv_path, signature, report=None):
+        self.csv_path = csv_path
+        self.signature = signature
+        self.loaded_at = time.time()
+        if report is None:
+            # empty file
+            self.results = ReportState().results()
+            self.rows = 0
+            self.index = IntensityIndex({}, [])
+            self.speeds = array('d')
+            self.speed_hashes = array('Q')
+        else:
+            self.results = report.state.results()
+            self.rows = report.rows
+            self.index = report.index.index()
+            self.speeds = report.speeds
+            self.speed_hashes = report.speed_hashes
+
+    def distinct_types(self):
+        return self.results['distinct_types']
+
+    def theme_averages(self):
+        return self.results['theme_averages']
+
+    def gs_stats(self):
+        stats = {}
+        for name, values in zip(('max_pos_gs', 'max_neg_gs'), self.results['gs_stats']):
+            stats[name] = dict(zip(('max', 'median', 'mean', 'mode'), values))
+        return stats
+
+    def filter(self, rating=None, intensity_gt=None, intensity_lt=None):
+        return self.index.rollercoaster_types(rating, intensity_gt, intensity_lt)
+
+    def speed_buckets(self, low_threshold=10.0, high_threshold=15.0):
+        if low_threshold > high_threshold:
+            raise ValueError('low_threshold must not exceed high_threshold')
+        buckets = avg_speed_buckets(self.speeds, low_threshold, high_threshold)
+        seen = [set(), set(), set()]
+        for bucket, h in zip(buckets, self.speed_hashes):
+            seen[bucket].add(h)
+        return dict(zip(SPEED_LABELS, (len(hashes) for hashes in seen)))
+
+
+def load_snapshot(csv_path):
+    """Read csv_path once and return its Snapshot."""
+    # taken before reading: a change during the read shows up as a new signature
+    signature = source_signature(csv_path)
+    report = run_reports(csv_path, [SnapshotReport()])[0]
+    return Snapshot(csv_path, signature, report)
+
+
+class Dataset:
+    """The current Snapshot of csv_path, reloaded when the file changes."""
+
+    def __init__(self, csv_path, poll_interval=1.0):
+        self.csv_path = csv_path
+        self.poll_interval = poll_interval
+        self.snapshot = load_snapshot(csv_path)
+        self.reloads = 0
+        self.last_error = None
+        self.cache = QueryCache(max_entries=256)
+        self.stopped = threading.Event()
+        self.lock = threading.Lock()  # one reload at a time
+
+    def refresh(self):
+        """Reload if csv_path changed; return True if a new Snapshot was swapped in."""
+        with self.lock:
+            try:
+                if source_signature(self.csv_path) == self.snapshot.signature:
+                    return False
+                snapshot = load_snapshot(self.csv_path)
+            except (OSError, ValueError) as e:
+                self.last_error = '{}: {}'.format(type(e).__name__, e)
+                return False
+            # a single assignment, so readers see the old or the new snapshot
+            self.snapshot = snapshot
+            self.reloads += 1
+            self.last_error = None
+            return True
+
+    def watch(self):
+        while not self.stopped.wait(self.poll_interval):
+            self.refresh()
+
+    def start_watching(self):
+        thread = threading.Thread(target=self.watch, name='snapshot-watcher', daemon=True)
+        thread.start()
+        return thread
+
+    def status(self):
+        snapshot = self.snapshot
+        return {
+            'csv_path': self.csv_path,
+            'rows': snapshot.rows,
+            'signature': list(snapshot.signature),
+            'loaded_at': snapshot.loaded_at,
+            'reloads': self.reloads,
+            'last_error': self.last_error,
+            'cache': self.cache.stats(),
+        }
+
+
+def float_param(params, name, default=None):
+    values = params.get(name)
+    if not values or values[-1] == '':
+        return default
+    try:
+        return float(values[-1])
+    except ValueError:
+        raise ValueError('{} must be a number'.format(name))
+
+def text_param(params, name, default=None):
+    values = params.get(name)
+    if not values or values[-1] == '':
+        return default
+    return values[-1]
+
+QUERIES = {
+    '/distinct_types': lambda s, p: s.distinct_types(),
+    '/theme_averages': lambda s, p: s.theme_averages(),
+    '/gs_stats': lambda s, p: s.gs_stats(),
+    '/filter': lambda s, p: s.filter(text_param(p, 'rating'),
+                                     float_param(p, 'intensity_gt'),
+                                     float_param(p, 'intensity_lt')),
+    '/speed_buckets': lambda s, p: s.speed_buckets(float_param(p, 'low', 10.0),
+                                                   float_param(p, 'high', 15.0)),
+}
+
+
+class QueryHandler(BaseHTTPRequestHandler):
+    server_version = 'CoasterQuery/1.0'
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        params = parse_qs(url.query, keep_blank_values=True)
+        dataset = self.server.dataset
+        if url.path == '/status':
+            self.send_json(200, json.dumps(dataset.status()).encode('utf-8'))
+            return
+        query = QUERIES.get(url.path)
+        if query is None:
+            self.send_json(404, json.dumps({'error': 'Unknown query: ' + url.path}).encode('utf-8'))
+            return
+        snapshot = dataset.snapshot
+        key = (snapshot.signature, url.path,
+               tuple(sorted((name, values[-1]) for name, values in params.items())))
+        body = dataset.cache.get(key)
+        if body is None:
+            try:
+                body = json.dumps(query(snapshot, params)).encode('utf-8')
+            except ValueError as e:
+                self.send_json(400, json.dumps({'error': str(e)}).encode('utf-8'))
+                return
+            dataset.cache.put(key, body)
+        self.send_json(200, body)
+
+    def send_json(self, status, body):
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class QueryServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, dataset, verbose=False):
+        super().__init__(address, QueryHandler)
+        self.dataset = dataset
+        self.verbose = verbose
+
+    def server_close(self):
+        self.dataset.stopped.set()
+        super().server_close()
+
+
+def make_server(csv_path, host='127.0.0.1', port=DEFAULT_PORT, poll_interval=1.0,
+                verbose=False):
+    """Load csv_path, start watching it and return the (not yet serving) server."""
+    dataset = Dataset(csv_path, poll_interval)
+    server = QueryServer((host, port), dataset, verbose)
+    dataset.start_watching()
+    return server
+
+def serve(csv_path, host='127.0.0.1', port=DEFAULT_PORT, poll_interval=1.0):
+    server = make_server(csv_path, host, port, poll_interval, verbose=True)
+    print(f"Serving {csv_path} ({server.dataset.snapshot.rows} rows) "
+          f"on http://{host}:{server.server_address[1]}/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    CSV_PATH = sys.argv[1] if len(sys.argv) > 1 else 'rollercoasters.csv'
+    PORT = int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_PORT
+    serve(CSV_PATH, port=PORT)
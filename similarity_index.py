@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+"""
+"Similar coasters" search: a KD-tree over the normalized numeric fields.
+
+Each complete row with a value in every one of SIMILARITY_FIELDS
+(assignment6.FLOAT_FIELDS: excitement, intensity, nausea, speeds, gs and
+air time) becomes a point. Every field is z-score normalized (minus its
+mean, divided by its standard deviation) so that max_speed does not drown
+out the gs values, and similarity is the Euclidean distance between
+normalized points. Rows missing one of the fields are left out.
+
+The tree splits each node at the median of its widest field until a node
+holds at most leaf_size points; points are stored in one flat array in
+tree order, so a node is just a [lo, hi) range of it. A k-NN query
+descends to the nearest leaf first and only visits the other side of a
+split while it could still hold something closer, which makes lookups
+roughly O(log n) instead of the O(n) brute force over every Coaster.
+Results are (distance, row id) pairs, nearest first, ties by row id; row
+ids are positions in the CoasterTable / build_coasters_from_csv list.
+
+The tree is persisted next to the CSV as <csv_path>.similarityindex, in
+coaster_cache's sidecar layout, and is only used while the CSV still has
+the size and modification time it was built from.
+
+Class:
+  CoasterKDTree
+    - vector(coaster) normalized point of a Coaster, CoasterRow, dict or
+      sequence of SIMILARITY_FIELDS values
+    - knn(point, k=10, exclude=None), radius(point, r),
+      knn_batch(points, k=10), radius_batch(points, r)
+
+Functions:
+  build_similarity_index(csv_path, index_path=None, leaf_size=LEAF_SIZE)
+    - ValueError if the CSV lacks a field or its columns are not in
+      assignment6.FIELD_NAMES order, which CoasterTable reads by position
+  find_similarity_index(csv_path, index_path=None)
+  load_similarity_index(csv_path, index_path=None)
+    - The fresh saved tree, or a newly built and saved one
+  similar_coasters(csv_path, row_id, k=10)
+    - The k rows most similar to row_id, itself excluded
+"""
+
+import heapq
+import math
+import sys
+from array import array
+
+from assignment6 import FIELD_NAMES, FLOAT_FIELDS
+from coaster_cache import (is_fresh, load_coaster_table, map_arrays_file, source_signature,
+                           write_arrays_file)
+from csv_rows import RowReader
+
+MAGIC = b'CKDTREE1'
+INDEX_SUFFIX = '.similarityindex'
+SIMILARITY_FIELDS = FLOAT_FIELDS
+LEAF_SIZE = 16
+# points looked at when choosing the widest field of a node
+SPREAD_SAMPLE = 256
+# cell distances are updated incrementally; shrink them slightly before pruning so
+# rounding can never prune a point at exactly the k-th (or radius) distance
+CELL_SLACK = 1.0 - 1e-9
+
+def default_index_path(csv_path):
+    return csv_path + INDEX_SUFFIX
+
+def check_headers(csv_path, fields=SIMILARITY_FIELDS):
+    """Raise ValueError unless csv_path has the fields, in the column order CoasterTable reads."""
+    with RowReader(csv_path) as reader:
+        if reader.header_line is None:
+            return
+        headers = reader.headers
+    missing = [name for name in fields if name not in headers]
+    if missing:
+        raise ValueError('Missing required header(s): ' + ', '.join(missing))
+    if tuple(headers) != FIELD_NAMES:
+        raise ValueError('Columns must be in the rollercoasters.csv order: ' + ', '.join(FIELD_NAMES))
+
+
+class CoasterKDTree:
+    def __init__(self, fields, means, scales, points, row_ids, nodes):
+        self.fields = tuple(fields)
+        self.dims = len(self.fields)
+        self.means = list(means)
+        self.scales = list(scales)
+        self.points = points  # normalized values, dims per point, in tree order
+        self.row_ids = row_ids  # row id of each point, in tree order
+        # per node: split field (-1 for a leaf), split value, children, point range
+        self.split_dims, self.split_values, self.lefts, self.rights, self.los, self.his = nodes
+
+    def __len__(self):
+        return len(self.row_ids)
+
+    @classmethod
+    def from_table(cls, table, fields=SIMILARITY_FIELDS, leaf_size=LEAF_SIZE):
+        if leaf_size < 1:
+            raise ValueError('leaf_size must be at least 1')
+        columns = [table.columns[name] for name in fields]
+        rows = []
+        vectors = []
+        for row_id, values in enumerate(zip(*columns)):
+            # missing values are NaN, the only floats not equal to themselves
+            if all(v == v for v in values):
+                rows.append(row_id)
+                vectors.append(values)
+        means = []
+        scales = []
+        for d in range(len(fields)):
+            column = [v[d] for v in vectors]
+            mean = math.fsum(column) / len(column) if column else 0.0
+            std = math.sqrt(math.fsum([(v - mean) * (v - mean) for v in column]) / len(column)) \
+                if column else 0.0
+            means.append(mean)
+            # a constant field can't tell coasters apart; leave it unscaled
+            scales.append(std if std > 0 else 1.0)
+        vectors = [tuple((v - m) / s for v, m, s in zip(values, means, scales))
+                   for values in vectors]
+
+        order = list(range(len(vectors)))
+        by_field = list(zip(*vectors))  # field -> value of every point
+        nodes = ([], [], [], [], [], [])
+        split_dims, split_values, lefts, rights, los, his = nodes
+
+        def split(lo, hi):
+            node = len(split_dims)
+            split_dims.append(-1)
+            split_values.append(0.0)
+            lefts.append(-1)
+            rights.append(-1)
+            los.append(lo)
+            his.append(hi)
+            if hi - lo <= leaf_size:
+                return node
+            step = max(1, (hi - lo) // SPREAD_SAMPLE)
+            sample = list(zip(*[vectors[i] for i in order[lo:hi:step]]))
+            dim = max(range(len(fields)), key=lambda d: max(sample[d]) - min(sample[d]))
+            order[lo:hi] = sorted(order[lo:hi], key=by_field[dim].__getitem__)
+            mid = (lo + hi) // 2
+            # left points are <= the split value and right points >= it
+            split_dims[node] = dim
+            split_values[node] = by_field[dim][order[mid]]
+            lefts[node] = split(lo, mid)
+            rights[node] = split(mid, hi)
+            return node
+
+        if vectors:
+            split(0, len(vectors))
+        points = array('d')
+        for i in order:
+            points.extend(vectors[i])
+        return cls(fields, means, scales, points, array('I', [rows[i] for i in order]),
+                   (array('b', split_dims), array('d', split_values), array('i', lefts),
+                    array('i', rights), array('I', los), array('I', his)))
+
+    def vector(self, coaster):
+        """Return the normalized point of a Coaster-like object, dict or sequence of field values."""
+        if isinstance(coaster, dict):
+            values = [coaster.get(name) for name in self.fields]
+        elif isinstance(coaster, (list, tuple)):
+            values = list(coaster)
+        else:
+            values = [getattr(coaster, name) for name in self.fields]
+        if len(values) != self.dims:
+            raise ValueError('Need one value per field: ' + ', '.join(self.fields))
+        point = []
+        for name, value, mean, scale in zip(self.fields, values, self.means, self.scales):
+            if value is None or value != value:
+                raise ValueError('Missing value for ' + repr(name))
+            point.append((float(value) - mean) / scale)
+        return tuple(point)
+
+    def knn(self, point, k=10, exclude=None):
+        """Return the k nearest [(distance, row id)], nearest first; exclude skips one row id."""
+        if k < 1:
+            raise ValueError('k must be at least 1')
+        if not len(self):
+            return []
+        dims = self.dims
+        points = self.points
+        row_ids = self.row_ids
+        split_dims = self.split_dims
+        split_values = self.split_values
+        dist = math.dist
+        # max-heap of the best k as (-distance, -row id): the root is the worst kept
+        best = []
+        # (node, squared distance from point to the node's cell, per-field offsets to
+        # the cell); the far side of a split only changes the offset of its field
+        stack = [(0, 0.0, (0.0,) * dims)]
+        while stack:
+            node, cell_d2, offsets = stack.pop()
+            if len(best) == k and cell_d2 * CELL_SLACK > best[0][0] * best[0][0]:
+                continue
+            dim = split_dims[node]
+            if dim < 0:
+                for i in range(self.los[node], self.his[node]):
+                    rid = row_ids[i]
+                    if rid == exclude:
+                        continue
+                    d = dist(point, points[i * dims:(i + 1) * dims])
+                    if len(best) < k:
+                        heapq.heappush(best, (-d, -rid))
+                    elif (d, rid) < (-best[0][0], -best[0][1]):
+                        heapq.heapreplace(best, (-d, -rid))
+                continue
+            diff = point[dim] - split_values[node]
+            near, far = ((self.lefts[node], self.rights[node]) if diff < 0
+                         else (self.rights[node], self.lefts[node]))
+            far_offsets = offsets[:dim] + (diff,) + offsets[dim + 1:]
+            # pushed first, so the near side is searched first
+            stack.append((far, cell_d2 - offsets[dim] * offsets[dim] + diff * diff, far_offsets))
+            stack.append((near, cell_d2, offsets))
+        return sorted((-d, -rid) for d, rid in best)
+
+    def radius(self, point, r):
+        """Return every [(distance, row id)] within distance r, nearest first."""
+        if not len(self):
+            return []
+        dims = self.dims
+        points = self.points
+        row_ids = self.row_ids
+        dist = math.dist
+        found = []
+        r2 = r * r
+        stack = [(0, 0.0, (0.0,) * dims)]  # as in knn
+        while stack:
+            node, cell_d2, offsets = stack.pop()
+            if cell_d2 * CELL_SLACK > r2:
+                continue
+            dim = self.split_dims[node]
+            if dim < 0:
+                for i in range(self.los[node], self.his[node]):
+                    d = dist(point, points[i * dims:(i + 1) * dims])
+                    if d <= r:
+                        found.append((d, row_ids[i]))
+                continue
+            diff = point[dim] - self.split_values[node]
+            near, far = ((self.lefts[node], self.rights[node]) if diff < 0
+                         else (self.rights[node], self.lefts[node]))
+            far_offsets = offsets[:dim] + (diff,) + offsets[dim + 1:]
+            stack.append((far, cell_d2 - offsets[dim] * offsets[dim] + diff * diff, far_offsets))
+            stack.append((near, cell_d2, offsets))
+        found.sort()
+        return found
+
+    def knn_batch(self, points, k=10):
+        return [self.knn(point, k) for point in points]
+
+    def radius_batch(self, points, r):
+        return [self.radius(point, r) for point in points]
+
+    def save(self, index_path, signature):
+        meta = {'source_size': signature[0], 'source_mtime_ns': signature[1],
+                'fields': list(self.fields), 'means': self.means, 'scales': self.scales}
+        arrays = [('points', self.points), ('row_ids', self.row_ids),
+                  ('split_dims', self.split_dims), ('split_values', self.split_values),
+                  ('lefts', self.lefts), ('rights', self.rights),
+                  ('los', self.los), ('his', self.his)]
+        write_arrays_file(index_path, MAGIC, meta, arrays)
+
+    @classmethod
+    def load(cls, index_path, signature):
+        """Return the tree saved at index_path, or None if missing or stale."""
+        mapped = map_arrays_file(index_path, MAGIC)
+        if mapped is None:
+            return None
+        meta, arrays, mm = mapped
+        if not is_fresh(meta, signature):
+            return None
+        nodes = tuple(arrays[name] for name in
+                      ('split_dims', 'split_values', 'lefts', 'rights', 'los', 'his'))
+        tree = cls(meta['fields'], meta['means'], meta['scales'], arrays['points'],
+                   arrays['row_ids'], nodes)
+        tree.buffer = mm
+        return tree
+
+
+def build_similarity_index(csv_path, index_path=None, leaf_size=LEAF_SIZE):
+    """Build the tree for csv_path, write it next to the CSV and return it."""
+    if index_path is None:
+        index_path = default_index_path(csv_path)
+    signature = source_signature(csv_path)
+    check_headers(csv_path)
+    tree = CoasterKDTree.from_table(load_coaster_table(csv_path), leaf_size=leaf_size)
+    tree.save(index_path, signature)
+    return tree
+
+def find_similarity_index(csv_path, index_path=None):
+    """Return the saved tree for csv_path if present and up to date, else None."""
+    if index_path is None:
+        index_path = default_index_path(csv_path)
+    return CoasterKDTree.load(index_path, source_signature(csv_path))
+
+def load_similarity_index(csv_path, index_path=None):
+    tree = find_similarity_index(csv_path, index_path)
+    if tree is None:
+        tree = build_similarity_index(csv_path, index_path)
+    return tree
+
+def similar_coasters(csv_path, row_id, k=10):
+    """Return the k [(distance, row id)] most similar to row_id, excluding row_id itself."""
+    check_headers(csv_path)
+    tree = load_similarity_index(csv_path)
+    # normalized exactly as the tree's own points were
+    point = tree.vector(load_coaster_table(csv_path)[row_id])
+    return tree.knn(point, k, exclude=row_id)
+
+
+if __name__ == '__main__':
+    CSV_PATH = 'rollercoasters.csv'
+    ROW_ID = int(sys.argv[1]) if len(sys.argv) > 1 else 0
+    table = load_coaster_table(CSV_PATH)
+    print(f"{table[ROW_ID].rollercoaster_type} ({table[ROW_ID].theme}) is most like:")
+    for distance, row_id in similar_coasters(CSV_PATH, ROW_ID, k=5):
+        row = table[row_id]
+        print(f"  {distance:6.3f}  {row.rollercoaster_type} ({row.theme})")
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Fixed-memory sketches for distinct counts and frequent values of a column.
+
+All hashing uses blake2b, so results are the same on every run (str hash()
+is randomized per process) and sketches built in different processes can
+be merged.
+
+Classes:
+  HyperLogLog(error=0.01)
+    - add(value), count() estimate of distinct values, merge(other)
+    - error is the target relative standard error; memory is 2**p one-byte
+      registers with p chosen so 1.04 / sqrt(2**p) <= error (p in 4..18)
+  CountMinSketch(epsilon=0.001, delta=0.01)
+    - add(value, n=1), estimate(value), merge(other)
+    - estimates never undercount, and overcount by at most epsilon * total
+      with probability 1 - delta
+  SpaceSaving(capacity)
+    - add(value), top(k) -> [(value, count, max_overcount)], merge(other)
+    - keeps at most capacity counters; any value seen more than
+      total / capacity times is guaranteed to be kept, and every kept
+      count satisfies count - max_overcount <= true count <= count, also
+      after merges
+  HeavyHitters(epsilon=0.001, delta=0.01)
+    - SpaceSaving for the candidates plus CountMinSketch for their counts;
+      top(k) -> [(value, estimated count)]
+"""
+
+import hashlib
+import heapq
+import math
+from array import array
+
+MIN_PRECISION = 4
+MAX_PRECISION = 18
+
+def hash64(value):
+    """Stable 64-bit hash of a str or bytes value."""
+    if isinstance(value, str):
+        value = value.encode('utf-8')
+    return int.from_bytes(hashlib.blake2b(value, digest_size=8).digest(), 'little')
+
+def hash128(value):
+    """Two independent stable 64-bit hashes of a str or bytes value."""
+    if isinstance(value, str):
+        value = value.encode('utf-8')
+    digest = hashlib.blake2b(value, digest_size=16).digest()
+    return int.from_bytes(digest[:8], 'little'), int.from_bytes(digest[8:], 'little')
+
+
+class HyperLogLog:
+    def __init__(self, error=0.01):
+        if not 0 < error < 1:
+            raise ValueError('error must be between 0 and 1')
+        p = math.ceil(math.log2((1.04 / error) ** 2))
+        self.p = min(max(p, MIN_PRECISION), MAX_PRECISION)
+        self.m = 1 << self.p
+        self.registers = bytearray(self.m)
+
+    @property
+    def error(self):
+        """Relative standard error of count() for this precision."""
+        return 1.04 / math.sqrt(self.m)
+
+    def add(self, value):
+        h = hash64(value)
+        idx = h >> (64 - self.p)
+        rest = h & ((1 << (64 - self.p)) - 1)
+        # position of the leftmost 1 bit in the remaining 64 - p bits
+        rank = (64 - self.p) - rest.bit_length() + 1
+        if rank > self.registers[idx]:
+            self.registers[idx] = rank
+
+    def count(self):
+        m = self.m
+        if m == 16:
+            alpha = 0.673
+        elif m == 32:
+            alpha = 0.697
+        elif m == 64:
+            alpha = 0.709
+        else:
+            alpha = 0.7213 / (1 + 1.079 / m)
+        total = 0.0
+        zeros = 0
+        for r in self.registers:
+            total += 2.0 ** -r
+            if r == 0:
+                zeros += 1
+        estimate = alpha * m * m / total
+        # small range correction: linear counting while registers are still empty
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * math.log(m / zeros)
+        return int(round(estimate))
+
+    def merge(self, other):
+        if other.p != self.p:
+            raise ValueError('Cannot merge HyperLogLogs of different precision')
+        regs = self.registers
+        for i, r in enumerate(other.registers):
+            if r > regs[i]:
+                regs[i] = r
+        return self
+
+    def __len__(self):
+        return self.count()
+
+
+class CountMinSketch:
+    def __init__(self, epsilon=0.001, delta=0.01):
+        if not 0 < epsilon < 1 or not 0 < delta < 1:
+            raise ValueError('epsilon and delta must be between 0 and 1')
+        self.width = math.ceil(math.e / epsilon)
+        self.depth = math.ceil(math.log(1 / delta))
+        self.tables = [array('q', bytes(8 * self.width)) for _ in range(self.depth)]
+        self.total = 0
+
+    def _cells(self, value):
+        # double hashing: row i uses h1 + i * h2
+        h1, h2 = hash128(value)
+        width = self.width
+        return [(h1 + i * h2) % width for i in range(self.depth)]
+
+    def add(self, value, n=1):
+        self.total += n
+        for table, cell in zip(self.tables, self._cells(value)):
+            table[cell] += n
+
+    def estimate(self, value):
+        return min(table[cell] for table, cell in zip(self.tables, self._cells(value)))
+
+    def merge(self, other):
+        if (other.width, other.depth) != (self.width, self.depth):
+            raise ValueError('Cannot merge CountMinSketches of different shape')
+        for table, other_table in zip(self.tables, other.tables):
+            for i, n in enumerate(other_table):
+                if n:
+                    table[i] += n
+        self.total += other.total
+        return self
+
+
+class SpaceSaving:
+    def __init__(self, capacity):
+        if capacity < 1:
+            raise ValueError('capacity must be at least 1')
+        self.capacity = capacity
+        self.counts = {}  # value -> [count, max_overcount]
+        self.total = 0
+        # one (count, value) entry per counter; counts only grow, so an entry
+        # may be stale (too low) and is refreshed when it reaches the top
+        self.heap = []
+
+    def add(self, value, n=1):
+        self.total += n
+        entry = self.counts.get(value)
+        if entry is not None:
+            entry[0] += n
+        elif len(self.counts) < self.capacity:
+            self.counts[value] = [n, 0]
+            heapq.heappush(self.heap, (n, value))
+        else:
+            # replace the smallest counter; the newcomer inherits its count as error
+            floor = self._pop_min()
+            self.counts[value] = [floor + n, floor]
+            heapq.heappush(self.heap, (floor + n, value))
+
+    def _pop_min(self):
+        """Remove the counter with the smallest count and return that count."""
+        heap = self.heap
+        while True:
+            count, value = heap[0]
+            current = self.counts[value][0]
+            if current == count:
+                heapq.heappop(heap)
+                del self.counts[value]
+                return count
+            heapq.heapreplace(heap, (current, value))
+
+    def min_count(self):
+        """The most times an untracked value can have been seen: the smallest count once full, else 0."""
+        if len(self.counts) < self.capacity:
+            return 0
+        return min(count for count, _ in self.counts.values())
+
+    def top(self, k=None):
+        """Return [(value, count, max_overcount)] by descending count, ties by value."""
+        items = sorted(self.counts.items(), key=lambda item: (-item[1][0], item[0]))
+        if k is not None:
+            items = items[:k]
+        return [(value, count, error) for value, (count, error) in items]
+
+    def merge(self, other):
+        # a value tracked on one side only may have been seen up to the other
+        # side's min_count times there, so that much is added as count and error
+        self_floor = self.min_count()
+        other_floor = other.min_count()
+        if other_floor:
+            for value, entry in self.counts.items():
+                if value not in other.counts:
+                    entry[0] += other_floor
+                    entry[1] += other_floor
+        for value, (count, error) in other.counts.items():
+            entry = self.counts.get(value)
+            if entry is None:
+                self.counts[value] = [count + self_floor, error + self_floor]
+            else:
+                entry[0] += count
+                entry[1] += error
+        self.total += other.total
+        # keep the largest counters; dropped ones bound the error of the rest
+        if len(self.counts) > self.capacity:
+            kept = sorted(self.counts.items(), key=lambda item: (-item[1][0], item[0]))
+            self.counts = dict(kept[:self.capacity])
+        self.heap = [(count, value) for value, (count, _) in self.counts.items()]
+        heapq.heapify(self.heap)
+        return self
+
+
+class HeavyHitters:
+    def __init__(self, epsilon=0.001, delta=0.01):
+        self.candidates = SpaceSaving(math.ceil(1 / epsilon))
+        self.sketch = CountMinSketch(epsilon, delta)
+
+    def add(self, value):
+        self.candidates.add(value)
+        self.sketch.add(value)
+
+    def top(self, k=10):
+        """Return the k most frequent values as [(value, estimated count)]."""
+        # Count-Min gives the tighter of the two overestimates for each candidate
+        scored = [(value, min(count, self.sketch.estimate(value)))
+                  for value, count, _ in self.candidates.top()]
+        scored.sort(key=lambda item: (-item[1], item[0]))
+        return scored[:k]
+
+    def merge(self, other):
+        self.candidates.merge(other.candidates)
+        self.sketch.merge(other.sketch)
+        return self
+
+
+if __name__ == '__main__':
+    hll = HyperLogLog(0.02)
+    hitters = HeavyHitters(0.01)
+    for i in range(100000):
+        value = str(i % 20000) if i % 3 else 'frequent-' + str(i % 5)
+        hll.add(value)
+        hitters.add(value)
+    print(f"distinct estimate: {hll.count()} (exact 20005, +/- {hll.error:.1%})")
+    print('top 5:', hitters.top(5))
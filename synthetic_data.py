@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Generate synthetic rollercoasters.csv data of any size.
+
+Rows use the same 21-column schema as rollercoasters.csv, the same
+themes, coaster types and Low/Medium/High/Very High rating levels, and
+value ranges taken from the 142-row sample. Ratings agree with their
+numeric score, and park_id is spread at random so sorting has work to
+do. The same seed always produces the same file.
+
+Function:
+  write_synthetic_csv(path, rows, seed=210)
+    - Streams rows data lines (plus the header) to path in bounded memory
+
+Usage:
+  python synthetic_data.py rows output.csv [seed]
+"""
+
+import random
+import sys
+
+from assignment6 import FIELD_NAMES
+
+THEMES = [
+    'Adrenaline Heights', 'Arid Heights', 'Barony Bridge', 'Botany Breakers', 'Bumbly Bazaar',
+    'Butterfly Dam', 'Canry Mines', 'Coaster Canyon', 'Crater Lake', 'Crumbly Woods',
+    'Factory Capers', 'Forest Frontiers', 'Fun Fortress', 'Gentle Glen', 'Haunted Harbour',
+    'Hydro Hills', 'Iceberg Islands', 'Jolly Jungle', 'Karts And Coasters', "Mel's World",
+    'Millennium Mines', 'Mystic Mountain', 'Pacific Pyramids', 'Paradise Pier', 'Razor Rocks',
+    'Roman Village', 'Swamp Cove', 'Three Monkeys Park', 'Vertigo Views', 'Whispering Cliffs',
+]
+COASTER_TYPES = [
+    'Air Powered Vertical Coaster', 'Bobsleigh Coaster', 'Compact Inverted Coaster',
+    'Corkscrew Roller Coaster', 'Dinghy Slide', 'Floorless Roller Coaster', 'Giga Coaster',
+    'Heartline Twister Coaster', 'Hyper-Twister Roller Coaster', 'Hypercoaster',
+    'Inverted Hairpin Coaster', 'Inverted Roller Coaster', 'Junior Roller Coaster',
+    'Lay-down Roller Coaster', 'Looping Roller Coaster', 'Mine Train Coaster',
+    'Mini Roller Coaster', 'Reverse Freefall Coaster', 'Side-Friction Roller Coaster',
+    'Spinning Wild Mouse', 'Spiral Coaster', 'Stand Up Roller Coaster',
+    'Stand Up Twister Roller Coaster', 'Suspended Swinging Coaster', 'Twister Coaster',
+    'Vertical Drop Coaster', 'Virginia Reel', 'Water Coaster', 'Wild Mouse',
+    'Wooden Roller Coaster', 'Wooden Wild Mouse',
+]
+# (upper bound, rating) pairs; scores at or above the last bound are 'Very High'
+RATING_BOUNDS = [(2.6, 'Low'), (5.1, 'Medium'), (7.7, 'High')]
+# about this many coasters per park
+COASTERS_PER_PARK = 5
+# rows per writelines() call
+BATCH_ROWS = 10000
+
+def rating_for(score):
+    for bound, rating in RATING_BOUNDS:
+        if score < bound:
+            return rating
+    return 'Very High'
+
+def clamp(value, lo, hi):
+    return lo if value < lo else hi if value > hi else value
+
+def synthetic_lines(rows, seed=210):
+    """Yield rows CSV data lines (newline-terminated) in the rollercoasters.csv schema."""
+    rng = random.Random(seed)
+    parks = max(len(THEMES), rows // COASTERS_PER_PARK)
+    for _ in range(rows):
+        park_id = rng.randrange(parks)
+        theme = THEMES[park_id % len(THEMES)]
+        excitement = round(clamp(rng.gauss(6.3, 1.5), 1.0, 10.0), 2)
+        intensity = round(clamp(rng.gauss(6.8, 1.6), 0.5, 12.0), 2)
+        nausea = round(clamp(rng.gauss(4.35, 1.4), 0.5, 10.0), 2)
+        max_speed = rng.randint(29, 89)
+        avg_speed = rng.randint(1, min(44, max_speed))
+        drops = rng.randint(1, 20)
+        inversions = 0 if rng.random() < 0.85 else rng.randint(1, 4)
+        fields = [
+            park_id, theme, rng.choice(COASTER_TYPES), 1 if rng.random() < 0.3 else 0,
+            excitement, rating_for(excitement), intensity, rating_for(intensity),
+            nausea, rating_for(nausea), max_speed, avg_speed,
+            rng.randint(12, 186), rng.randint(600, 7500),
+            round(rng.uniform(2.1, 6.3), 2), round(rng.uniform(-2.5, 1.1), 2),
+            round(rng.uniform(0.0, 3.3), 2), round(min(rng.expovariate(1 / 1.8), 11.5), 2),
+            drops, rng.randint(9, 240), inversions,
+        ]
+        yield ','.join([str(f) for f in fields]) + '\n'
+
+def write_synthetic_csv(path, rows, seed=210):
+    """Write a header plus rows synthetic data lines to path. Returns rows."""
+    with open(path, 'w', encoding='utf-8') as out:
+        out.write(','.join(FIELD_NAMES) + '\n')
+        batch = []
+        for line in synthetic_lines(rows, seed):
+            batch.append(line)
+            if len(batch) >= BATCH_ROWS:
+                out.writelines(batch)
+                batch = []
+        out.writelines(batch)
+    return rows
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 3:
+        print('Usage: python synthetic_data.py rows output.csv [seed]')
+        sys.exit(1)
+    n_rows = int(float(sys.argv[1]))
+    out_path = sys.argv[2]
+    seed = int(sys.argv[3]) if len(sys.argv) > 3 else 210
+    write_synthetic_csv(out_path, n_rows, seed)
+    print(f"Wrote {n_rows} rows to {out_path}")
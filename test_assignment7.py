@@ -0,0 +1,44 @@
+"""assignment7's in-memory and out-of-core sorts against sorted() on a small fixed input."""
+
+import pytest
+
+from assignment7 import sort_by_park_id_and_write
+from synthetic_data import write_synthetic_csv
+
+ROWS = 300
+
+@pytest.fixture
+def source(tmp_path):
+    path = str(tmp_path / 'coasters.csv')
+    write_synthetic_csv(path, ROWS, seed=4)
+    with open(path, encoding='utf-8') as f:
+        header = f.readline().rstrip('\n')
+        rows = [line.rstrip('\n').split(',') for line in f]
+    return path, header, rows
+
+def read_output(path):
+    with open(path, encoding='utf-8') as f:
+        return [line.rstrip('\n') for line in f]
+
+@pytest.mark.parametrize('max_rows_in_memory', [None, 1, 7, 64, ROWS, ROWS * 2])
+def test_park_id_sort_matches_sorted(source, tmp_path, max_rows_in_memory):
+    path, header, rows = source
+    out = str(tmp_path / 'sorted.csv')
+    written = sort_by_park_id_and_write(path, out, max_rows_in_memory=max_rows_in_memory)
+    # sorted() is stable, so rows with the same park_id keep their input order
+    expected = sorted(rows, key=lambda parts: int(parts[0]))
+    assert written == ROWS
+    assert read_output(out) == [header] + [','.join(parts) for parts in expected]
+
+@pytest.mark.parametrize('max_rows_in_memory', [None, 5, 50])
+def test_multi_key_sort_matches_sorted(source, tmp_path, max_rows_in_memory):
+    path, header, rows = source
+    out = str(tmp_path / 'sorted.csv')
+    sort_by_park_id_and_write(path, out, sort_keys=['theme', '-excitement', 'park_id'],
+                              max_rows_in_memory=max_rows_in_memory)
+    names = header.split(',')
+    theme = names.index('theme')
+    excitement = names.index('excitement')
+    expected = sorted(rows, key=lambda parts: (parts[theme], -float(parts[excitement]),
+                                               int(parts[0])))
+    assert read_output(out) == [header] + [','.join(parts) for parts in expected]
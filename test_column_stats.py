@@ -0,0 +1,99 @@
+"""column_stats' KLL sketch and column profiles against exact statistics on fixed inputs."""
+
+import random
+import statistics
+from bisect import bisect_left, bisect_right
+
+import pytest
+
+from assignment9 import find_stats
+from column_stats import KLLSketch, Welford, profile_columns
+from synthetic_data import write_synthetic_csv
+
+QS = [0.0, 0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99, 1.0]
+
+def fixed_values(n, seed=22):
+    rng = random.Random(seed)
+    # two decimals, so there are plenty of ties
+    return [round(rng.gauss(3.2, 0.9), 2) for _ in range(n)]
+
+def rank_error(ordered, value, q):
+    """Distance from the target rank q * n to the ranks value occupies in ordered."""
+    target = q * len(ordered)
+    lo = bisect_left(ordered, value)
+    hi = bisect_right(ordered, value)
+    return max(0.0, lo - target, target - hi)
+
+@pytest.mark.parametrize('k', [50, 200])
+def test_kll_ranks_within_epsilon(k):
+    values = fixed_values(20000)
+    sketch = KLLSketch(k)
+    sketch.add_batch(values)
+    assert sketch.compacted
+    ordered = sorted(values)
+    epsilon = 1.7 / k
+    for q, value in zip(QS, sketch.quantiles(QS)):
+        assert rank_error(ordered, value, q) <= epsilon * len(values)
+
+@pytest.mark.parametrize('k', [50, 200])
+def test_merged_kll_ranks_within_epsilon(k):
+    values = fixed_values(20000, seed=23)
+    sketch = KLLSketch(k, seed=0)
+    for i in range(0, len(values), 3000):
+        part = KLLSketch(k, seed=i)
+        for value in values[i:i + 3000]:
+            part.add(value)
+        sketch.merge(part)
+    assert sketch.n == len(values)
+    ordered = sorted(values)
+    for q, value in zip(QS, sketch.quantiles(QS)):
+        assert rank_error(ordered, value, q) <= 1.7 / k * len(values)
+
+@pytest.mark.parametrize('n', [1, 2, 99, 100])
+def test_kll_is_exact_before_compacting(n):
+    values = fixed_values(n)
+    sketch = KLLSketch(200)
+    sketch.add_batch(values)
+    assert not sketch.compacted
+    ordered = sorted(values)
+    assert sketch.median() == statistics.median(values)
+    for q, value in zip(QS, sketch.quantiles(QS)):
+        assert rank_error(ordered, value, q) == 0
+
+def test_welford_merge_matches_statistics():
+    values = fixed_values(5000)
+    moments = Welford()
+    for i in range(0, len(values), 700):
+        part = Welford()
+        part.add_batch(values[i:i + 700])
+        moments.merge(part)
+    assert moments.n == len(values)
+    assert (moments.min, moments.max) == (min(values), max(values))
+    assert moments.mean == pytest.approx(statistics.fmean(values), rel=1e-12)
+    assert moments.variance() == pytest.approx(statistics.variance(values), rel=1e-9)
+
+@pytest.mark.parametrize('rows', [150, 2000])
+@pytest.mark.parametrize('workers', [None, 2])
+def test_profile_matches_assignment9(tmp_path, rows, workers):
+    path = str(tmp_path / 'coasters.csv')
+    write_synthetic_csv(path, rows, seed=9)
+    profiles = profile_columns(path, ['max_pos_gs', 'max_neg_gs'], workers=workers)
+    with open(path, encoding='utf-8') as f:
+        headers = f.readline().rstrip('\n').split(',')
+        lines = [line.rstrip('\n').split(',') for line in f]
+    for name in ('max_pos_gs', 'max_neg_gs'):
+        idx = headers.index(name)
+        values = [float(parts[idx]) for parts in lines]
+        expected_max, expected_median, expected_mean, expected_mode = find_stats(values)
+        profile = profiles[name]
+        stats = profile.stats()
+        assert stats['count'] == rows
+        assert stats['max'] == expected_max
+        assert stats['mean'] == pytest.approx(expected_mean, rel=1e-12)
+        assert stats['mode'] == expected_mode
+        if profile.sketch.compacted:
+            # past the first compaction the median is the p50 estimate
+            assert rank_error(sorted(values), stats['median'], 0.5) <= \
+                1.7 / profile.sketch.k * rows
+        else:
+            assert stats['median'] == expected_median
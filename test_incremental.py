@@ -0,0 +1,43 @@
+"""incremental.update_reports resumed over appended rows against a full rescan."""
+
+from incremental import update_reports
+from synthetic_data import write_synthetic_csv
+
+def synthetic_lines(tmp_path, rows, seed):
+    path = tmp_path / 'source_{}.csv'.format(seed)
+    write_synthetic_csv(str(path), rows, seed=seed)
+    return path.read_text(encoding='utf-8').splitlines(keepends=True)
+
+def full_rescan(tmp_path, csv_path):
+    gs_csv = tmp_path / 'full_gs.csv'
+    results = update_reports(csv_path, str(tmp_path / 'fresh.state.json'), str(gs_csv))
+    (tmp_path / 'fresh.state.json').unlink()
+    return results, gs_csv.read_text(encoding='utf-8')
+
+def test_resume_matches_full_rescan(tmp_path):
+    lines = synthetic_lines(tmp_path, 400, seed=10)
+    csv_path = str(tmp_path / 'coasters.csv')
+    state_path = str(tmp_path / 'coasters.state.json')
+    gs_csv = tmp_path / 'gs.csv'
+    # header and 100 rows, then 150 more and half a line, then the rest
+    cut = len(lines[251]) // 2
+    chunks = [''.join(lines[:101]),
+              ''.join(lines[101:251]) + lines[251][:cut],
+              lines[251][cut:] + ''.join(lines[252:])]
+    with open(csv_path, 'w', encoding='utf-8') as f:
+        for chunk in chunks:
+            f.write(chunk)
+            f.flush()
+            results = update_reports(csv_path, state_path, str(gs_csv))
+            assert (results, gs_csv.read_text(encoding='utf-8')) == full_rescan(tmp_path, csv_path)
+
+def test_rewritten_file_is_rescanned(tmp_path):
+    csv_path = tmp_path / 'coasters.csv'
+    state_path = str(tmp_path / 'coasters.state.json')
+    gs_csv = str(tmp_path / 'gs.csv')
+    csv_path.write_text(''.join(synthetic_lines(tmp_path, 200, seed=11)), encoding='utf-8')
+    update_reports(str(csv_path), state_path, gs_csv)
+    # same header, different rows and a longer file: not an append
+    csv_path.write_text(''.join(synthetic_lines(tmp_path, 250, seed=12)), encoding='utf-8')
+    results = update_reports(str(csv_path), state_path, gs_csv)
+    assert results == full_rescan(tmp_path, str(csv_path))[0]
@@ -0,0 +1,97 @@
+"""similarity_index's KD-tree k-NN and radius queries against a linear scan on a small fixed input."""
+
+import math
+
+import pytest
+
+from assignment6 import FIELD_NAMES
+from coaster_cache import load_coaster_table
+from similarity_index import (CoasterKDTree, build_similarity_index, check_headers,
+                              find_similarity_index, similar_coasters)
+from synthetic_data import write_synthetic_csv
+
+ROWS = 300
+
+@pytest.fixture
+def csv_path(tmp_path):
+    path = str(tmp_path / 'coasters.csv')
+    write_synthetic_csv(path, ROWS, seed=25)
+    with open(path, encoding='utf-8') as f:
+        lines = f.read().splitlines(keepends=True)
+    # blank out a field of one row, which leaves it out of the tree
+    parts = lines[5].rstrip('\n').split(',')
+    parts[FIELD_NAMES.index('max_neg_gs')] = ''
+    lines[5] = ','.join(parts) + '\n'
+    with open(path, 'w', encoding='utf-8') as f:
+        f.writelines(lines)
+    return path
+
+def linear_scan(tree, table, point):
+    """Every (distance, row id) of rows with all the fields, nearest first, ties by row id."""
+    found = []
+    for row_id in range(len(table)):
+        try:
+            found.append((math.dist(point, tree.vector(table[row_id])), row_id))
+        except ValueError:
+            continue
+    return sorted(found)
+
+def query_points(tree, table):
+    points = [tree.vector(table[row_id]) for row_id in (0, 17, 150, ROWS - 1)]
+    # points between and away from the rows
+    points.append(tuple((a + b) / 2 for a, b in zip(points[0], points[1])))
+    points.append((0.0,) * tree.dims)
+    points.append((3.0,) * tree.dims)
+    return points
+
+@pytest.mark.parametrize('leaf_size', [1, 4, 16, ROWS])
+def test_knn_matches_linear_scan(csv_path, leaf_size):
+    table = load_coaster_table(csv_path, use_cache=False)
+    tree = CoasterKDTree.from_table(table, leaf_size=leaf_size)
+    assert len(tree) == ROWS - 1
+    for point in query_points(tree, table):
+        expected = linear_scan(tree, table, point)
+        for k in (1, 5, 40, ROWS + 10):
+            assert tree.knn(point, k) == expected[:k]
+
+@pytest.mark.parametrize('leaf_size', [1, 4, 16])
+def test_radius_matches_linear_scan(csv_path, leaf_size):
+    table = load_coaster_table(csv_path, use_cache=False)
+    tree = CoasterKDTree.from_table(table, leaf_size=leaf_size)
+    for point in query_points(tree, table):
+        expected = linear_scan(tree, table, point)
+        for r in (0.0, 1.0, 2.5, 4.0):
+            assert tree.radius(point, r) == [(d, row_id) for d, row_id in expected if d <= r]
+
+def test_exclude_skips_only_that_row(csv_path):
+    table = load_coaster_table(csv_path, use_cache=False)
+    tree = CoasterKDTree.from_table(table, leaf_size=4)
+    point = tree.vector(table[42])
+    expected = [(d, row_id) for d, row_id in linear_scan(tree, table, point) if row_id != 42]
+    assert tree.knn(point, 10, exclude=42) == expected[:10]
+
+def test_saved_tree_answers_like_the_built_one(csv_path, tmp_path):
+    index_path = str(tmp_path / 'coasters.similarityindex')
+    built = build_similarity_index(csv_path, index_path, leaf_size=4)
+    loaded = find_similarity_index(csv_path, index_path)
+    assert loaded is not None
+    table = load_coaster_table(csv_path, use_cache=False)
+    for point in query_points(built, table):
+        assert loaded.knn(point, 12) == built.knn(point, 12)
+        assert loaded.radius(point, 2.0) == built.radius(point, 2.0)
+
+def test_similar_coasters_matches_linear_scan(csv_path):
+    table = load_coaster_table(csv_path, use_cache=False)
+    tree = CoasterKDTree.from_table(table)
+    expected = [(d, row_id) for d, row_id in linear_scan(tree, table, tree.vector(table[7]))
+                if row_id != 7]
+    assert similar_coasters(csv_path, 7, k=8) == expected[:8]
+
+def test_check_headers_rejects_a_narrow_csv(tmp_path):
+    path = str(tmp_path / 'narrow.csv')
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('park_id,theme,excitement\n1,Forest,5.5\n')
+    with pytest.raises(ValueError, match='Missing required header'):
+        check_headers(path)
+    with pytest.raises(ValueError):
+        build_similarity_index(path, str(tmp_path / 'narrow.similarityindex'))
@@ -0,0 +1,78 @@
+"""Merged sketches against one sketch over all values, and SpaceSaving against exact counts."""
+
+import random
+from collections import Counter
+
+import pytest
+
+from sketches import CountMinSketch, HeavyHitters, HyperLogLog, SpaceSaving
+
+def fixed_parts(n_parts=4, size=500, seed=14):
+    """Skewed values split into n_parts lists (values repeat across parts)."""
+    rng = random.Random(seed)
+    return [[str(int(rng.paretovariate(1.1)) % 300) for _ in range(size)]
+            for _ in range(n_parts)]
+
+def merged(make, parts):
+    sketches = []
+    for values in parts:
+        sketch = make()
+        for value in values:
+            sketch.add(value)
+        sketches.append(sketch)
+    result = sketches[0]
+    for sketch in sketches[1:]:
+        result.merge(sketch)
+    return result
+
+def unmerged(make, parts):
+    sketch = make()
+    for values in parts:
+        for value in values:
+            sketch.add(value)
+    return sketch
+
+def test_hyperloglog_merge_matches_unmerged():
+    parts = fixed_parts()
+    a = merged(lambda: HyperLogLog(0.05), parts)
+    b = unmerged(lambda: HyperLogLog(0.05), parts)
+    assert a.registers == b.registers
+    assert a.count() == b.count()
+
+def test_count_min_merge_matches_unmerged():
+    parts = fixed_parts()
+    a = merged(lambda: CountMinSketch(0.01, 0.05), parts)
+    b = unmerged(lambda: CountMinSketch(0.01, 0.05), parts)
+    assert a.tables == b.tables
+    assert a.total == b.total
+    exact = Counter(v for values in parts for v in values)
+    for value, count in exact.items():
+        assert a.estimate(value) >= count
+
+def test_space_saving_merge_is_exact_with_room_for_every_value():
+    parts = fixed_parts()
+    exact = Counter(v for values in parts for v in values)
+    summary = merged(lambda: SpaceSaving(len(exact)), parts)
+    assert summary.top() == unmerged(lambda: SpaceSaving(len(exact)), parts).top()
+    assert {value: (count, error) for value, count, error in summary.top()} == \
+        {value: (count, 0) for value, count in exact.items()}
+
+@pytest.mark.parametrize('capacity', [1, 3, 10, 40])
+@pytest.mark.parametrize('seed', range(5))
+def test_space_saving_bounds_hold_after_merges(capacity, seed):
+    parts = fixed_parts(n_parts=5, size=200, seed=seed)
+    exact = Counter(v for values in parts for v in values)
+    summary = merged(lambda: SpaceSaving(capacity), parts)
+    assert summary.total == sum(exact.values())
+    assert len(summary.top()) <= capacity
+    for value, count, error in summary.top():
+        assert count - error <= exact[value] <= count
+    for value, count in exact.items():
+        if value not in summary.counts:
+            assert count <= summary.min_count()
+
+def test_heavy_hitters_merge_matches_unmerged():
+    parts = fixed_parts()
+    a = merged(lambda: HeavyHitters(0.001), parts)
+    b = unmerged(lambda: HeavyHitters(0.001), parts)
+    assert a.top(10) == b.top(10)
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Top-K and bottom-K rows of rollercoasters.csv by any numeric column.
+
+The file is streamed once and each group keeps a bounded heap of its K
+best rows, so memory is O(K x groups) and time O(n log K) instead of a
+full sort. Ties keep the earlier row, exactly as a stable sort followed by
+[:k] would. Rows whose column is missing, non-numeric or NaN are skipped,
+as are rows too short to hold the column or the group key.
+
+TopKReport is a pipeline consumer, so several top-K queries (and the
+other reports) can share one pass of pipeline.run_reports.
+
+Function:
+  top_k(csv_path, column, k=50, group=None, smallest=False)
+    - group is None, a column name, or a tuple of column names
+    - Returns {group key: [(value, row fields)]}, best first; the key is
+      None without grouping, groups in first-seen order
+"""
+
+import heapq
+
+from csv_rows import to_float
+from pipeline import run_reports
+
+def column_index(headers, name):
+    if name not in headers:
+        raise ValueError('Missing required header: ' + repr(name))
+    return headers.index(name)
+
+
+class TopKReport:
+    """Pipeline consumer keeping the k largest (or smallest) rows per group."""
+
+    def __init__(self, column, k=50, group=None, smallest=False):
+        if k < 1:
+            raise ValueError('k must be at least 1')
+        self.column = column
+        self.k = k
+        self.group = group
+        # heaps hold (sign * value, -row number, fields); the root is the row
+        # to drop next: lowest ranked value, latest row among equal values
+        self.sign = -1.0 if smallest else 1.0
+
+    def start(self, headers, header_line):
+        self.heaps = {}
+        self.seq = 0
+        if header_line is None:
+            return
+        self.col_idx = column_index(headers, self.column)
+        if self.group is None:
+            self.key_idxs = None
+        elif isinstance(self.group, str):
+            self.key_idxs = (column_index(headers, self.group),)
+        else:
+            self.key_idxs = tuple(column_index(headers, g) for g in self.group)
+        self.single = isinstance(self.group, str)
+        self.min_fields = max((self.col_idx,) + (self.key_idxs or ())) + 1
+
+    def feed(self, parts):
+        if len(parts) < self.min_fields:
+            return
+        value = to_float(parts[self.col_idx], default=None)
+        if value is None or value != value:
+            return
+        self.seq += 1
+        if self.key_idxs is None:
+            key = None
+        elif self.single:
+            key = parts[self.key_idxs[0]]
+        else:
+            key = tuple(parts[i] for i in self.key_idxs)
+        ranked = self.sign * value
+        heap = self.heaps.get(key)
+        if heap is None:
+            self.heaps[key] = [(ranked, -self.seq, parts)]
+        elif len(heap) < self.k:
+            heapq.heappush(heap, (ranked, -self.seq, parts))
+        elif ranked > heap[0][0]:
+            # an equal value never displaces the root: the earlier row wins
+            heapq.heapreplace(heap, (ranked, -self.seq, parts))
+
+    def finish(self):
+        results = {}
+        for key, heap in self.heaps.items():
+            heap.sort(reverse=True)
+            results[key] = [(self.sign * ranked, parts) for ranked, _, parts in heap]
+        return results
+
+
+def top_k(csv_path, column, k=50, group=None, smallest=False):
+    """Return the k rows with the largest (or smallest) column value, per group."""
+    return run_reports(csv_path, [TopKReport(column, k, group, smallest)])[0]
+
+
+if __name__ == '__main__':
+    CSV_PATH = 'rollercoasters.csv'
+    fastest = top_k(CSV_PATH, 'max_speed', 3, group='theme')
+    for theme, rows in list(fastest.items())[:5]:
+        print(theme + ':', ', '.join(f"{parts[2]} ({value:g})" for value, parts in rows))
+    (_, gentlest), = top_k(CSV_PATH, 'intensity', 5, smallest=True).items()
+    print('Least intense:', [(parts[2], value) for value, parts in gentlest])